@@ -34,20 +34,21 @@ def agrupamiento_view():
             st.session_state.current_view = "home"
         return
 
-    # Cargar abstracts (reusa tu función load_ris si existe)
-    from Requisito3.analizar_abstracts import load_ris
-    abstracts = load_ris(DEFAULT_RIS_PATH)
-    if len(abstracts) == 0:
+    # Cargar índice del RIS: solo se decodifican los abstracts de la muestra
+    from Requisito3.indice_ris import load_ris_index, abstract_records, select_abstracts
+    index = load_ris_index(DEFAULT_RIS_PATH)
+    total_abstracts = len(abstract_records(index))
+    if total_abstracts == 0:
         st.warning("No hay abstracts en el archivo RIS.")
         return
 
     # Muestreo
-    if sample_size > 0 and len(abstracts) > sample_size:
-        indices = random.sample(range(len(abstracts)), sample_size)
-        abstracts_sample = [abstracts[i] for i in indices]
-        st.write(f"Usando muestra aleatoria de {sample_size} abstracts (de {len(abstracts)})")
+    if sample_size > 0 and total_abstracts > sample_size:
+        indices = random.sample(range(total_abstracts), sample_size)
+        abstracts_sample = select_abstracts(DEFAULT_RIS_PATH, indices, index=index)
+        st.write(f"Usando muestra aleatoria de {sample_size} abstracts (de {total_abstracts})")
     else:
-        abstracts_sample = abstracts
+        abstracts_sample = select_abstracts(DEFAULT_RIS_PATH, range(total_abstracts), index=index)
         st.write(f"Usando todos los abstracts ({len(abstracts_sample)})")
 
     # Botón para ejecutar pipeline
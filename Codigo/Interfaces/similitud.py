@@ -8,70 +8,60 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Importar funciones desde tus módulos
-from Requisito2.algoritmos_similitud import (
-    jaccard_similitud, dice_coefficient, normalized_levenshtein, tfidf_cosine_similarity, normalize_text
-)
-from Requisito2.modelos_IA import sbert_cosine_similarity, save_similarity_matrices
-from Requisito2.evaluacion_resultados import build_pair_indices, pair_results_to_matrix, plot_heatmap, plot_top_similar_heatmap
+from Requisito2.modelos_IA import save_similarity_matrices
+from Requisito2.evaluacion_resultados import plot_heatmap, plot_top_similar_heatmap
+from Requisito2.condensada import CondensedMatrix
+from Requisito2.registro_metricas import DEFAULT_METRICS, METRICS, compute_similarities
 
-# Si tienes un parser RIS (Requisito3), intenta importarlo — si no, permitimos subir CSV/TSV con abstracts.
+from ris import iter_ris_records
+
+# El índice de desplazamientos (Requisito3) es opcional: sin él, los registros pedidos se buscan recorriendo el archivo.
 try:
-    from Requisito3.analizar_abstracts import parse_large_ris
+    from Requisito3.indice_ris import read_records
 except Exception:
-    load_ris = None
+    def read_records(ris_path, record_numbers, fields=("AB",), normalize=True, index=None):
+        """Misma salida que indice_ris.read_records, pero en una pasada secuencial por el archivo."""
+        wanted = [int(rn) for rn in record_numbers]
+        pending = set(wanted)
+        found = {}
+        for rn, entry in enumerate(iter_ris_records(ris_path, fields=fields, normalize=normalize)):
+            if rn in pending:
+                found[rn] = entry
+                pending.discard(rn)
+                if not pending:
+                    break
+        return [found.get(rn, {}) for rn in wanted]
 
 # Ruta por defecto (igual que en tus scripts)
 DEFAULT_RIS_PATH = "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris"
 
-def extract_abstracts_from_ris_text(ris_text):
+def _join_abstract(entry):
+    ab = entry.get("AB", "")
+    return (" ".join(ab) if isinstance(ab, list) else ab).strip()
+
+def extract_titles_from_ris(ris_path):
     """
-    Lectura sencilla: buscar líneas que empiezan por 'AB  -' o 'A1  -'...
-    Devuelve lista de abstracts en el orden de aparición y lista de títulos (si existen).
+    Recorre el archivo RIS registro a registro leyendo solo los campos TI y T1.
+    Devuelve la lista de títulos en el orden de aparición (A<idx> si el registro no tiene título).
     """
-    abstracts = []
     titles = []
-    current_ab = []
-    current_title = None
-    in_record = False
-
-    for line in ris_text.splitlines():
-        if line.startswith("TY  -"):
-            in_record = True
-            current_ab = []
-            current_title = None
-        elif line.startswith("ER  -"):
-            in_record = False
-            abstracts.append(" ".join(current_ab).strip())
-            titles.append(current_title if current_title else f"A{len(abstracts)-1}")
-        elif in_record:
-            if line.startswith("AB  -"):
-                current_ab.append(line.split(" - ",1)[1].strip())
-            if line.startswith("TI  -") or line.startswith("T1  -"):
-                current_title = line.split(" - ",1)[1].strip()
-    return abstracts, titles
-
-def compute_pairwise_classics(abstracts, pair_idxs):
+    for entry in iter_ris_records(ris_path, fields=("TI", "T1"), normalize=False):
+        title = entry.get("TI") or entry.get("T1")
+        if isinstance(title, list):
+            title = title[-1]
+        titles.append(title if title else f"A{len(titles)}")
+    return titles
+
+def extract_abstracts_from_ris(ris_path, record_numbers=None):
     """
-    Calcula Jaccard, Dice y Levenshtein por pares (devuelve dicts (i,j)->sim).
+    Devuelve los abstracts de los registros indicados (todos si record_numbers es None).
+    Con record_numbers solo se decodifican esos registros usando el índice de desplazamientos.
     """
-    jac_pairs = {}
-    dice_pairs = {}
-    lev_pairs = {}
-    # Pre-tokenizar para Jaccard/Dice
-    tokenized = [set(normalize_text(ab)) for ab in abstracts]
-    for i,j in pair_idxs:
-        # Jaccard
-        inter = tokenized[i].intersection(tokenized[j])
-        union = tokenized[i].union(tokenized[j])
-        jac = len(inter)/len(union) if union else 0.0
-        jac_pairs[(i,j)] = float(jac)
-        # Dice
-        total = len(tokenized[i]) + len(tokenized[j])
-        dice_val = (2 * len(inter)) / total if total > 0 else 0.0
-        dice_pairs[(i,j)] = float(dice_val)
-        # Levenshtein (normalized_levenshtein espera strings)
-        lev_pairs[(i,j)] = float(normalized_levenshtein(abstracts[i], abstracts[j]))
-    return jac_pairs, dice_pairs, lev_pairs
+    if record_numbers is None:
+        entries = iter_ris_records(ris_path, fields=("AB",), normalize=False)
+    else:
+        entries = read_records(ris_path, record_numbers, fields=("AB",), normalize=False)
+    return [_join_abstract(e) for e in entries]
 
 def similitud_view():
     st.title("🔎 Requerimiento 2 — Análisis de similitud textual")
@@ -84,41 +74,39 @@ def similitud_view():
             st.session_state.current_view = "home"
         return
 
+    # === Extraer títulos del RIS (los abstracts se leen solo para los artículos elegidos) ===
     try:
-        with open(DEFAULT_RIS_PATH, "r", encoding="utf-8") as f:
-            raw_text = f.read()
+        titles = extract_titles_from_ris(DEFAULT_RIS_PATH)
     except Exception as e:
         st.error(f"Error al leer el archivo por defecto: {e}")
         if st.button("🏠 Volver al Home"):
             st.session_state.current_view = "home"
         return
 
-    # === Extraer abstracts y títulos del RIS ===
-    abstracts, titles = extract_abstracts_from_ris_text(raw_text)
-
-    if not abstracts:
-        st.warning("El archivo RIS no contiene abstracts detectables (líneas con 'AB  -').")
+    if not titles:
+        # extract_titles_from_ris devuelve un título (o A<idx>) por registro: la lista vacía es un RIS sin registros
+        st.warning("El archivo RIS no contiene registros detectables (entradas que terminan en 'ER  -').")
         if st.button("🏠 Volver al Home"):
             st.session_state.current_view = "home"
         return
 
-    st.markdown(f"**Abstracts cargados:** {len(abstracts)}")
+    st.markdown(f"**Artículos cargados:** {len(titles)}")
 
     # Mostrar lista y permitir selección múltiple
     show_table = st.checkbox("Mostrar lista de títulos / abstracts (tabla)")
     if show_table:
         df_view = pd.DataFrame({
-            "idx": list(range(len(abstracts))),
+            "idx": list(range(len(titles))),
             "title": titles,
-            "abstract_preview": [a[:200] for a in abstracts]
+            "abstract_preview": [a[:200] for a in extract_abstracts_from_ris(DEFAULT_RIS_PATH)]
         })
         st.dataframe(df_view)
 
     selected = st.multiselect(
         "Selecciona 2 o más artículos (por índice) para analizar:",
-        options=list(range(len(abstracts))),
+        options=list(range(len(titles))),
         format_func=lambda x: f"{x} - {titles[x]}",
-        default=[0, 1] if len(abstracts) > 1 else [0]
+        default=[0, 1] if len(titles) > 1 else [0]
     )
     
     if len(selected) < 2:
@@ -126,43 +114,28 @@ def similitud_view():
     else:
         # Opciones de preprocesamiento
         sample_truncate = st.number_input("Truncar abstracts a N caracteres (0 = sin truncar):", min_value=0, value=1000)
-        abstracts_sel = [abstracts[i][:sample_truncate] if sample_truncate>0 else abstracts[i] for i in selected]
+        abstracts_sel = [ab[:sample_truncate] if sample_truncate>0 else ab
+                         for ab in extract_abstracts_from_ris(DEFAULT_RIS_PATH, selected)]
         labels = [f"A{idx}" for idx in selected]
 
         st.markdown("### ▶ Ejecutar algoritmos de similitud")
+        metricas = st.multiselect("Métricas:", options=list(METRICS), default=list(DEFAULT_METRICS))
         if st.button("Calcular similitudes"):
             with st.spinner("Calculando similitudes..."):
                 n = len(abstracts_sel)
-                pair_idxs = build_pair_indices(n)
-
-                # 1) Clásicos por pares: Jaccard, Dice, Levenshtein
-                jac_pairs, dice_pairs, lev_pairs = compute_pairwise_classics(abstracts_sel, pair_idxs)
-
-                # 2) TF-IDF Cosine (matriz completa)
-                tfidf_mat = tfidf_cosine_similarity(abstracts_sel)
 
-                # 3) SBERT Cosine (modelo IA)
-                sbert_mat = sbert_cosine_similarity(abstracts_sel)
-
-                # Convertir pares a matrices
-                lev_mat = pair_results_to_matrix(lev_pairs, n)
-                jac_mat = pair_results_to_matrix(jac_pairs, n)
-                dice_mat = pair_results_to_matrix(dice_pairs, n)
-
-                results = {
-                    "Levenshtein": (lev_mat, labels),
-                    "Jaccard": (jac_mat, labels),
-                    "Dice": (dice_mat, labels),
-                    "TFIDF_Cosine": (tfidf_mat, labels),
-                    "SBERT_Cosine": (sbert_mat, labels)
-                }
+                # Un solo motor para las 5 métricas (y las que se registren): cada representación
+                # (tokens, TF-IDF, embeddings SBERT) se construye una vez y las métricas van en paralelo
+                condensed, timings = compute_similarities(abstracts_sel, metrics=metricas)
+                results = {name: (CondensedMatrix(values, n), labels) for name, values in condensed.items()}
 
                 st.success("Cálculo completado ✅")
+                st.dataframe(pd.DataFrame({"paso": list(timings), "segundos": list(timings.values())}))
 
                 # Mostrar matrices y permitir descargar
                 for name, (mat, lab) in results.items():
                     st.subheader(name)
-                    dfm = pd.DataFrame(mat, index=lab, columns=lab)
+                    dfm = pd.DataFrame(mat.to_square(), index=lab, columns=lab)
                     st.dataframe(dfm.style.format("{:.4f}"))
                     # explicación paso a paso (ver sección explicativa abajo)
                     if st.expander(f"Mostrar explicación matemática y algorítmica de {name}", expanded=False):
@@ -211,7 +184,27 @@ def show_algorithm_explanation(name):
 3. *Normalización* (para convertir a similitud entre 0 y 1): usamos `sim = 1 - dist / max(len(a), len(b))`.
    - Si `a==b` => `sim = 1.0`.
    - Si cadenas muy distintas, `sim` se aproxima a 0.
-4. *Complejidad*: O(n*m) tiempo y O(n*m) memoria (se puede optimizar a O(min(n,m)) en memoria).
+4. *Complejidad*: O(n*m) tiempo y O(n*m) memoria con la tabla DP completa.
+   La implementación usa el paquete C `Levenshtein` o el algoritmo bit-paralelo de Myers/Hyyrö:
+   cada columna de la tabla se guarda en enteros de bits, O(min(n,m)) memoria y O(n*m/64) operaciones.
+""")
+    elif name == "Levenshtein_Tokens":
+        st.write("""
+**Levenshtein por tokens (palabras)** — métrica opcional (no se calcula por defecto; hay que seleccionarla) — explicación paso a paso:
+
+1. *Definición*: la misma distancia de edición, pero las operaciones (inserción, borrado, sustitución) actúan sobre palabras enteras en lugar de caracteres.
+2. *Preprocesamiento*:
+   - Tokenizamos con la misma regla que Jaccard y Dice (`normalize_text`: minúsculas y tokens alfanuméricos).
+   - Cada token recibe un id entero de un vocabulario común; cada abstract queda como una secuencia de ids.
+3. *Cálculo*:
+   - Misma recurrencia DP que Levenshtein: `cost = 0` si `a[i-1]==b[j-1]` (mismo id de token), si no `1`.
+   - En la práctica no se llena la tabla en Python: cada id se codifica como un carácter Unicode (un carácter por palabra)
+     y la secuencia se pasa al mismo backend que Levenshtein (paquete C `Levenshtein` o Myers/Hyyrö bit-paralelo).
+   - Si el vocabulario tiene más ids de los que se pueden codificar, se renumeran solo los tokens del par comparado.
+   - La DP por bandas (`token_edit_distance_banded`, solo celdas con `|i - j| <= k`) se conserva como referencia y para los benchmarks.
+4. *Normalización*: `sim = 1 - dist / max(tokens(a), tokens(b))`.
+5. *Ventajas*: un abstract tiene ~150 tokens frente a ~1.000 caracteres, así que la tabla DP es unas 50 veces más pequeña;
+   además mide diferencias de contenido (palabras cambiadas) y no de tipografía (acentos, guiones, mayúsculas).
 """)
     elif name == "Jaccard":
         st.write("""
@@ -228,6 +221,8 @@ def show_algorithm_explanation(name):
    - Si ambos conjuntos vacíos, definimos similitud = 1.0 (caso especial).
 4. *Interpretación*: J=1 → conjuntos idénticos; J=0 → sin tokens comunes.
 5. *Complejidad*: O(|A| + |B|) promedio (para construir sets y calcular inter/union).
+6. *Todos los pares a la vez*: con la matriz binaria dispersa X (documento x token),
+   `|A ∩ B|` de todos los pares es `X @ X.T` y `|A ∪ B| = |A| + |B| - |A ∩ B|` sale de las sumas por fila.
 """)
     elif name == "Dice":
         st.write("""
@@ -1,69 +1,12 @@
 import streamlit as st
 import os
 import tempfile
-import unicodedata
-import re
-from collections import defaultdict
-
-# === Función para normalizar texto ===
-def normalize(text):
-    """
-    Normaliza un texto para comparación:
-    - Maneja None/string vacíos
-    - Pasa a minúsculas
-    - Elimina acentos
-    - Quita puntuación (queda solo letras, números y espacios)
-    - Elimina espacios al inicio/fin
-    """
-    if not text:
-        return ""
-    # Minúsculas
-    text = text.lower()
-    # Normalizar y eliminar acentos
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join([c for c in text if not unicodedata.combining(c)])
-    # Eliminar puntuación y símbolos especiales, excepto letras, números y espacios
-    text = re.sub(r"[^\w\s]", "", text)
-    # Quitar espacios innecesarios
-    return text.strip()
-
-
-# === Función para procesar archivo RIS y separar únicos/duplicados por título normalizado ===
-def process_ris_file(input_path, unique_output, duplicate_output):
-    """
-    Lee un archivo RIS desde 'input_path', agrupa artículos por título normalizado
-    y escribe dos archivos: uno con artículos únicos y otro con los duplicados.
-    """
-    articles = defaultdict(list)  # Diccionario para agrupar artículos por título normalizado
-
-    with open(input_path, "r", encoding="utf-8") as file:  # Abre el archivo RIS en modo lectura
-        current_article, current_title = [], None  # Inicializa las variables para almacenar un artículo
-        for line in file:  # Itera sobre cada línea del archivo
-            if line.startswith("TY  -"):  # Detecta el inicio de un nuevo artículo
-                if current_article and current_title:  # Guarda el artículo anterior si ya existe
-                    articles[normalize(current_title)].append(current_article)  # Agrupa por título
-                current_article, current_title = [line], None  # Reinicia el artículo actual
-            else:
-                current_article.append(line)  # Agrega la línea actual al artículo
-                if line.startswith(("TI  -", "T1  -")):  # Detecta el título del artículo
-                    # Extrae el título removiendo el prefijo y posibles espacios
-                    # Notar que en RIS el título suele comenzar en la posición después del 'TI  - '
-                    current_title = line.split(" - ", 1)[1].strip() if " - " in line else line[6:].strip()
-
-        # Guarda el último artículo leído antes de finalizar
-        if current_article and current_title:
-            articles[normalize(current_title)].append(current_article)
-
-    # Escribe los artículos únicos y duplicados en sus respectivos archivos
-    with open(unique_output, "w", encoding="utf-8") as u, open(duplicate_output, "w", encoding="utf-8") as d:
-        for entries in articles.values():  # Itera sobre cada grupo de artículos
-            # Escribe el primer artículo del grupo como "único"
-            u.writelines(entries[0] + ["\n"])
-            # Si hay más de uno en el grupo, escribimos los siguientes como duplicados
-            if len(entries) > 1:
-                # concatenamos todas las listas (cada artículo es una lista de líneas)
-                d.writelines(sum(entries[1:], []) + ["\n"])
+import sys
 
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Requisito1.deduplicacion import process_ris_file
 
 # === INTERFAZ PRINCIPAL ===
 def unificacion_ris_view():
@@ -80,13 +23,23 @@ def unificacion_ris_view():
 
         st.success("Archivo subido correctamente y listo para procesar.")
 
+        # Modo de detección: títulos idénticos o casi-duplicados (MinHash + LSH sobre título + abstract)
+        modo = st.radio(
+            "Modo de detección de duplicados",
+            ["exacto", "similar"],
+            format_func=lambda m: "Título normalizado idéntico" if m == "exacto" else "Casi-duplicados (MinHash-LSH)",
+        )
+        umbral = 0.8
+        if modo == "similar":
+            umbral = st.slider("Umbral de similitud de Jaccard", 0.5, 1.0, 0.8, 0.05)
+
         # Crear ficheros de salida temporales
         tmp_dir = tempfile.mkdtemp()
         unique_path = os.path.join(tmp_dir, "articulos_unicos.ris")
         duplicate_path = os.path.join(tmp_dir, "articulos_duplicados.ris")
 
-        # Procesar archivo (agrupa por título normalizado y separa duplicados)
-        process_ris_file(input_path, unique_path, duplicate_path)
+        # Procesar archivo (agrupa por título normalizado, o por similitud, y separa duplicados)
+        grupos = process_ris_file(input_path, unique_path, duplicate_path, mode=modo, threshold=umbral)
 
         # Leer resultados para mostrar conteos y previsualizar
         def contar_registros_ris(path):
@@ -104,6 +57,13 @@ def unificacion_ris_view():
 
         st.markdown(f"**✅ Registros únicos:** {n_unicos}")
         st.markdown(f"**⚠️ Registros duplicados:** {n_duplicados}")
+        st.markdown(f"**🔗 Grupos de duplicados:** {len(grupos)}")
+
+        if grupos:
+            with st.expander("Ver grupos de duplicados (el primer título es el que se conserva)"):
+                for i, grupo in enumerate(grupos[:200], start=1):
+                    st.markdown(f"**Grupo {i}** ({len(grupo)} registros)")
+                    st.text("\n".join(grupo))
 
         # Mostrar una previsualización (primeros 5000 caracteres) de cada archivo si existen
         if n_unicos > 0:
@@ -9,7 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from Requisito5.graficos import generar_mapa_calor, generar_linea_tiempo, generar_nube_palabras
 from Requisito5.exportar_pdf import exportar_pdf
-from Requisito3.analizar_abstracts import parse_large_ris
+from Requisito3.cache_corpus import load_corpus
 
 # Ruta RIS por defecto (ajusta si la tienes en otra ubicación)
 DEFAULT_RIS_PATH = "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris"
@@ -26,16 +26,15 @@ def visual_view():
             st.session_state.current_view = "home"
         return
 
-    # Cargar registros RIS (usa tu parser parse_large_ris)
-    entries = list(parse_large_ris(DEFAULT_RIS_PATH))
-    if not entries:
+    # Cargar registros RIS (solo los campos que usan los gráficos, desde la caché columnar)
+    import pandas as pd
+    df = pd.DataFrame(load_corpus(DEFAULT_RIS_PATH).records(fields=("AB", "KW", "PY", "JO", "CY")))
+    if df.empty:
         st.warning("No se encontraron abstracts en el archivo RIS.")
         return
 
     # Preparar texto completo para la nube (abstracts + keywords)
     # Detectar columnas como en tu script main5
-    import pandas as pd
-    df = pd.DataFrame(entries)
     abstract_col = next((c for c in ["AB", "Abstract"] if c in df.columns), None)
     keywords_col = next((c for c in ["KW", "Keywords"] if c in df.columns), None)
     texto_completo = ""
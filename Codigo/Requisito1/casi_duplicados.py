@@ -0,0 +1,123 @@
+import numpy as np
+from collections import defaultdict
+
+"""
+Detección de casi-duplicados con MinHash + LSH.
+Cada texto (título + abstract normalizados) se convierte en su conjunto de k-gramas de caracteres,
+del que se calcula una firma MinHash de `num_perm` valores. La firma se parte en bandas (LSH):
+dos registros solo se comparan si coinciden en al menos una banda completa, así que el coste es
+aproximadamente lineal en el número de registros en lugar de cuadrático.
+Dentro de cada cubo, cada registro se compara con el primero (una vez, no todos los pares); si la
+similitud de Jaccard estimada supera el umbral se unen con union-find, de modo que el resultado son
+grupos (clusters) de duplicados y no solo pares.
+"""
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+_BASE = np.uint64(1099511628211)  # base del hash polinómico de los k-gramas (primo FNV de 64 bits)
+_SEED = 20250
+
+
+def shingle_hashes(text, k=5):
+    """Hashes (uint64) únicos de los k-gramas de caracteres del texto (hash polinómico vectorizado)."""
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) == 0:
+        return data
+    if len(data) <= k:
+        k = len(data)
+    n = len(data) - k + 1
+    h = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(k):
+            h = h * _BASE + data[j:j + n]
+    return np.unique(h)
+
+
+def _permutations(num_perm, seed=_SEED):
+    """Coeficientes (a impar, b) de la familia multiply-shift, uno por permutación."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(hashes, a, b):
+    """Firma MinHash (uint32): mínimo de cada permutación sobre los hashes de los k-gramas."""
+    if len(hashes) == 0:
+        return np.full(len(a), 0xFFFFFFFF, dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, a) + b) >> np.uint64(32)
+    return (permuted & _MASK32).min(axis=0).astype(np.uint32)
+
+
+def lsh_params(num_perm, threshold):
+    """
+    Elige bandas b y filas r (b * r = num_perm) de forma que el punto de corte de LSH,
+    aproximadamente (1/b)^(1/r), quede lo más cerca posible del umbral de Jaccard.
+    """
+    best = None
+    for r in range(1, num_perm + 1):
+        if num_perm % r:
+            continue
+        b = num_perm // r
+        error = abs((1 / b) ** (1 / r) - threshold)
+        if best is None or error < best[0]:
+            best = (error, b, r)
+    return best[1], best[2]
+
+
+class _UnionFind:
+    """Union-find con compresión de caminos; la raíz de cada grupo es su índice más pequeño."""
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def near_duplicate_groups(texts, threshold=0.8, num_perm=128, shingle_size=5, seed=_SEED):
+    """
+    Agrupa los textos casi duplicados. Devuelve una lista de grupos (listas de posiciones),
+    incluidos los de un solo elemento, ordenados por su primer elemento.
+    En cada cubo LSH los miembros solo se verifican contra el primero, así el coste es lineal en
+    el tamaño del cubo; dos miembros parecidos entre sí pero no al primero se unen solo si
+    coinciden en el cubo de otra banda.
+    """
+    a, b = _permutations(num_perm, seed)
+    bands, rows = lsh_params(num_perm, threshold)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        signatures[i] = minhash_signature(shingle_hashes(text, shingle_size), a, b)
+
+    uf = _UnionFind(len(texts))
+    for band in range(bands):
+        buckets = defaultdict(list)
+        block = signatures[:, band * rows:(band + 1) * rows]
+        for i in range(len(texts)):
+            buckets[block[i].tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Cada miembro se verifica una sola vez, contra el primero del cubo (no todos los pares):
+            # se saltan los que ya están en su grupo y los demás se comparan con una operación vectorizada
+            first, root = members[0], uf.find(members[0])
+            rest = np.array([i for i in members[1:] if uf.find(i) != root], dtype=np.int64)
+            if len(rest) == 0:
+                continue
+            matches = np.count_nonzero(signatures[rest] == signatures[first], axis=1) >= threshold * num_perm
+            for i in rest[matches].tolist():
+                uf.union(first, i)
+
+    groups = defaultdict(list)
+    for i in range(len(texts)):
+        groups[uf.find(i)].append(i)
+    return [groups[root] for root in sorted(groups)]
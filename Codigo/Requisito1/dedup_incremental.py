@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ris import hash64, iter_raw_records, normalize_title, record_doi_hash, record_title
+
+"""
+Deduplicación incremental contra un índice persistente de articulos_unicos.ris.
+El índice vive en <unicos>.dedup/ y guarda los hashes de 64 bits del título normalizado y del DOI:
+- titulos.npy / dois.npy   base ordenada (se abre con mmap y se consulta con búsqueda binaria)
+- log.bin                  pares (título, DOI) añadidos después de la última compactación
+- meta.json                tamaño y fecha del RIS al escribir el índice (si no coinciden, se reconstruye)
+Así, añadir una exportación nueva cuesta un tiempo proporcional a la exportación, no al corpus.
+"""
+
+INDEX_SUFFIX = ".dedup"
+_LOG_DTYPE = np.dtype([("title", "<u8"), ("doi", "<u8")])
+
+
+def _source_stat(ris_path):
+    stat = os.stat(ris_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class IndiceUnicos:
+    """Conjunto persistente de hashes (título, DOI) de los artículos únicos."""
+
+    def __init__(self, unique_path):
+        self.unique_path = unique_path
+        self.directory = unique_path + INDEX_SUFFIX
+        self.titles = np.empty(0, dtype=np.uint64)
+        self.dois = np.empty(0, dtype=np.uint64)
+        self.log_titles, self.log_dois = set(), set()
+        self.pending = []
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @classmethod
+    def load(cls, unique_path):
+        """Abre el índice; lo reconstruye si no existe o si el RIS cambió fuera de este módulo."""
+        index = cls(unique_path)
+        try:
+            with open(index._path("meta.json"), encoding="utf-8") as f:
+                current = json.load(f)["fuente"] == _source_stat(unique_path)
+        except (OSError, ValueError, KeyError):
+            current = False
+        if not current:
+            return cls.build(unique_path)
+
+        index.titles = np.load(index._path("titulos.npy"), mmap_mode="r")
+        index.dois = np.load(index._path("dois.npy"), mmap_mode="r")
+        log = np.fromfile(index._path("log.bin"), dtype=_LOG_DTYPE)
+        index.log_titles = set(log["title"].tolist())
+        index.log_dois = set(log["doi"].tolist()) - {0}
+        return index
+
+    @classmethod
+    def build(cls, unique_path):
+        """Recorre el RIS de únicos una vez y escribe la base ordenada."""
+        index = cls(unique_path)
+        titles, dois = [], []
+        if os.path.exists(unique_path):
+            for _, entry in iter_raw_records(unique_path, fields=("TI", "T1", "DO")):
+                title = record_title(entry)
+                if title:
+                    titles.append(hash64(normalize_title(title)))
+                    dois.append(record_doi_hash(entry))
+        index.titles = np.unique(np.array(titles, dtype=np.uint64))
+        index.dois = np.setdiff1d(np.array(dois, dtype=np.uint64), [0])
+        index._write_base()
+        return index
+
+    def _write_base(self):
+        os.makedirs(self.directory, exist_ok=True)
+        np.save(self._path("titulos.npy"), self.titles)
+        np.save(self._path("dois.npy"), self.dois)
+        open(self._path("log.bin"), "wb").close()
+        self.log_titles, self.log_dois = set(), set()
+        self._write_meta()
+
+    def _write_meta(self):
+        stat = _source_stat(self.unique_path) if os.path.exists(self.unique_path) else [0, 0]
+        with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"fuente": stat}, f)
+
+    @staticmethod
+    def _in_sorted(array, value):
+        pos = np.searchsorted(array, np.uint64(value))
+        return pos < len(array) and array[pos] == value
+
+    def contains(self, title_hash, doi_hash):
+        """El artículo ya está si coincide su título normalizado o su DOI (si tiene)."""
+        if title_hash in self.log_titles or self._in_sorted(self.titles, title_hash):
+            return True
+        return doi_hash != 0 and (doi_hash in self.log_dois or self._in_sorted(self.dois, doi_hash))
+
+    def add(self, title_hash, doi_hash):
+        self.log_titles.add(title_hash)
+        if doi_hash:
+            self.log_dois.add(doi_hash)
+        self.pending.append((title_hash, doi_hash))
+
+    def flush(self):
+        """Añade al log los hashes nuevos y registra el estado actual del RIS."""
+        if self.pending:
+            with open(self._path("log.bin"), "ab") as f:
+                f.write(np.array(self.pending, dtype=_LOG_DTYPE).tobytes())
+            self.pending = []
+        self._write_meta()
+        if len(self.log_titles) > max(10000, len(self.titles) // 20):
+            self.compact()
+
+    def compact(self):
+        """Fusiona el log con la base ordenada (coste lineal, amortizado entre muchas altas)."""
+        self.titles = np.union1d(self.titles, np.array(list(self.log_titles), dtype=np.uint64))
+        self.dois = np.union1d(self.dois, np.array(list(self.log_dois), dtype=np.uint64))
+        self._write_base()
+
+
+def append_new_export(export_path, unique_path, duplicate_path):
+    """
+    Añade a `unique_path` los artículos de `export_path` que aún no están (por título normalizado o DOI)
+    y agrega los repetidos a `duplicate_path`. Devuelve (nuevos, duplicados, sin título).
+    """
+    index = IndiceUnicos.load(unique_path)
+    new = duplicates = untitled = 0
+    with open(unique_path, "ab") as u, open(duplicate_path, "ab") as d:
+        for raw, entry in iter_raw_records(export_path, fields=("TI", "T1", "DO")):
+            title = record_title(entry)
+            if not title:
+                untitled += 1
+                continue
+            title_hash, doi_hash = hash64(normalize_title(title)), record_doi_hash(entry)
+            if index.contains(title_hash, doi_hash):
+                d.write(raw + b"\n")
+                duplicates += 1
+            else:
+                u.write(raw + b"\n")
+                index.add(title_hash, doi_hash)
+                new += 1
+    index.flush()
+    return new, duplicates, untitled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requisito1 - añade una exportación nueva al RIS de únicos")
+    parser.add_argument("--nuevo", type=str, required=True, help="Archivo RIS exportado (ScienceDirect, SAGE, ...)")
+    parser.add_argument("--unicos", type=str, default="articulos_unicos.ris", help="RIS de artículos únicos")
+    parser.add_argument("--duplicados", type=str, default="articulos_duplicados.ris", help="RIS de duplicados")
+    args = parser.parse_args()
+
+    nuevos, duplicados, sin_titulo = append_new_export(args.nuevo, args.unicos, args.duplicados)
+    print(f"Nuevos: {nuevos} | Duplicados: {duplicados} | Sin título: {sin_titulo}")
@@ -0,0 +1,296 @@
+import os
+import sys
+import hashlib
+import heapq
+import shutil
+import struct
+import argparse
+import tempfile
+from collections import defaultdict
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ris import iter_raw_records, normalize_title, record_title
+from Requisito1.casi_duplicados import near_duplicate_groups
+
+"""
+Esta clase separa los artículos de un archivo RIS fusionado en únicos y duplicados.
+La lectura la hace el motor `ris` en modo de líneas originales: cada registro se copia
+byte a byte al archivo de salida, sin decodificarlo ni volver a formatearlo.
+Hay dos modos:
+- "exacto": duplicados = títulos normalizados idénticos
+- "similar": además agrupa casi-duplicados (erratas, subtítulos, títulos truncados) con
+  MinHash + LSH sobre título + abstract y un umbral de Jaccard configurable
+Para fusiones más grandes que la RAM, process_ris_file_external hace el modo exacto con memoria
+acotada: reparte los registros en particiones en disco según el hash del título, deduplica cada
+partición por separado y mezcla los resultados en el orden original.
+"""
+
+MODES = ("exacto", "similar")
+# Particiones abiertas a la vez al repartir y tramos abiertos a la vez al mezclar
+FANOUT = 64
+# número de registro, longitud del título normalizado, longitud del registro
+_PARTITION_HEADER = struct.Struct("<qII")
+# clave de orden, número de registro, longitud del registro
+_RUN_HEADER = struct.Struct("<qqI")
+# Memoria aproximada de una entrada de dict o de lista de tuplas además de sus bytes
+_ENTRY_OVERHEAD = 128
+
+
+def _record_abstract(entry):
+    ab = entry.get("AB") or ""
+    return " ".join(ab) if isinstance(ab, list) else ab
+
+
+def _title_groups(input_path, fields):
+    """Agrupa los registros (bytes originales) por título normalizado; descarta los que no tienen título."""
+    articles = defaultdict(list)  # Diccionario para agrupar artículos por título normalizado
+    abstracts = {}
+    for raw, entry in iter_raw_records(input_path, fields=fields):
+        title = record_title(entry)
+        if title:
+            key = normalize_title(title)
+            articles[key].append(raw)
+            abstracts.setdefault(key, _record_abstract(entry))
+    return articles, abstracts
+
+
+# === Función para procesar archivo RIS y separar únicos/duplicados por título normalizado ===
+def process_ris_file(input_path, unique_output, duplicate_output, mode="exacto",
+                     threshold=0.8, num_perm=128, shingle_size=5):
+    """
+    Lee un archivo RIS desde 'input_path', agrupa artículos por título normalizado
+    y escribe dos archivos: uno con artículos únicos y otro con los duplicados.
+    Los artículos sin título se descartan.
+    Con mode="similar" los grupos de títulos se fusionan además cuando la similitud de Jaccard
+    (estimada con MinHash) de título + abstract supera `threshold`.
+    Devuelve los grupos de duplicados como listas de títulos normalizados (el primero es el que se conserva).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo desconocido: {mode}. Opciones: {MODES}")
+
+    fields = ("TI", "T1", "AB") if mode == "similar" else ("TI", "T1")
+    articles, abstracts = _title_groups(input_path, fields)
+
+    keys = list(articles)
+    if mode == "similar":
+        texts = [f"{key} {normalize_title(abstracts[key])}" for key in keys]
+        clusters = near_duplicate_groups(texts, threshold, num_perm, shingle_size)
+    else:
+        clusters = [[k] for k in range(len(keys))]
+
+    # Escribe los artículos únicos y duplicados en sus respectivos archivos
+    duplicate_groups = []
+    with open(unique_output, "wb") as u, open(duplicate_output, "wb") as d:
+        for cluster in clusters:  # Itera sobre cada grupo de artículos
+            entries = [raw for k in cluster for raw in articles[keys[k]]]
+            # Escribe el primer artículo del grupo como "único"
+            u.write(entries[0] + b"\n")
+            # Si hay más de uno en el grupo, escribimos los siguientes como duplicados
+            for raw in entries[1:]:
+                d.write(raw + b"\n")
+            if len(entries) > 1:
+                duplicate_groups.append([keys[k] for k in cluster for _ in articles[keys[k]]])
+    return duplicate_groups
+
+
+# === Deduplicación exacta con memoria acotada (particiones en disco) ===
+def parse_memory_limit(text):
+    """Convierte '512M', '2G', '300K' o un número de MiB en bytes."""
+    text = str(text).strip().upper().rstrip("B")
+    units = {"K": 2**10, "M": 2**20, "G": 2**30}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text) * 2**20)
+
+
+def _read_partition(path):
+    with open(path, "rb") as f:
+        while True:
+            head = f.read(_PARTITION_HEADER.size)
+            if not head:
+                return
+            seq, key_len, raw_len = _PARTITION_HEADER.unpack(head)
+            yield seq, f.read(key_len), f.read(raw_len)
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            head = f.read(_RUN_HEADER.size)
+            if not head:
+                return
+            order, seq, raw_len = _RUN_HEADER.unpack(head)
+            yield order, seq, f.read(raw_len)
+
+
+def _write_run(path, rows):
+    with open(path, "wb") as f:
+        for order, seq, raw in rows:
+            f.write(_RUN_HEADER.pack(order, seq, len(raw)))
+            f.write(raw)
+
+
+def _partition_of(key, n_parts, level):
+    # Cada nivel usa otra semilla del hash para que una partición se reparta de verdad al dividirla
+    digest = hashlib.blake2b(key, digest_size=8, person=level.to_bytes(8, "little")).digest()
+    return int.from_bytes(digest, "little") % n_parts
+
+
+def _split(records, work_dir, n_parts, level):
+    """Reparte (seq, clave, registro) en n_parts archivos según el hash de la clave (conserva el orden)."""
+    paths = [tempfile.mkstemp(prefix=f"particion_{level}_", suffix=".bin", dir=work_dir) for _ in range(n_parts)]
+    handles = [os.fdopen(fd, "wb") for fd, _ in paths]
+    try:
+        for seq, key, raw in records:
+            out = handles[_partition_of(key, n_parts, level)]
+            out.write(_PARTITION_HEADER.pack(seq, len(key), len(raw)))
+            out.write(key)
+            out.write(raw)
+    finally:
+        for handle in handles:
+            handle.close()
+    return [path for _, path in paths]
+
+
+class _PartitionTooLarge(Exception):
+    """La partición tiene más títulos distintos de los que caben en el límite de memoria."""
+
+
+def _dedup_partition(path, work_dir, limit):
+    """
+    Deduplica una partición (en orden de número de registro). En memoria solo queda
+    título -> primer registro: los únicos se escriben directamente a su tramo (ya están en orden) y los
+    duplicados se acumulan hasta limit / 4 bytes y se vuelcan en tramos ordenados por
+    (primer registro del grupo, número de registro).
+    Lanza _PartitionTooLarge si los títulos distintos no caben en limit / 2.
+    Devuelve (tramo de únicos, tramos de duplicados, número de únicos, número de duplicados).
+    """
+    first_seen, keys_bytes = {}, 0
+    duplicates, duplicates_bytes, duplicate_runs = [], 0, []
+    n_unique = n_duplicate = 0
+
+    def spill():
+        duplicates.sort(key=lambda row: (row[0], row[1]))
+        fd, run = tempfile.mkstemp(prefix="duplicados_", suffix=".run", dir=work_dir)
+        os.close(fd)
+        _write_run(run, duplicates)
+        duplicate_runs.append(run)
+        duplicates.clear()
+
+    fd, unique_run = tempfile.mkstemp(prefix="unicos_", suffix=".run", dir=work_dir)
+    try:
+        with os.fdopen(fd, "wb") as uniques:
+            for seq, key, raw in _read_partition(path):
+                first = first_seen.setdefault(key, seq)
+                if first == seq:
+                    keys_bytes += len(key) + _ENTRY_OVERHEAD
+                    if keys_bytes > limit // 2 and len(first_seen) > 1:
+                        raise _PartitionTooLarge()
+                    uniques.write(_RUN_HEADER.pack(seq, seq, len(raw)))
+                    uniques.write(raw)
+                    n_unique += 1
+                else:
+                    duplicates.append((first, seq, raw))
+                    duplicates_bytes += len(raw) + _ENTRY_OVERHEAD
+                    n_duplicate += 1
+                    if duplicates_bytes > limit // 4:
+                        spill()
+                        duplicates_bytes = 0
+        if duplicates:
+            spill()
+    except _PartitionTooLarge:
+        for run in [unique_run] + duplicate_runs:
+            os.remove(run)
+        raise
+    return unique_run, duplicate_runs, n_unique, n_duplicate
+
+
+def _merge_runs(runs, work_dir):
+    """Mezcla tramos ordenados de FANOUT en FANOUT hasta que quedan como mucho FANOUT."""
+    while len(runs) > FANOUT:
+        merged = []
+        for start in range(0, len(runs), FANOUT):
+            group = runs[start:start + FANOUT]
+            fd, run = tempfile.mkstemp(prefix="mezcla_", suffix=".run", dir=work_dir)
+            os.close(fd)
+            _write_run(run, heapq.merge(*(_read_run(r) for r in group)))
+            for r in group:
+                os.remove(r)
+            merged.append(run)
+        runs = merged
+    return runs
+
+
+def process_ris_file_external(input_path, unique_output, duplicate_output, memory_limit="256M", tmp_dir=None):
+    """
+    Igual que process_ris_file en modo exacto (mismos archivos de salida), pero con memoria acotada
+    sea cual sea el tamaño de la entrada:
+    1. Se reparte cada registro en particiones en disco según el hash de su título normalizado
+       (como mucho FANOUT archivos abiertos a la vez).
+    2. Cada partición se deduplica por separado guardando en memoria solo título -> primer registro;
+       si sus títulos distintos no caben en `memory_limit` se vuelve a repartir con otra semilla.
+       Un título muy repetido no es problema: sus duplicados se vuelcan en tramos ordenados.
+    3. Los tramos de únicos y duplicados se mezclan (heapq.merge, por pasadas de FANOUT tramos) en el
+       orden del modo en memoria.
+    Devuelve (número de únicos, número de duplicados).
+    """
+    limit = parse_memory_limit(memory_limit)
+    # Cada byte de la partición ocupa aproximadamente el doble en memoria (bytes + dict)
+    n_parts = min(FANOUT, max(1, -(-2 * os.path.getsize(input_path) // limit)))
+    work_dir = tempfile.mkdtemp(prefix="dedup_", dir=tmp_dir)
+    try:
+        def records():
+            for seq, (raw, entry) in enumerate(iter_raw_records(input_path, fields=("TI", "T1"))):
+                title = record_title(entry)
+                if title:
+                    yield seq, normalize_title(title).encode("utf-8"), raw
+
+        pending = [(path, 1) for path in _split(records(), work_dir, n_parts, 0)]
+        n_unique = n_duplicate = 0
+        unique_runs, duplicate_runs = [], []
+        while pending:
+            path, level = pending.pop()
+            try:
+                unique_run, runs, u, d = _dedup_partition(path, work_dir, limit)
+            except _PartitionTooLarge:
+                pending += [(sub, level + 1) for sub in _split(_read_partition(path), work_dir, FANOUT, level)]
+                os.remove(path)
+                continue
+            os.remove(path)
+            unique_runs.append(unique_run)
+            duplicate_runs += runs
+            n_unique += u
+            n_duplicate += d
+
+        for runs, output in ((unique_runs, unique_output), (duplicate_runs, duplicate_output)):
+            with open(output, "wb") as out:
+                for _, _, raw in heapq.merge(*(_read_run(run) for run in _merge_runs(runs, work_dir))):
+                    out.write(raw + b"\n")
+        return n_unique, n_duplicate
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requisito1 - separa artículos únicos y duplicados de un RIS")
+    parser.add_argument("--entrada", type=str, default="articulos_fusionados.ris", help="Archivo RIS fusionado")
+    parser.add_argument("--unicos", type=str, default="articulos_unicos.ris", help="Salida con artículos únicos")
+    parser.add_argument("--duplicados", type=str, default="articulos_duplicados.ris", help="Salida con duplicados")
+    parser.add_argument("--modo", choices=MODES, default="exacto", help="Detección exacta o de casi-duplicados")
+    parser.add_argument("--umbral", type=float, default=0.8, help="Umbral de Jaccard para el modo similar")
+    parser.add_argument("--memory-limit", type=str, default=None,
+                        help="Memoria máxima (ej. 512M, 2G): usa particiones en disco (solo modo exacto)")
+    args = parser.parse_args()
+
+    if args.memory_limit:
+        if args.modo != "exacto":
+            parser.error("--memory-limit solo está disponible en modo exacto")
+        n_unicos, n_duplicados = process_ris_file_external(
+            args.entrada, args.unicos, args.duplicados, memory_limit=args.memory_limit
+        )
+        print(f"Únicos: {n_unicos} | Duplicados: {n_duplicados}")
+    else:
+        grupos = process_ris_file(args.entrada, args.unicos, args.duplicados, mode=args.modo, threshold=args.umbral)
+        print(f"Grupos de duplicados: {len(grupos)}")
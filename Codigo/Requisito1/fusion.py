@@ -0,0 +1,138 @@
+import os
+import sys
+import glob
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ris import hash64, iter_raw_records, normalize_title, record_doi_hash, record_title
+
+"""
+Fusión y deduplicación en una sola pasada (sustituye a Requisito1.2 + Requisito1.3).
+Cada archivo de Bases_de_datos/<fuente>/*.ris lo lee un hilo productor que deja lotes de registros
+(bytes originales) en su propia cola acotada; el consumidor vacía las colas en orden fijo
+(fuente, archivo), así que el resultado es el mismo que leyendo los archivos uno detrás de otro.
+Un registro es duplicado si su DOI o su título normalizado ya aparecieron antes.
+Ya no se escribe articulos_fusionados.ris: los registros van directamente a únicos/duplicados.
+"""
+
+BASE_FOLDER = os.path.join(os.path.dirname(__file__), "..", "..", "Bases_de_datos")
+SOURCES = ("science_direct", "sage")
+_BATCH = 256
+_QUEUE_BATCHES = 8
+_END = object()
+
+
+def source_files(base_folder=BASE_FOLDER, sources=SOURCES):
+    """Lista (fuente, archivo) en orden determinista; las carpetas que no existen se omiten."""
+    return [
+        (source, path)
+        for source in sources
+        for path in sorted(glob.glob(os.path.join(base_folder, source, "*.ris")))
+    ]
+
+
+def _put(out, item, stop):
+    """Encola esperando mientras la cola esté llena; abandona si el consumidor se detuvo."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce(path, out, stop):
+    """Hilo productor: parsea el archivo y envía lotes de (bytes, registro) a su cola."""
+    try:
+        batch = []
+        for record in iter_raw_records(path, fields=("TI", "T1", "DO")):
+            batch.append(record)
+            if len(batch) == _BATCH:
+                if not _put(out, batch, stop):
+                    return
+                batch = []
+        if batch and not _put(out, batch, stop):
+            return
+        _put(out, _END, stop)
+    except BaseException as exc:
+        _put(out, exc, stop)
+
+
+def _consume(out):
+    while True:
+        item = out.get()
+        if item is _END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield from item
+
+
+def _merge(files, queues, counts, u, d):
+    """Consumidor: recorre las colas en orden fijo y separa únicos y duplicados."""
+    seen_titles, seen_dois = set(), set()
+    for (source, _), out in zip(files, queues):
+        stats = counts[source]
+        for raw, entry in _consume(out):
+            stats["registros"] += 1
+            title = record_title(entry)
+            if not title:
+                stats["sin_titulo"] += 1
+                continue
+            title_hash = hash64(normalize_title(title))
+            doi_hash = record_doi_hash(entry)
+            if title_hash in seen_titles or (doi_hash and doi_hash in seen_dois):
+                d.write(raw + b"\n")
+                stats["duplicados"] += 1
+            else:
+                u.write(raw + b"\n")
+                stats["unicos"] += 1
+            seen_titles.add(title_hash)
+            if doi_hash:
+                seen_dois.add(doi_hash)
+
+
+def merge_sources(unique_output, duplicate_output, base_folder=BASE_FOLDER, sources=SOURCES, workers=4):
+    """
+    Lee todas las fuentes a la vez (hasta `workers` archivos en paralelo), deduplica por DOI y título
+    normalizado sobre la marcha y escribe los artículos únicos y duplicados.
+    Devuelve un diccionario {fuente: {"registros", "unicos", "duplicados", "sin_titulo"}}.
+    """
+    files = source_files(base_folder, sources)
+    counts = {source: {"registros": 0, "unicos": 0, "duplicados": 0, "sin_titulo": 0} for source in sources}
+
+    queues = [queue.Queue(maxsize=_QUEUE_BATCHES) for _ in files]
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex, \
+            open(unique_output, "wb") as u, open(duplicate_output, "wb") as d:
+        for (_, path), out in zip(files, queues):
+            ex.submit(_produce, path, out, stop)
+        try:
+            _merge(files, queues, counts, u, d)
+        finally:
+            stop.set()
+    return counts
+
+
+def print_counts(counts):
+    print(f"{'Fuente':<16}{'Registros':>10}{'Únicos':>10}{'Duplicados':>12}{'Sin título':>12}")
+    for source, stats in counts.items():
+        print(f"{source:<16}{stats['registros']:>10}{stats['unicos']:>10}{stats['duplicados']:>12}{stats['sin_titulo']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requisito1 - fusiona y deduplica las fuentes en una sola pasada")
+    parser.add_argument("--base", type=str, default=BASE_FOLDER, help="Carpeta con una subcarpeta por fuente")
+    parser.add_argument("--fuentes", nargs="+", default=list(SOURCES), help="Subcarpetas a fusionar")
+    parser.add_argument("--unicos", type=str, default="articulos_unicos.ris", help="Salida con artículos únicos")
+    parser.add_argument("--duplicados", type=str, default="articulos_duplicados.ris", help="Salida con duplicados")
+    parser.add_argument("--workers", type=int, default=4, help="Archivos que se leen en paralelo")
+    args = parser.parse_args()
+
+    print_counts(merge_sources(args.unicos, args.duplicados, args.base, args.fuentes, args.workers))
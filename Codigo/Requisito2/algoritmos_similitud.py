@@ -1,27 +1,33 @@
-import Levenshtein
 import math
 from collections import Counter
-import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity as sk_cosine_sim
+import numpy as np
+
+from Requisito2.vocabulario import MAX_TOKEN_IDS, CorpusTokens, ids_to_text, tokenize, tokenize_corpus
+
+try:
+    import Levenshtein  # implementación en C (paquete python-Levenshtein / Levenshtein)
+except ImportError:
+    Levenshtein = None
 
 """
 Esta clase contiene los algoritmos de similitud utilizados para el requerimiento 2, entre los cuales se encuentran:
-- Distancia de Levenshtein (edit distance)
+- Distancia de Levenshtein (edit distance): paquete C si está instalado, si no Myers/Hyyrö bit-paralelo;
+  la programación dinámica original se conserva como referencia
+- Distancia de edición por tokens (palabras): los ids se codifican como caracteres y se usa el mismo
+  backend que Levenshtein; la DP por bandas (Ukkonen) queda como referencia para los benchmarks
 - Similitud de Jaccard (token-level)
 - Coeficiente de Sørensen–Dice (token-level)
+- Jaccard y Dice para todos los pares a la vez (matriz binaria dispersa documento x token, forma condensada)
 - Similitud de Cosine usando TF-IDF (vectorization statistical)
 """
 
 def normalize_text(text):
-    text = text.lower()
-    # tokenización simple: mantener letras y números
-    tokens = re.findall(r'\b[\w-]+\b', text)
-    return tokens
-
-# 1) Levenshtein distance (edit distance) - DP
-def levenshtein_distancia(a: str, b: str) -> int:
-    """Devuelve la distancia de edición (Levenshtein) entre a y b."""
+    # tokenización simple: mantener letras y números (regex compilada en vocabulario.TOKEN_RE)
+    return tokenize(text)
+
+# 1) Levenshtein distance (edit distance) - DP (referencia)
+def levenshtein_distancia_dp(a: str, b: str) -> int:
+    """Devuelve la distancia de edición (Levenshtein) entre a y b con la tabla DP completa (referencia)."""
     n, m = len(a), len(b)
     if n == 0:
         return m
@@ -40,14 +46,146 @@ def levenshtein_distancia(a: str, b: str) -> int:
                            dp[i-1][j-1] + cost)  # replace
     return dp[n][m]
 
-def normalized_levenshtein(a: str, b: str) -> float:
-    """Devuelve 1 - (distancia / max_len) para tener una similitud entre 0 y 1."""
+# 1b) Levenshtein bit-paralelo (Myers / Hyyrö)
+def levenshtein_distancia_myers(a: str, b: str, max_distance=None) -> int:
+    """
+    Distancia de Levenshtein con el algoritmo bit-paralelo de Myers (variante de Hyyrö).
+    Cada columna de la tabla DP se codifica en enteros de len(a) bits (a = la cadena más corta),
+    así que la memoria es O(min(n, m)) y cada carácter de b cuesta unas pocas operaciones de bits.
+    Con max_distance, si la distancia ya no puede quedar por debajo del límite se devuelve max_distance + 1.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    m, n = len(a), len(b)
+    if max_distance is not None and n - m > max_distance:
+        return max_distance + 1
+    if m == 0:
+        return n
+
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for j, c in enumerate(b):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        # Cota inferior: la última fila solo puede bajar 1 por cada carácter restante de b
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+def levenshtein_backend():
+    """Backend que usa levenshtein_distancia: 'c' (paquete Levenshtein) o 'myers'."""
+    return "c" if Levenshtein is not None else "myers"
+
+def levenshtein_distancia(a: str, b: str, max_distance=None) -> int:
+    """
+    Devuelve la distancia de edición (Levenshtein) entre a y b.
+    Con max_distance se abandonan los pares sin remedio y se devuelve max_distance + 1.
+    """
+    if Levenshtein is not None:
+        return Levenshtein.distance(a, b, score_cutoff=max_distance)
+    return levenshtein_distancia_myers(a, b, max_distance)
+
+def normalized_levenshtein(a: str, b: str, max_distance=None) -> float:
+    """
+    Devuelve 1 - (distancia / max_len) para tener una similitud entre 0 y 1.
+    Si la distancia supera max_distance el par se considera sin similitud (0.0).
+    """
     if a == b:
         return 1.0
-    dist = levenshtein_distancia(a, b)
+    dist = levenshtein_distancia(a, b, max_distance)
+    if max_distance is not None and dist > max_distance:
+        return 0.0
     max_len = max(len(a), len(b))
     return 1.0 - (dist / max_len) if max_len > 0 else 0.0
 
+# 1c) Levenshtein por tokens: las operaciones son insertar, borrar o sustituir palabras enteras
+def token_edit_distance_banded(a, b, max_distance=None) -> int:
+    """
+    Distancia de edición entre dos secuencias de ids de tokens con DP por bandas (Ukkonen): solo se
+    llenan las celdas con |i - j| <= banda. Sin max_distance la banda empieza en la diferencia de
+    longitudes y se duplica hasta que la distancia cabe en ella.
+    Con max_distance, si la distancia lo supera se devuelve max_distance + 1.
+    """
+    a, b = list(a), list(b)
+    if len(a) > len(b):
+        a, b = b, a
+    if max_distance is not None:
+        return _banded_distance(a, b, max_distance)
+    band = max(1, len(b) - len(a))
+    while True:
+        dist = _banded_distance(a, b, band)
+        if dist <= band or band >= len(b):
+            return dist
+        band *= 2
+
+
+def _banded_distance(a, b, band):
+    """DP por filas limitada a la banda; len(a) <= len(b). Devuelve band + 1 si no cabe."""
+    m, n = len(a), len(b)
+    over = band + 1
+    if n - m > band:
+        return over
+    prev = [j if j <= band else over for j in range(n + 1)]
+    for i in range(1, m + 1):
+        lo, hi = max(1, i - band), min(n, i + band)
+        cur = [over] * (n + 1)
+        cur[0] = i if i <= band else over
+        ai = a[i - 1]
+        best = cur[0] if lo == 1 else over
+        for j in range(lo, hi + 1):
+            value = prev[j - 1] + (ai != b[j - 1])
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            cur[j] = value if value < over else over
+            if value < best:
+                best = value
+        # Toda la fila fuera del límite: la distancia final también lo estará
+        if best >= over:
+            return over
+        prev = cur
+    return prev[n]
+
+
+def token_edit_distance(a, b, max_distance=None) -> int:
+    """
+    Distancia de edición por tokens entre dos secuencias de ids (p. ej. CorpusTokens.sequence(i)).
+    Cada secuencia se codifica como texto de un carácter por token (vocabulario.ids_to_text) y se
+    usa el backend rápido de levenshtein_distancia; el corte max_distance funciona igual.
+    """
+    a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+    both = np.concatenate((a, b))
+    if len(both) and (both.min() < 0 or both.max() >= MAX_TOKEN_IDS):
+        # Ids fuera del rango codificable: se renumeran solo los de este par
+        local = np.unique(both, return_inverse=True)[1].ravel()
+        a, b = local[:len(a)], local[len(a):]
+    return levenshtein_distancia(ids_to_text(a), ids_to_text(b), max_distance)
+
+
+def normalized_token_levenshtein(a: str, b: str, max_distance=None) -> float:
+    """
+    Similitud 1 - (distancia / max_tokens) entre dos textos con la distancia de edición por palabras.
+    Usa la misma tokenización que normalize_text; max_distance se cuenta en tokens.
+    """
+    corpus = tokenize_corpus([a, b])
+    return normalized_levenshtein(*corpus.sequence_texts(), max_distance=max_distance)
+
 # 2) Jaccard similarity (token-level)
 def jaccard_similitud(a: str, b: str) -> float:
     tokens_a = set(normalize_text(a))
@@ -67,16 +205,77 @@ def dice_coefficient(a: str, b: str) -> float:
     inter = len(tokens_a.intersection(tokens_b))
     return (2 * inter) / (len(tokens_a) + len(tokens_b)) if (len(tokens_a)+len(tokens_b)) > 0 else 0.0
 
+# 2b/3b) Jaccard y Dice de todos los pares con productos de matrices dispersas
+def binary_token_matrix(docs):
+    """
+    Matriz CSR binaria (n_docs x n_tokens): X[i, t] = 1 si el token t aparece en el documento i.
+    Usa la misma tokenización que jaccard_similitud / dice_coefficient (normalize_text).
+    `docs` puede ser una lista de textos o un CorpusTokens ya tokenizado.
+    """
+    corpus = docs if isinstance(docs, CorpusTokens) else tokenize_corpus(docs)
+    return corpus.binary_matrix()
+
+
+def set_similarity_condensed(intersections, sizes, kind="jaccard"):
+    """
+    Jaccard o Dice condensado (pares i < j) a partir de |A∩B| condensado y |A| de cada documento,
+    fila por fila: |A∪B| = |A| + |B| - |A∩B|, denominador de Dice = |A| + |B|. Los pares en los que
+    ambos documentos no tienen tokens valen 1.0, como en jaccard_similitud / dice_coefficient.
+    """
+    from Requisito2.condensada import condensed_size, row_offset
+    n = len(sizes)
+    out = np.empty(condensed_size(n), dtype=np.float32)
+    for i in range(n - 1):
+        a, b = row_offset(i, n), row_offset(i + 1, n)
+        row_inter = np.asarray(intersections[a:b], dtype=np.float64)
+        total = sizes[i] + sizes[i + 1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # total == 0 solo cuando ambos documentos están vacíos
+            if kind == "jaccard":
+                out[a:b] = np.where(total > 0, row_inter / (total - row_inter), 1.0)
+            else:
+                out[a:b] = np.where(total > 0, 2 * row_inter / total, 1.0)
+    return out
+
+
+def jaccard_dice_matrices(docs: list):
+    """
+    Jaccard y Dice de todos los pares como CondensedMatrix (triángulo superior float32, diagonal 1):
+    las intersecciones |A∩B| = X @ X.T se calculan por bloques en forma condensada y luego
+    set_similarity_condensed da cada métrica, sin matrices densas n x n.
+    Se puede usar `matrix[i, j]`, `.row(i)` o `.to_square()` si hace falta la matriz completa.
+    """
+    from Requisito2.condensada import CondensedMatrix, tiled_product
+    X = binary_token_matrix(docs)
+    sizes = np.asarray(X.sum(axis=1), dtype=np.float64).ravel()
+    intersections = tiled_product(X, dtype=np.float32).values
+    n = len(sizes)
+    return (CondensedMatrix(set_similarity_condensed(intersections, sizes, "jaccard"), n),
+            CondensedMatrix(set_similarity_condensed(intersections, sizes, "dice"), n))
+
 # 4) Cosine similarity using TF-IDF (vectorization statistical)
-def tfidf_cosine_similarity(docs: list, pair_indices=None):
+def tfidf_matrix(docs: list):
+    """Matriz TF-IDF dispersa (n_docs x n_features) con filas normalizadas (norma L2)."""
+    # sklearn se importa aquí: los procesos del pool de pares (spawn) importan este módulo
+    # solo para las métricas de texto y no deben pagar su carga
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    # Vectorizar con TF-IDF (preprocesamiento interno)
+    vectorizer = TfidfVectorizer(lowercase=True, token_pattern=r'\b[\w-]+\b', stop_words='english')
+    return vectorizer.fit_transform(docs)
+
+def tfidf_cosine_similarity(docs: list, pair_indices=None, out_path=None, dtype=np.float32):
     """
     docs: lista de strings (abstracts)
     pair_indices: lista de tuplas (i,j) para calcular solo pares. Si None, devuelve matriz completa.
+    out_path: si se indica, la matriz se calcula por bloques y se escribe en ese .npy (triángulo
+    superior en `dtype`, float32 o float16); devuelve un CondensedMatrix con mmap.
     Devuelve matriz de similitud (numpy array) o diccionario de pares.
     """
-    # Vectorizar con TF-IDF (preprocesamiento interno)
-    vectorizer = TfidfVectorizer(lowercase=True, token_pattern=r'\b[\w-]+\b', stop_words='english')
-    X = vectorizer.fit_transform(docs)  # shape (n_docs, n_features)
+    X = tfidf_matrix(docs)  # shape (n_docs, n_features)
+    if out_path is not None and pair_indices is None:
+        from Requisito2.condensada import tiled_cosine
+        return tiled_cosine(X, out_path, dtype)
+    from sklearn.metrics.pairwise import cosine_similarity as sk_cosine_sim
     sim_matrix = sk_cosine_sim(X)
     if pair_indices is None:
         return sim_matrix
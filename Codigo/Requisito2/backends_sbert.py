@@ -0,0 +1,106 @@
+import os
+import warnings
+from importlib.util import find_spec
+
+"""
+Backends de inferencia en CPU para SBERT, seleccionables por configuración:
+- "torch": SentenceTransformer en float32 (el comportamiento original)
+- "int8":  el mismo modelo con cuantización dinámica int8 de las capas Linear (torch.quantization)
+- "onnx":  ONNX Runtime (sentence-transformers >= 3.2, backend="onnx"), normalmente con el
+           modelo int8 exportado con export_onnx_int8()
+Variables de entorno:
+- SBERT_BACKEND    torch | int8 | onnx (por defecto torch)
+- SBERT_MODEL_DIR  carpeta local con el modelo (si no, se usa el nombre del modelo del hub)
+- SBERT_ONNX_FILE  archivo .onnx dentro de la carpeta (por defecto el int8 de export_onnx_int8)
+Si el backend pedido no se puede cargar (falta onnxruntime, no existe el archivo...) se avisa
+y se usa "torch".
+"""
+
+BACKENDS = ("torch", "int8", "onnx")
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+# Paquetes que necesita cada backend (el backend onnx de sentence-transformers usa optimum)
+_REQUIREMENTS = {
+    "torch": ("sentence_transformers", "torch"),
+    "int8": ("sentence_transformers", "torch"),
+    "onnx": ("sentence_transformers", "onnxruntime", "optimum"),
+}
+
+
+def configured_backend():
+    backend = os.environ.get("SBERT_BACKEND", "torch").strip().lower()
+    if backend not in BACKENDS:
+        warnings.warn(f"SBERT_BACKEND={backend!r} desconocido, se usa 'torch'. Opciones: {BACKENDS}")
+        return "torch"
+    return backend
+
+
+def resolve_backend(backend=None):
+    """
+    Backend con el que se va a codificar, sin cargar el modelo: el pedido (o el configurado) si sus
+    paquetes están instalados, si no "torch". Lo usa la codificación en varios procesos, donde el
+    proceso principal no carga el modelo.
+    """
+    backend = backend or configured_backend()
+    if backend != "torch" and not all(find_spec(name) for name in _REQUIREMENTS[backend]):
+        warnings.warn(f"Faltan paquetes para el backend SBERT {backend!r} ({_REQUIREMENTS[backend]}); se usa 'torch'")
+        return "torch"
+    return backend
+
+
+def model_source(model_name):
+    """Carpeta local del modelo si está configurada, si no el nombre del modelo."""
+    return os.environ.get("SBERT_MODEL_DIR") or model_name
+
+
+def _load_torch(source):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(source, device="cpu")
+
+
+def _load_int8(source):
+    import torch
+    model = _load_torch(source)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(source):
+    from sentence_transformers import SentenceTransformer
+    file_name = os.environ.get("SBERT_ONNX_FILE")
+    if file_name is None and os.path.exists(os.path.join(source, ONNX_INT8_FILE)):
+        file_name = ONNX_INT8_FILE
+    kwargs = {"file_name": file_name} if file_name else {}
+    return SentenceTransformer(source, device="cpu", backend="onnx", model_kwargs=kwargs)
+
+
+_LOADERS = {"torch": _load_torch, "int8": _load_int8, "onnx": _load_onnx}
+
+
+def load_model(model_name, backend=None, fallback=True):
+    """
+    Carga el modelo con el backend pedido (o el configurado). Devuelve (modelo, backend usado).
+    Si el backend no se puede cargar se usa torch; con fallback=False se lanza el error (los procesos
+    de codificación deben usar el mismo backend que el proceso principal).
+    """
+    backend = backend or configured_backend()
+    source = model_source(model_name)
+    if backend != "torch":
+        try:
+            return _LOADERS[backend](source), backend
+        except Exception as exc:
+            if not fallback:
+                raise
+            warnings.warn(f"No se pudo cargar el backend SBERT {backend!r} ({exc}); se usa 'torch'")
+    return _load_torch(source), "torch"
+
+
+def export_onnx_int8(model_name, model_dir, config="avx512_vnni"):
+    """
+    Exporta el modelo a ONNX y una versión con cuantización dinámica int8 en `model_dir`
+    (queda en <model_dir>/onnx/model_qint8_<config>.onnx). Se hace una vez; después basta con
+    SBERT_BACKEND=onnx y SBERT_MODEL_DIR=<model_dir>.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save_pretrained(model_dir)
+    export_dynamic_quantized_onnx_model(model, config, model_dir)
+    return os.path.join(model_dir, "onnx", f"model_qint8_{config}.onnx")
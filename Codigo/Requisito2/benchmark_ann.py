@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Requisito2.indice_ann import IndiceIVF, N_PROBE, TARGET_RECALL, recall_at_k
+
+"""
+Benchmark del índice IVF (indice_ann.py): tiempo de construcción, n_probe ajustado, recall@k frente
+a la búsqueda exacta y latencia por consulta para varios n_probe.
+Las consultas son las últimas filas, que no se indexan. El recall depende de lo agrupados que estén
+los datos, así que la medida que cuenta es la de embeddings reales: --embeddings con un .npy
+(p. ej. np.save de sbert_embeddings(abstracts), que sale de la caché). Sin él se usan vectores
+sintéticos de dimensión 384 (la de all-MiniLM-L6-v2): agrupados en temas o, con --isotropico, al
+azar (el peor caso).
+"""
+
+
+def synthetic_embeddings(n, dim=384, n_topics=2000, noise=0.6, seed=0, block=1 << 16):
+    """
+    Vectores normalizados alrededor de n_topics direcciones al azar (guardados en float16 para ahorrar
+    memoria). Con n_topics=0 son isótropos (sin ninguna estructura).
+    """
+    rng = np.random.default_rng(seed)
+    if n_topics == 0:
+        out = np.empty((n, dim), dtype=np.float16)
+        for start in range(0, n, block):
+            x = rng.standard_normal((min(block, n - start), dim)).astype(np.float32)
+            out[start:start + len(x)] = x / np.linalg.norm(x, axis=1, keepdims=True)
+        return out
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    topics /= np.linalg.norm(topics, axis=1, keepdims=True)
+    out = np.empty((n, dim), dtype=np.float16)
+    for start in range(0, n, block):
+        m = min(block, n - start)
+        x = topics[rng.integers(0, n_topics, m)] + noise * rng.standard_normal((m, dim)).astype(np.float32) / np.sqrt(dim)
+        out[start:start + m] = x / np.linalg.norm(x, axis=1, keepdims=True)
+    return out
+
+
+def run_benchmark(embeddings, k=10, n_queries=200, probes=(1, 4, N_PROBE, 16, 32), dtype=np.float32,
+                  target_recall=TARGET_RECALL):
+    # Las últimas n_queries filas son las consultas y no se indexan (un tramo, sin copiar el mmap)
+    indexed, queries = embeddings[:-n_queries], np.asarray(embeddings[-n_queries:], dtype=np.float32)
+    n = len(indexed)
+    start = time.perf_counter()
+    index = IndiceIVF.build(indexed, dtype=dtype, target_recall=target_recall, k=k)
+    print(f"{n} vectores de dimensión {embeddings.shape[1]}: construcción {time.perf_counter() - start:.1f} s, "
+          f"{index.meta['n_lists']} listas, {index.meta['dtype']}")
+    print(f"n_probe ajustado para recall@{k} >= {target_recall}: {index.n_probe} "
+          f"(recall estimado {index.meta['recall_estimado']:.3f})\n")
+    probes = sorted(set(probes) | {index.n_probe})
+
+    print(f"{'n_probe':>8}{f'recall@{k}':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    resultados = {}
+    for n_probe in probes:
+        recall = recall_at_k(index, indexed, queries, k, n_probe)
+        tiempos = []
+        for q in queries:
+            t = time.perf_counter()
+            index.search(q, k, n_probe)
+            tiempos.append((time.perf_counter() - t) * 1000)
+        p50, p95 = np.percentile(tiempos, [50, 95])
+        resultados[n_probe] = {"recall": recall, "p50_ms": p50, "p95_ms": p95}
+        print(f"{n_probe:>8}{recall:>12.3f}{p50:>10.2f}{p95:>10.2f}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del índice IVF sobre embeddings")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Vectores sintéticos")
+    parser.add_argument("--embeddings", type=str, default=None, help=".npy con embeddings reales (n x dim)")
+    parser.add_argument("--k", type=int, default=10, help="Vecinos por consulta")
+    parser.add_argument("--consultas", type=int, default=200, help="Consultas para recall y latencia")
+    parser.add_argument("--int8", action="store_true", help="Guardar los vectores del índice en int8")
+    parser.add_argument("--isotropico", action="store_true", help="Vectores sintéticos sin temas (peor caso)")
+    parser.add_argument("--recall", type=float, default=TARGET_RECALL, help="Recall objetivo para ajustar n_probe")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        emb = np.load(args.embeddings, mmap_mode="r")
+    else:
+        emb = synthetic_embeddings(args.n, n_topics=0 if args.isotropico else 2000)
+    run_benchmark(emb, args.k, args.consultas, dtype=np.int8 if args.int8 else np.float32, target_recall=args.recall)
@@ -0,0 +1,142 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Requisito2.algoritmos_similitud import (
+    Levenshtein, levenshtein_distancia_dp, levenshtein_distancia_myers,
+    token_edit_distance, token_edit_distance_banded
+)
+from Requisito2.vocabulario import tokenize_corpus
+from Requisito3.indice_ris import load_ris_index, abstract_records, select_abstracts
+
+"""
+Verificación y benchmark de los backends de Levenshtein:
+- verificar(): compara Myers/Hyyrö y el paquete C con la programación dinámica original
+  (cadenas aleatorias, prefijos de abstracts reales y el corte max_distance)
+- verificar_tokens(): lo mismo para la distancia por tokens (DP por bandas y texto codificado)
+  frente a la DP de referencia sobre listas de ids
+- run_benchmark(): tiempo por par con abstracts completos (sin truncar), por caracteres y por
+  tokens, y estimación para todos los pares de una muestra de 200 abstracts (19.900 pares)
+"""
+
+DEFAULT_RIS_PATH = os.path.join(os.path.dirname(__file__), "..", "Requisito1", "articulos_unicos.ris")
+
+
+def _backends():
+    backends = {"myers": levenshtein_distancia_myers}
+    if Levenshtein is not None:
+        backends["c"] = lambda a, b, max_distance=None: Levenshtein.distance(a, b, score_cutoff=max_distance)
+    return backends
+
+
+def _abstracts(ris_path, n):
+    index = load_ris_index(ris_path)
+    total = len(abstract_records(index))
+    return select_abstracts(ris_path, random.sample(range(total), min(n, total)), index=index)
+
+
+def verificar(ris_path=DEFAULT_RIS_PATH, n_casos=2000, seed=0):
+    """Comprueba que todos los backends devuelven la misma distancia que la DP de referencia."""
+    random.seed(seed)
+    alphabet = "abcdeáé -"
+    casos = [
+        ("".join(random.choice(alphabet) for _ in range(random.randint(0, 60))),
+         "".join(random.choice(alphabet) for _ in range(random.randint(0, 60))))
+        for _ in range(n_casos)
+    ]
+    reales = _abstracts(ris_path, 40)
+    casos += [(a[:300], b[:250]) for a, b in zip(reales[::2], reales[1::2])]
+
+    backends = _backends()
+    for a, b in casos:
+        esperado = levenshtein_distancia_dp(a, b)
+        limite = random.randint(0, max(1, esperado * 2))
+        for nombre, func in backends.items():
+            if func(a, b) != esperado:
+                raise AssertionError(f"{nombre}: distancia distinta para {a!r} / {b!r}")
+            cortado = func(a, b, max_distance=limite)
+            if cortado != (esperado if esperado <= limite else limite + 1):
+                raise AssertionError(f"{nombre}: corte max_distance={limite} incorrecto para {a!r} / {b!r}")
+    print(f"Verificación correcta: {len(casos)} pares, backends {list(backends)} == DP de referencia")
+    return True
+
+
+def verificar_tokens(ris_path=DEFAULT_RIS_PATH, n_casos=2000, seed=0):
+    """Comprueba la distancia por tokens (banda y texto codificado) contra la DP sobre listas de ids."""
+    random.seed(seed)
+    casos = [
+        ([random.randint(0, 6) for _ in range(random.randint(0, 40))],
+         [random.randint(0, 6) for _ in range(random.randint(0, 40))])
+        for _ in range(n_casos)
+    ]
+    # Ids grandes para cubrir el salto de los sustitutos Unicode en ids_to_text
+    casos += [([0xD7FF, 0xD800, 0xE000, 5], [0xD800, 0xDFFF, 5])]
+    corpus = tokenize_corpus(_abstracts(ris_path, 40))
+    casos += [(corpus.sequence(i).tolist(), corpus.sequence(i + 1).tolist()) for i in range(0, len(corpus) - 1, 2)]
+
+    backends = {"banda": token_edit_distance_banded, "texto": token_edit_distance}
+    for a, b in casos:
+        esperado = levenshtein_distancia_dp(a, b)
+        limite = random.randint(0, max(1, esperado * 2))
+        for nombre, func in backends.items():
+            if func(a, b) != esperado:
+                raise AssertionError(f"tokens/{nombre}: distancia distinta para {a} / {b}")
+            cortado = func(a, b, max_distance=limite)
+            if cortado != (esperado if esperado <= limite else limite + 1):
+                raise AssertionError(f"tokens/{nombre}: corte max_distance={limite} incorrecto para {a} / {b}")
+    print(f"Verificación por tokens correcta: {len(casos)} pares, {list(backends)} == DP de referencia")
+    return True
+
+
+def _por_par(func, pares, **kwargs):
+    start = time.perf_counter()
+    for a, b in pares:
+        func(a, b, **kwargs)
+    return (time.perf_counter() - start) / len(pares)
+
+
+def run_benchmark(ris_path=DEFAULT_RIS_PATH, n_pares=20, pares_dp=3, seed=0):
+    """Tiempo medio por par con abstracts completos y estimación para 19.900 pares."""
+    random.seed(seed)
+    textos = _abstracts(ris_path, 2 * n_pares)
+    pares = list(zip(textos[::2], textos[1::2]))
+    largo = sum(len(a) + len(b) for a, b in pares) / (2 * len(pares))
+    print(f"{len(pares)} pares de abstracts completos (longitud media {largo:.0f} caracteres)\n")
+
+    tiempos = {"dp (referencia)": _por_par(lambda a, b: levenshtein_distancia_dp(a, b), pares[:pares_dp])}
+    for nombre, func in _backends().items():
+        tiempos[nombre] = _por_par(func, pares)
+        # Corte típico: pares con similitud < 0.5 no interesan
+        tiempos[f"{nombre} + max_distance"] = _por_par(func, pares, max_distance=int(largo * 0.5))
+
+    # Por tokens: mismas parejas como secuencias de ids de un vocabulario común
+    corpus = tokenize_corpus(textos)
+    secuencias = list(zip(corpus.sequences()[::2], corpus.sequences()[1::2]))
+    tokens = sum(len(a) + len(b) for a, b in secuencias) / (2 * len(secuencias))
+    print(f"Por tokens: longitud media {tokens:.0f} tokens\n")
+    tiempos["tokens: banda"] = _por_par(token_edit_distance_banded, secuencias[:pares_dp])
+    tiempos["tokens: banda + max_distance"] = _por_par(token_edit_distance_banded, secuencias,
+                                                       max_distance=int(tokens * 0.5))
+    tiempos["tokens: texto"] = _por_par(token_edit_distance, secuencias)
+    tiempos["tokens: texto + max_distance"] = _por_par(token_edit_distance, secuencias,
+                                                       max_distance=int(tokens * 0.5))
+
+    for nombre, t in tiempos.items():
+        print(f"{nombre:<30} {t * 1000:10.3f} ms/par   19.900 pares: {t * 19900:9.1f} s")
+    return tiempos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verificación y benchmark de los backends de Levenshtein")
+    parser.add_argument("--ris", type=str, default=DEFAULT_RIS_PATH, help="Archivo RIS con abstracts")
+    parser.add_argument("--pares", type=int, default=20, help="Pares de abstracts para el benchmark")
+    args = parser.parse_args()
+
+    verificar(args.ris)
+    verificar_tokens(args.ris)
+    run_benchmark(args.ris, args.pares)
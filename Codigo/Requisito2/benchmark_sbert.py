@@ -0,0 +1,126 @@
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Requisito2.backends_sbert import BACKENDS, load_model
+from Requisito2.codificacion_paralela import encode_texts
+from Requisito2.pool_pares import available_workers
+from Requisito2.modelos_IA import MODEL_NAME
+from Requisito3.indice_ris import load_ris_index, abstract_records, select_abstracts
+
+"""
+Precisión y velocidad de los backends de inferencia SBERT (ver backends_sbert.py):
+- compara la matriz de similitud coseno de cada backend con la de torch float32
+  (diferencia máxima y media, y coincidencia de los 10 vecinos más cercanos)
+- mide documentos por segundo con abstracts reales (sin caché de embeddings)
+- --pipeline: compara model.encode original con la codificación por cubetas de longitud
+  (codificacion_paralela.encode_texts) con 1, 2, ... procesos
+
+Resultado medido (--pipeline --docs 100000 --workers 2: los 1.293 abstracts de articulos_unicos.ris,
+CPU de 1 núcleo, torch 2.14, modelo con la arquitectura de all-MiniLM-L6-v2 en SBERT_MODEL_DIR
+porque el hub no era accesible; el tiempo no depende de los pesos):
+    model.encode            7.7 docs/s
+    cubetas, 1 proceso      7.9 docs/s   1.04x   max |Δ| 6e-08
+    cubetas, 2 procesos     6.0 docs/s   0.79x   (2 procesos en 1 núcleo: solo se paga el arranque)
+Con un núcleo las cubetas apenas ganan (la mayoría de abstracts llega al tope de 256 tokens, así que
+hay poco relleno que ahorrar); la ganancia de los procesos escala con los núcleos disponibles, por
+eso encode_texts solo los usa con available_workers() > 1 y MIN_PARALLEL textos o más.
+"""
+
+DEFAULT_RIS_PATH = os.path.join(os.path.dirname(__file__), "..", "Requisito1", "articulos_unicos.ris")
+
+
+def _abstracts(ris_path, n, seed=0):
+    random.seed(seed)
+    index = load_ris_index(ris_path)
+    total = len(abstract_records(index))
+    return select_abstracts(ris_path, random.sample(range(total), min(n, total)), index=index)
+
+
+def _encode(model, texts):
+    return model.encode(texts, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True)
+
+
+def _topk_overlap(a, b, k=10):
+    """Fracción media de vecinos top-k compartidos entre dos matrices de similitud."""
+    np.fill_diagonal(a, -np.inf)
+    np.fill_diagonal(b, -np.inf)
+    k = min(k, len(a) - 1)
+    top_a = np.argpartition(-a, k - 1, axis=1)[:, :k]
+    top_b = np.argpartition(-b, k - 1, axis=1)[:, :k]
+    return float(np.mean([len(set(x) & set(y)) / k for x, y in zip(top_a, top_b)]))
+
+
+def run_benchmark(ris_path=DEFAULT_RIS_PATH, n_docs=500, backends=BACKENDS):
+    textos = _abstracts(ris_path, n_docs)
+    print(f"{len(textos)} abstracts, modelo {MODEL_NAME}\n")
+    print(f"{'backend':<8}{'docs/s':>10}{'aceleración':>13}{'max |Δcos|':>12}{'media |Δcos|':>14}{'top-10':>8}")
+
+    referencia, base = None, None
+    resultados = {}
+    for backend in backends:
+        model, usado = load_model(MODEL_NAME, backend)
+        if usado != backend:
+            print(f"{backend:<8} no disponible (se usaría {usado})")
+            continue
+        _encode(model, textos[:8])  # calentamiento
+        start = time.perf_counter()
+        emb = _encode(model, textos)
+        docs_s = len(textos) / (time.perf_counter() - start)
+        sim = emb @ emb.T
+        if referencia is None:
+            # El primer backend (por defecto torch float32) es la referencia
+            referencia, base = sim, docs_s
+        diff = np.abs(sim - referencia)
+        overlap = _topk_overlap(sim.copy(), referencia.copy())
+        resultados[backend] = {"docs_s": docs_s, "max_diff": float(diff.max()),
+                               "mean_diff": float(diff.mean()), "top10": overlap}
+        print(f"{backend:<8}{docs_s:>10.1f}{docs_s / base:>12.2f}x{diff.max():>12.4f}{diff.mean():>14.5f}{overlap:>8.3f}")
+    return resultados
+
+
+def run_pipeline_benchmark(ris_path=DEFAULT_RIS_PATH, n_docs=2000, max_workers=None):
+    """docs/s de model.encode (orden de llegada, lote por defecto) frente a encode_texts con N procesos."""
+    textos = _abstracts(ris_path, n_docs)
+    model, backend = load_model(MODEL_NAME)
+    print(f"{len(textos)} abstracts, modelo {MODEL_NAME} ({backend})\n")
+
+    start = time.perf_counter()
+    referencia = _encode(model, textos)
+    base = len(textos) / (time.perf_counter() - start)
+    print(f"{'model.encode':<22}{base:>10.1f} docs/s")
+
+    resultados = {"model.encode": base}
+    max_workers = max_workers or available_workers()
+    workers = sorted({1, *[w for w in (2, 4, 8, 16, 32) if w < max_workers], max_workers})
+    for w in workers:
+        start = time.perf_counter()
+        emb = encode_texts(textos, MODEL_NAME, backend, model=model, workers=w, min_parallel=0)
+        docs_s = len(textos) / (time.perf_counter() - start)
+        diff = float(np.abs(emb - referencia).max())
+        resultados[f"cubetas x{w}"] = docs_s
+        print(f"{f'cubetas, {w} procesos':<22}{docs_s:>10.1f} docs/s   {docs_s / base:5.2f}x   max |Δ| {diff:.2e}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precisión y velocidad de los backends SBERT")
+    parser.add_argument("--ris", type=str, default=DEFAULT_RIS_PATH, help="Archivo RIS con abstracts")
+    parser.add_argument("--docs", type=int, default=500, help="Número de abstracts")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS,
+                        help="Backends a comparar (el primero es la referencia)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Medir la codificación por cubetas de longitud y en varios procesos")
+    parser.add_argument("--workers", type=int, default=None, help="Máximo de procesos para --pipeline")
+    args = parser.parse_args()
+
+    if args.pipeline:
+        run_pipeline_benchmark(args.ris, args.docs, args.workers)
+    else:
+        run_benchmark(args.ris, args.docs, args.backends)
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Requisito2.algoritmos_similitud import dice_coefficient, jaccard_similitud, normalize_text
+from Requisito2.vocabulario import dice_ids, jaccard_ids, tokenize_corpus
+from Requisito3.indice_ris import load_ris_index, abstract_records, select_abstracts
+
+"""
+Benchmark del vocabulario de ids int32 (vocabulario.py) frente a la tokenización por strings:
+- tokenización: normalize_text + set por documento frente a tokenize_corpus (una pasada)
+- operaciones de conjuntos: jaccard_similitud / dice_coefficient (tokenizan en cada par),
+  sets de strings ya construidos, y jaccard_ids / dice_ids sobre ids ordenados
+Comprueba además que los resultados coinciden.
+"""
+
+DEFAULT_RIS_PATH = os.path.join(os.path.dirname(__file__), "..", "Requisito1", "articulos_unicos.ris")
+
+
+def _abstracts(ris_path, n, seed=0):
+    random.seed(seed)
+    index = load_ris_index(ris_path)
+    total = len(abstract_records(index))
+    return select_abstracts(ris_path, random.sample(range(total), min(n, total)), index=index)
+
+
+def _tiempo(func):
+    start = time.perf_counter()
+    value = func()
+    return time.perf_counter() - start, value
+
+
+def run_benchmark(ris_path=DEFAULT_RIS_PATH, n_docs=2000, n_pairs=20000, seed=0):
+    textos = _abstracts(ris_path, n_docs, seed)
+    rng = random.Random(seed)
+    pares = [tuple(rng.sample(range(len(textos)), 2)) for _ in range(n_pairs)]
+    print(f"{len(textos)} abstracts, {len(pares)} pares\n")
+
+    t_str, sets = _tiempo(lambda: [set(normalize_text(t)) for t in textos])
+    t_ids, corpus = _tiempo(lambda: tokenize_corpus(textos))
+    print(f"{'Tokenización':<40}{'docs/s':>12}")
+    print(f"{'normalize_text + set (strings)':<40}{len(textos) / t_str:>12.0f}")
+    print(f"{'tokenize_corpus (ids int32)':<40}{len(textos) / t_ids:>12.0f}\n")
+
+    token_sets = corpus.token_sets()
+    casos = {
+        "jaccard_similitud (tokeniza cada par)": lambda: [jaccard_similitud(textos[i], textos[j]) for i, j in pares],
+        "sets de strings ya construidos": lambda: [
+            len(sets[i] & sets[j]) / len(sets[i] | sets[j]) if sets[i] | sets[j] else 1.0 for i, j in pares
+        ],
+        "jaccard_ids (ids ordenados)": lambda: [jaccard_ids(token_sets[i], token_sets[j]) for i, j in pares],
+    }
+    print(f"{'Jaccard por pares':<40}{'pares/s':>12}")
+    resultados = {}
+    for nombre, func in casos.items():
+        t, valores = _tiempo(func)
+        resultados[nombre] = np.array(valores)
+        print(f"{nombre:<40}{len(pares) / t:>12.0f}")
+
+    referencia = resultados["jaccard_similitud (tokeniza cada par)"]
+    for nombre, valores in resultados.items():
+        if not np.allclose(valores, referencia):
+            raise AssertionError(f"{nombre}: resultados distintos de jaccard_similitud")
+    dice_ref = [dice_coefficient(textos[i], textos[j]) for i, j in pares[:2000]]
+    if not np.allclose(dice_ref, [dice_ids(token_sets[i], token_sets[j]) for i, j in pares[:2000]]):
+        raise AssertionError("dice_ids: resultados distintos de dice_coefficient")
+    print("\nResultados idénticos a jaccard_similitud / dice_coefficient")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del vocabulario de ids int32")
+    parser.add_argument("--ris", type=str, default=DEFAULT_RIS_PATH, help="Archivo RIS con abstracts")
+    parser.add_argument("--docs", type=int, default=2000, help="Número de abstracts")
+    parser.add_argument("--pares", type=int, default=20000, help="Pares para las operaciones de conjuntos")
+    args = parser.parse_args()
+
+    run_benchmark(args.ris, args.docs, args.pares)
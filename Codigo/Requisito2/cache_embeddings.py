@@ -0,0 +1,179 @@
+import os
+import re
+import json
+import threading
+import unicodedata
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from ris import hash64
+
+"""
+Caché persistente de embeddings (SBERT) en disco, por modelo y por texto.
+Cada modelo tiene su carpeta en <raíz>/<modelo>/ con:
+- vectores.f32   matriz float32 (filas x dim) de solo anexado, leída con mmap
+- claves.u64     hash de 64 bits del texto normalizado de cada fila, en el mismo orden
+- meta.json      nombre del modelo y dimensión
+Al pedir embeddings solo se codifican los textos que no estén ya en la caché; con un corpus
+que no cambia no se ejecuta el modelo. Los vectores se escriben antes que las claves, así que
+una escritura interrumpida deja como mucho vectores sin clave, que se ignoran al cargar.
+Varios procesos (p. ej. la interfaz y main2.py) pueden compartir la caché: cada anexado toma un
+bloqueo de archivo (bloqueo.lock), vuelve a leer las claves del disco y escribe a partir de su
+longitud real; las filas ya escritas nunca se sobrescriben.
+"""
+
+CACHE_DIR = os.environ.get(
+    "SBERT_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", ".cache_embeddings")
+)
+
+
+def text_key(text):
+    """Clave del texto: hash del texto en NFC con los espacios colapsados (no cambian el embedding)."""
+    return hash64(" ".join(unicodedata.normalize("NFC", text or "").split()))
+
+
+def _model_dirname(model_name):
+    return re.sub(r"[^\w.-]+", "_", model_name)
+
+
+@contextmanager
+def _file_lock(path):
+    """Bloqueo exclusivo entre procesos sobre `path` (fcntl en Linux/macOS, msvcrt en Windows)."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK se rinde tras 10 s; se vuelve a intentar
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CacheEmbeddings:
+    """
+    Uso:
+        cache = CacheEmbeddings("all-MiniLM-L6-v2")
+        emb = cache.get(textos, encode)   # encode(lista_de_textos) -> array (n, dim)
+    """
+
+    def __init__(self, model_name, directory=CACHE_DIR):
+        self.model_name = model_name
+        self.directory = os.path.join(directory, _model_dirname(model_name))
+        self._vectors_path = os.path.join(self.directory, "vectores.f32")
+        self._keys_path = os.path.join(self.directory, "claves.u64")
+        self._lock_path = os.path.join(self.directory, "bloqueo.lock")
+        self._lock = threading.Lock()
+        self.encoded = 0  # textos codificados por esta instancia (0 si todo salió de la caché)
+        self._load()
+
+    def _load(self):
+        self.dim = None
+        self._index = {}
+        self._rows = 0
+        self._vectors = None
+        try:
+            with open(os.path.join(self.directory, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get("modelo") != self.model_name:
+            return
+        self.dim = meta["dim"]
+        keys = np.fromfile(self._keys_path, dtype=np.uint64) if os.path.exists(self._keys_path) else np.empty(0, np.uint64)
+        rows = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        n = self._rows = min(len(keys), rows)
+        self._index = dict(zip(keys[:n].tolist(), range(n)))
+        self._map(n)
+
+    def _map(self, n):
+        self._vectors = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim)) if n else None
+        )
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, text):
+        return text_key(text) in self._index
+
+    def _append(self, keys, vectors):
+        """Añade las filas de `keys` que aún no estén en disco (releído bajo el bloqueo de archivo)."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        os.makedirs(self.directory, exist_ok=True)
+        with _file_lock(self._lock_path):
+            # Otro proceso puede haber anexado filas desde la última lectura
+            self._vectors = None  # cerrar el mmap anterior antes de ampliar el archivo
+            self._load()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                # Restos de una caché anterior sin meta.json válido
+                for path in (self._vectors_path, self._keys_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as f:
+                    json.dump({"modelo": self.model_name, "dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Dimensión {vectors.shape[1]} distinta de la de la caché ({self.dim})")
+
+            new = [p for p, key in enumerate(keys) if key not in self._index]
+            if new:
+                keys = [keys[p] for p in new]
+                start = self._rows
+                self._vectors = None
+                # Se escribe a partir de la última fila con clave: detrás solo puede haber restos de
+                # escrituras interrumpidas, nunca filas de otro proceso (que tendría el bloqueo)
+                with open(self._vectors_path, "r+b" if os.path.exists(self._vectors_path) else "wb") as f:
+                    f.seek(start * 4 * self.dim)
+                    f.write(vectors[new].tobytes())
+                with open(self._keys_path, "r+b" if os.path.exists(self._keys_path) else "wb") as f:
+                    f.seek(start * 8)
+                    f.write(np.asarray(keys, dtype=np.uint64).tobytes())
+                self._index.update(zip(keys, range(start, start + len(keys))))
+                self._rows = start + len(keys)
+            self._map(self._rows)
+
+    def get(self, texts, encode):
+        """Embeddings (float32, n x dim) de `texts`; codifica con `encode` solo los que faltan."""
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._index and key not in missing:
+                    missing[key] = text
+            if missing:
+                vectors = np.asarray(encode(list(missing.values())))
+                self._append(list(missing), vectors)
+                self.encoded += len(missing)
+            if not keys:
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            return np.asarray(self._vectors[[self._index[k] for k in keys]])
+
+    def clear(self):
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                self._load()
+                return
+            with _file_lock(self._lock_path):
+                self._vectors = None
+                for name in ("vectores.f32", "claves.u64", "meta.json"):
+                    path = os.path.join(self.directory, name)
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._load()
@@ -0,0 +1,123 @@
+import os
+import re
+import multiprocessing as mp
+import numpy as np
+
+from Requisito2.backends_sbert import load_model, resolve_backend
+from Requisito2.pool_pares import available_workers
+
+"""
+Codificación SBERT por cubetas de longitud y en varios procesos.
+- Los textos se ordenan por longitud estimada en tokens y se agrupan en lotes con un presupuesto
+  fijo de tokens: los lotes de textos cortos son más grandes y casi no hay relleno (padding).
+- Los lotes se reparten entre procesos (cada uno carga su copia del modelo y usa un solo hilo
+  de torch, para no competir por los núcleos) y el resultado se devuelve en el orden original.
+  Los procesos se crean con spawn, nunca con fork: el proceso principal puede tener hilos vivos
+  (torch/OpenMP, el ThreadPoolExecutor de registro_metricas) y un fork con hilos puede bloquear a
+  los hijos. En este camino el proceso principal no carga el modelo.
+- Con un solo proceso se usan los mismos lotes dentro del proceso actual.
+"""
+
+# Tokens (relleno incluido) por lote; con 256 tokens por texto equivale a lotes de 32
+TOKEN_BUDGET = 8192
+MAX_BATCH = 256
+# all-MiniLM-L6-v2 trunca a 256 tokens
+MAX_SEQ_LENGTH = 256
+# Por debajo de este número de textos no compensa arrancar procesos
+MIN_PARALLEL = 1000
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Modelo de cada proceso trabajador (se carga en _init_worker) o el error al cargarlo
+_worker_model = None
+_worker_error = None
+
+
+def estimated_tokens(text):
+    """Tokens aproximados (palabras y signos; WordPiece parte algunas palabras, de ahí el 1.3)."""
+    return min(MAX_SEQ_LENGTH, int(len(_TOKEN.findall(text)) * 1.3) + 2)
+
+
+def length_batches(texts, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH):
+    """
+    Lotes de índices ordenados por longitud: cada lote tiene como mucho token_budget tokens contando
+    el relleno hasta el texto más largo del lote.
+    """
+    lengths = np.fromiter((estimated_tokens(t) for t in texts), dtype=np.int64, count=len(texts))
+    order = np.argsort(-lengths, kind="stable")
+    batches, start = [], 0
+    while start < len(order):
+        # Orden descendente: el primer texto del lote es el más largo
+        size = max(1, min(max_batch, token_budget // int(lengths[order[start]])))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def _encode_batch(model, texts):
+    return model.encode(texts, batch_size=len(texts), show_progress_bar=False,
+                        convert_to_numpy=True, normalize_embeddings=True)
+
+
+def _init_worker(model_name, backend):
+    global _worker_model, _worker_error
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    # Mismo backend que el proceso principal: los vectores se guardan en la caché de ese backend.
+    # El error se guarda y se lanza en la primera tarea (si el inicializador falla, Pool lo reintenta sin fin)
+    try:
+        _worker_model, _ = load_model(model_name, backend, fallback=False)
+    except Exception as exc:
+        _worker_error = exc
+
+
+def _encode_task(args):
+    if _worker_error is not None:
+        raise _worker_error
+    position, texts = args
+    return position, _encode_batch(_worker_model, texts)
+
+
+def _workers(workers=None):
+    return workers or int(os.environ.get("SBERT_WORKERS", 0)) or available_workers()
+
+
+def uses_processes(n_texts, workers=None, min_parallel=MIN_PARALLEL):
+    """True si encode_texts repartirá n_texts textos entre varios procesos."""
+    return _workers(workers) > 1 and n_texts >= min_parallel
+
+
+def encode_texts(texts, model_name, backend=None, model=None, workers=None,
+                 token_budget=TOKEN_BUDGET, min_parallel=MIN_PARALLEL):
+    """
+    Embeddings normalizados (n, dim) de `texts` en su orden original.
+    `model` (ya cargado) se usa si la codificación se hace en este proceso; con workers > 1 y al
+    menos `min_parallel` textos (uses_processes) cada proceso carga el modelo con `backend`
+    (resolve_backend si es None) y `model` no hace falta.
+    """
+    texts = list(texts)
+    workers = _workers(workers)
+    batches = length_batches(texts, token_budget)
+    if not batches:
+        return np.empty((0, 0), dtype=np.float32)
+
+    parts = [None] * len(batches)
+    tasks = [(p, [texts[i] for i in idx]) for p, idx in enumerate(batches)]
+    if uses_processes(len(texts), workers, min_parallel):
+        with mp.get_context("spawn").Pool(min(workers, len(batches)), initializer=_init_worker,
+                                          initargs=(model_name, resolve_backend(backend))) as pool:
+            for position, emb in pool.imap_unordered(_encode_task, tasks):
+                parts[position] = emb
+    else:
+        if model is None:
+            model, _ = load_model(model_name, backend, fallback=backend is None)
+        for position, batch in tasks:
+            parts[position] = _encode_batch(model, batch)
+
+    out = np.empty((len(texts), parts[0].shape[1]), dtype=np.float32)
+    for idx, emb in zip(batches, parts):
+        out[idx] = emb
+    return out
@@ -0,0 +1,219 @@
+import math
+import numpy as np
+from scipy import sparse
+
+"""
+Utilidades para matrices de similitud simétricas en forma condensada.
+Solo se guarda el triángulo superior sin la diagonal, fila por fila (mismo orden que
+scipy.spatial.distance.squareform y que build_pair_indices): (0,1), (0,2), ..., (1,2), ...
+Una matriz n x n ocupa n*(n-1)/2 valores en lugar de n*n.
+CondensedMatrix envuelve ese array (en memoria o en un .npy abierto con mmap) y lo lee de forma
+perezosa: filas, bloques, vecinos y distancias para linkage sin construir la matriz cuadrada.
+tiled_product / tiled_cosine calculan X @ X.T por bloques escribiendo directamente en el .npy.
+"""
+
+# Valores de similitud por bloque (filas x columnas) que se calculan a la vez
+BLOCK_BUDGET = 1 << 24
+
+
+def condensed_size(n):
+    """Número de pares i < j."""
+    return n * (n - 1) // 2
+
+
+def row_offset(i, n):
+    """Posición en el array condensado del primer par de la fila i, es decir (i, i+1)."""
+    return i * (2 * n - i - 1) // 2
+
+
+def condensed_index(i, j, n):
+    """Posición del par (i, j) en el array condensado (el orden de i y j no importa)."""
+    if i == j:
+        raise ValueError("La diagonal no se guarda en la forma condensada")
+    if i > j:
+        i, j = j, i
+    return row_offset(i, n) + (j - i - 1)
+
+
+def row_blocks(n, n_blocks):
+    """
+    Divide las filas 0..n-2 en bloques contiguos [inicio, fin) con aproximadamente el mismo número
+    de pares cada uno (las primeras filas tienen más pares que las últimas).
+    """
+    total = condensed_size(n)
+    if total == 0:
+        return []
+    target = max(1, -(-total // max(1, n_blocks)))
+    blocks, start, acc = [], 0, 0
+    for i in range(n - 1):
+        acc += n - 1 - i
+        if acc >= target:
+            blocks.append((start, i + 1))
+            start, acc = i + 1, 0
+    if start < n - 1:
+        blocks.append((start, n - 1))
+    return blocks
+
+
+def to_square(condensed, n, diagonal=1.0, dtype=None):
+    """Reconstruye la matriz cuadrada simétrica a partir del array condensado."""
+    condensed = np.asarray(condensed)
+    square = np.empty((n, n), dtype=dtype or condensed.dtype)
+    iu = np.triu_indices(n, k=1)
+    square[iu] = condensed
+    square.T[iu] = condensed
+    np.fill_diagonal(square, diagonal)
+    return square
+
+
+def from_square(square):
+    """Array condensado (triángulo superior sin diagonal) de una matriz cuadrada."""
+    square = np.asarray(square)
+    return square[np.triu_indices(square.shape[0], k=1)]
+
+
+def n_from_condensed(m):
+    """Número de elementos n tal que n*(n-1)/2 == m."""
+    n = (1 + math.isqrt(1 + 8 * m)) // 2
+    if condensed_size(n) != m:
+        raise ValueError(f"{m} no es el tamaño de una matriz condensada")
+    return n
+
+
+class CondensedMatrix:
+    """
+    Matriz de similitud simétrica guardada como triángulo superior condensado.
+    `values` puede ser un array en memoria o un np.memmap (float32/float16); solo se leen
+    las partes que se piden.
+    """
+
+    def __init__(self, values, n=None, diagonal=1.0):
+        self.values = values
+        self.n = n_from_condensed(len(values)) if n is None else n
+        self.diagonal = diagonal
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        """Abre un .npy condensado con mmap (no lo carga en memoria)."""
+        return cls(np.load(path, mmap_mode=mode))
+
+    @classmethod
+    def create(cls, path, n, dtype=np.float32):
+        """Crea un .npy condensado vacío en disco, listo para escribir por bloques."""
+        values = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(condensed_size(n),))
+        return cls(values, n)
+
+    @classmethod
+    def from_square(cls, square, dtype=None):
+        values = from_square(square)
+        return cls(values.astype(dtype) if dtype else values, np.asarray(square).shape[0])
+
+    @property
+    def shape(self):
+        return (self.n, self.n)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, ij):
+        i, j = ij
+        return self.diagonal if i == j else self.values[condensed_index(i, j, self.n)]
+
+    def row(self, i, dtype=np.float32):
+        """Fila i completa (n valores) leída del triángulo: columna i de las filas < i + tramo contiguo."""
+        n = self.n
+        out = np.empty(n, dtype=dtype)
+        if i > 0:
+            prev = np.arange(i)
+            out[:i] = self.values[row_offset(prev, n) + (i - prev - 1)]
+        out[i] = self.diagonal
+        out[i + 1:] = self.values[row_offset(i, n):row_offset(i + 1, n)]
+        return out
+
+    def block(self, rows, cols, dtype=np.float32):
+        """Submatriz densa rows x cols (por ejemplo para un heatmap o una muestra)."""
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        i, j = np.minimum.outer(rows, cols), np.maximum.outer(rows, cols)
+        same = i == j
+        idx = row_offset(i, self.n) + (j - i - 1)
+        out = np.asarray(self.values[np.where(same, 0, idx).ravel()], dtype=dtype).reshape(idx.shape)
+        out[same] = self.diagonal
+        return out
+
+    def iter_rows(self, dtype=np.float32):
+        for i in range(self.n):
+            yield i, self.row(i, dtype)
+
+    def top_k(self, k=10):
+        """Grafo CSR con los k vecinos más similares de cada fila (mismo formato que vecinos.top_k_similar)."""
+        k = min(k, self.n - 1)
+        rows, cols, vals = [], [], []
+        for i, row in self.iter_rows():
+            row[i] = -np.inf
+            best = np.argpartition(-row, k - 1)[:k]
+            rows.append(np.full(k, i))
+            cols.append(best)
+            vals.append(row[best])
+        return sparse.csr_matrix(
+            (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+            shape=self.shape, dtype=np.float32,
+        )
+
+    def row_means(self):
+        """Similitud media de cada fila (con la diagonal), recorriendo el triángulo una sola vez."""
+        n = self.n
+        sums = np.full(n, float(self.diagonal))
+        for i in range(n - 1):
+            tramo = np.asarray(self.values[row_offset(i, n):row_offset(i + 1, n)], dtype=np.float64)
+            sums[i] += tramo.sum()
+            sums[i + 1:] += tramo
+        return sums / max(1, n)
+
+    def distances(self, dtype=np.float64):
+        """Distancias 1 - similitud en forma condensada (lo que espera scipy linkage)."""
+        return 1.0 - np.asarray(self.values, dtype=dtype)
+
+    def to_square(self, dtype=None):
+        return to_square(self.values, self.n, self.diagonal, dtype or self.values.dtype)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_square(dtype)
+
+    def flush(self):
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+
+
+def tiled_product(X, path=None, dtype=np.float32, block_budget=BLOCK_BUDGET, diagonal=1.0):
+    """
+    Triángulo superior de X @ X.T (X dispersa o densa) por bloques: cada bloque de filas [a, b) solo
+    se multiplica por las columnas >= a, y cada fila se copia a su tramo contiguo del triángulo.
+    Con `path` el resultado se escribe en un .npy con mmap, así la memoria queda acotada por un
+    bloque (filas x n) y no por n x n.
+    """
+    n = X.shape[0]
+    if path is None:
+        result = CondensedMatrix(np.empty(condensed_size(n), dtype=dtype), n, diagonal)
+    else:
+        result = CondensedMatrix.create(path, n, dtype)
+        result.diagonal = diagonal
+    XT = X.T.tocsc() if sparse.issparse(X) else np.asarray(X).T
+    step = max(1, block_budget // max(1, n))
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        block = X[start:stop] @ XT[:, start:]
+        block = block.toarray() if sparse.issparse(block) else np.asarray(block)
+        for i in range(start, stop):
+            local = i - start
+            result.values[row_offset(i, n):row_offset(i + 1, n)] = block[local, local + 1:]
+    result.flush()
+    return result
+
+
+def tiled_cosine(X, path=None, dtype=np.float32, block_budget=BLOCK_BUDGET):
+    """Similitud coseno de todas las filas de X (filas ya normalizadas) por bloques; ver tiled_product."""
+    return tiled_product(X, path, dtype, block_budget)
@@ -6,31 +6,134 @@ from itertools import combinations
 import os
 import re
 
+from Requisito2.condensada import CondensedMatrix, condensed_index, condensed_size
+
 # Ruta donde se guardarán los gráficos
 ruta_graficos = "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Datos/Requerimiento2"
 
+# A partir de este número de documentos el heatmap se reduce por bloques (plot_heatmap_large)
+LARGE_HEATMAP_N = 200
+HEATMAP_PIXELS = 512
+
 # Aqui contruimos las parejas con los n abstracts que tenemos para manejarlos
 def build_pair_indices(n):
-    """Todas las combinaciones i<j para n elementos."""
-    return list(combinations(range(n), 2))
+    """Todas las combinaciones i<j para n elementos, en el orden del array condensado (iterador, sin lista)."""
+    return combinations(range(n), 2)
 
-# Aqui convertimos el diccionario de parejas a una matriz completa
+# Aqui convertimos el diccionario de parejas a una matriz (condensada, float32)
 def pair_results_to_matrix(pair_dict, n):
-    """Convertir dict (i,j)->sim a matriz completa sim[i][j] sim[j][i]"""
-    mat = np.eye(n)
+    """
+    Convertir dict (i,j)->sim a matriz simétrica con diagonal 1. Se guarda solo el triángulo superior
+    (CondensedMatrix); np.asarray(...) o .to_square() dan la matriz completa cuando hace falta.
+    """
+    values = np.zeros(condensed_size(n), dtype=np.float32)
     for (i,j), s in pair_dict.items():
-        mat[i,j] = s
-        mat[j,i] = s
-    return mat
+        values[condensed_index(i, j, n)] = s
+    return CondensedMatrix(values, n)
+
+def _heatmap_path(title, out_path):
+    if out_path is None:
+        # Crear nombre dinámico basado en el título
+        safe_title = re.sub(r"[^\w\-]+", "_", title)  # limpiar caracteres no válidos
+        out_path = os.path.join(ruta_graficos, f"{safe_title}_heatmap.png")
+    return out_path
+
+def _matrix_access(matrix):
+    """(n, fila(i), bloque(filas, columnas)) para un CondensedMatrix (o memmap) o una matriz cuadrada."""
+    if hasattr(matrix, "row"):
+        return matrix.n, matrix.row, matrix.block
+    square = np.asarray(matrix)
+    return len(square), (lambda i: square[i]), (lambda rows, cols: square[np.ix_(rows, cols)])
+
+def landmark_order(matrix, n_landmarks=256, block=4096, seed=0):
+    """
+    Orden rápido de las filas para que los grupos se vean en el heatmap: se agrupan jerárquicamente
+    (average linkage, orden de hojas) n_landmarks filas al azar y cada fila se coloca junto al
+    landmark más parecido. Coste O(n * n_landmarks) en lugar del O(n²) del linkage completo.
+    """
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    n, _, get_block = _matrix_access(matrix)
+    rng = np.random.default_rng(seed)
+    landmarks = np.sort(rng.choice(n, min(n_landmarks, n), replace=False))
+    if len(landmarks) < 3:
+        return np.arange(n)
+    sim = np.asarray(get_block(landmarks, landmarks), dtype=np.float64)
+    dist = np.clip(1.0 - sim[np.triu_indices(len(landmarks), k=1)], 0.0, None)
+    rank = np.empty(len(landmarks), dtype=np.int64)
+    rank[leaves_list(linkage(dist, method="average"))] = np.arange(len(landmarks))
+
+    nearest = np.empty(n, dtype=np.int64)
+    best = np.empty(n, dtype=np.float64)
+    for start in range(0, n, block):
+        rows = np.arange(start, min(start + block, n))
+        s = np.asarray(get_block(rows, landmarks), dtype=np.float64)
+        nearest[rows] = rank[np.argmax(s, axis=1)]
+        best[rows] = s.max(axis=1)
+    # Por landmark (en orden de hojas) y, dentro de cada uno, de más a menos parecido
+    return np.lexsort((-best, nearest))
 
-def plot_heatmap(matrix, labels, title, out_path=None):
+def downsample_matrix(matrix, pixels=HEATMAP_PIXELS, reduce="mean", order=None):
+    """
+    Reduce la matriz n x n a (como mucho) pixels x pixels por bloques: media o máximo de cada bloque.
+    Se recorre fila a fila, así que funciona con matrices condensadas o con mmap sin expandirlas.
+    """
+    n, get_row, _ = _matrix_access(matrix)
+    order = np.arange(n) if order is None else np.asarray(order)
+    edges = np.linspace(0, n, min(pixels, n) + 1).astype(np.int64)
+    starts, counts = edges[:-1], np.diff(edges)
+    reducer = np.add.reduceat if reduce == "mean" else np.maximum.reduceat
+    out = np.empty((len(starts), len(starts)), dtype=np.float64)
+    for b, (a, z) in enumerate(zip(edges[:-1], edges[1:])):
+        acc = None
+        for k in range(a, z):
+            red = reducer(np.asarray(get_row(order[k]), dtype=np.float64)[order], starts)
+            acc = red if acc is None else (acc + red if reduce == "mean" else np.maximum(acc, red))
+        out[b] = acc / (counts[b] * counts) if reduce == "mean" else acc
+    return out
+
+def plot_heatmap_large(matrix, title, out_path=None, pixels=HEATMAP_PIXELS, reduce="mean", reorder=False):
+    """
+    Heatmap para n grande: la matriz (cuadrada, condensada o con mmap) se reduce a pixels x pixels
+    (media o máximo por bloque) y se dibuja con imshow, sin etiquetas por celda. El tamaño de la
+    figura es fijo, así que el tiempo de dibujo no depende de n.
+    reorder=True ordena las filas con landmark_order para que los grupos queden juntos.
+    """
+    n, _, _ = _matrix_access(matrix)
+    order = landmark_order(matrix) if reorder else None
+    reduced = downsample_matrix(matrix, pixels, reduce, order)
+
+    fig, ax = plt.subplots(figsize=(8, 7))
+    image = ax.imshow(reduced, cmap="viridis", interpolation="nearest", aspect="equal",
+                      extent=(0, n, n, 0), rasterized=True)
+    fig.colorbar(image, ax=ax, label="Similitud" if reduce == "mean" else "Similitud (máximo por bloque)")
+    block = n / len(reduced)
+    ax.set_title(f"{title}\n{n} documentos, bloques de {block:.1f} x {block:.1f}"
+                 + (" (ordenados por grupos)" if reorder else ""), fontsize=12)
+    ax.set_xlabel("Documento")
+    ax.set_ylabel("Documento")
+    fig.tight_layout()
+
+    out_path = _heatmap_path(title, out_path)
+    fig.savefig(out_path, dpi=100)
+    plt.close(fig)
+    return out_path
+
+def plot_heatmap(matrix, labels, title, out_path=None, large=None, reorder=False):
     """
     Genera un heatmap de similitudes y lo guarda en un archivo PNG.
 
     Si se pasa `out_path`, la imagen se guarda con ese nombre.
     Si no, se guarda automáticamente en `ruta_graficos` con el nombre del título del algoritmo.
+    Con más de LARGE_HEATMAP_N documentos (o large=True) se usa plot_heatmap_large.
     """
     n = len(labels)
+    if large or (large is None and n > LARGE_HEATMAP_N):
+        if hasattr(matrix, "block") and n < matrix.n:
+            matrix = matrix.block(np.arange(n), np.arange(n))
+        return plot_heatmap_large(matrix, title, out_path, reorder=reorder)
+    if hasattr(matrix, "block"):
+        # CondensedMatrix (posiblemente con mmap): solo se leen las n primeras filas/columnas
+        matrix = matrix.block(np.arange(n), np.arange(n))
     matrix = np.array(matrix)
 
     # Ajustar tamaño del gráfico según número de abstracts
@@ -58,10 +161,7 @@ def plot_heatmap(matrix, labels, title, out_path=None):
     plt.tight_layout()
 
     # === Nueva lógica para el nombre del archivo ===
-    if out_path is None:
-        # Crear nombre dinámico basado en el título
-        safe_title = re.sub(r"[^\w\-]+", "_", title)  # limpiar caracteres no válidos
-        out_path = os.path.join(ruta_graficos, f"{safe_title}_heatmap.png")
+    out_path = _heatmap_path(title, out_path)
 
     plt.savefig(out_path)
     plt.close()
@@ -71,10 +171,16 @@ def plot_heatmap(matrix, labels, title, out_path=None):
 #Top 10 abstacts mas similitud
 def plot_top_similar_heatmap(matrix, labels, title, out_path=None, top_n=10):
     
-    matrix = np.array(matrix)
-    mean_sim = np.mean(matrix, axis=1)
-    top_idx = np.argsort(mean_sim)[-top_n:]
-    top_matrix = matrix[np.ix_(top_idx, top_idx)]
+    if hasattr(matrix, "block"):
+        # CondensedMatrix: medias por fila y submatriz sin construir la matriz n x n
+        mean_sim = matrix.row_means()
+        top_idx = np.argsort(mean_sim)[-top_n:]
+        top_matrix = matrix.block(top_idx, top_idx)
+    else:
+        matrix = np.array(matrix)
+        mean_sim = np.mean(matrix, axis=1)
+        top_idx = np.argsort(mean_sim)[-top_n:]
+        top_matrix = matrix[np.ix_(top_idx, top_idx)]
     top_labels = [labels[i] for i in top_idx]
 
     plt.figure(figsize=(8, 6))
@@ -0,0 +1,120 @@
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+
+from Requisito2.condensada import CondensedMatrix, row_offset
+
+"""
+Exportación de resultados de similitud en formato binario.
+- Matrices completas: una por métrica como triángulo superior float32 (<métrica>.npy), que se
+  abre con mmap sin cargarla (CondensedMatrix.open / load_matrix). Con compress=True se guarda en
+  un .npz comprimido (ocupa menos, pero hay que descomprimirlo para leerlo).
+- Lista de aristas: pares (i, j, métrica, similitud) con similitud >= umbral, en .npz, .csv o
+  .parquet (este último necesita pyarrow o fastparquet).
+- manifest.json con n, las etiquetas y los archivos de cada métrica.
+El Excel (save_similarity_matrices en modelos_IA.py) queda como resumen opcional con los top-k.
+"""
+
+
+def _file_name(metric):
+    return re.sub(r"[^\w.-]+", "_", metric)
+
+
+def _condensed(matrix, n=None):
+    """Acepta un CondensedMatrix, un array condensado o una matriz cuadrada."""
+    if isinstance(matrix, CondensedMatrix):
+        return matrix
+    matrix = np.asarray(matrix)
+    if matrix.ndim == 2:
+        return CondensedMatrix.from_square(matrix, np.float32)
+    return CondensedMatrix(matrix, n)
+
+
+def export_matrices(results, output_dir, compress=False):
+    """
+    results: {métrica: (matriz, etiquetas)} como lo devuelve compute_all_similarities.
+    Guarda cada matriz condensada en float32 y el manifest. Devuelve la ruta del manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {"n": None, "etiquetas": None, "metricas": {}}
+    for name, (matrix, labels) in results.items():
+        cm = _condensed(matrix, len(labels))
+        values = np.asarray(cm.values, dtype=np.float32)
+        if compress:
+            file_name = f"{_file_name(name)}.npz"
+            np.savez_compressed(os.path.join(output_dir, file_name), values=values)
+        else:
+            file_name = f"{_file_name(name)}.npy"
+            np.save(os.path.join(output_dir, file_name), values)
+        manifest["n"] = cm.n
+        manifest["etiquetas"] = [str(label) for label in labels]
+        manifest["metricas"][name] = {"archivo": file_name, "diagonal": cm.diagonal, "dtype": "float32"}
+    path = os.path.join(output_dir, "manifest.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    return path
+
+
+def load_manifest(output_dir):
+    with open(os.path.join(output_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_matrix(output_dir, metric, mmap_mode="r"):
+    """CondensedMatrix de una métrica exportada (.npy con mmap; los .npz se descomprimen)."""
+    info = load_manifest(output_dir)["metricas"][metric]
+    path = os.path.join(output_dir, info["archivo"])
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            values = data["values"]
+    else:
+        values = np.load(path, mmap_mode=mmap_mode)
+    return CondensedMatrix(values, diagonal=info["diagonal"])
+
+
+def edge_list(results, threshold, metrics=None):
+    """DataFrame (i, j, metrica, similitud) con los pares i < j cuya similitud es >= threshold."""
+    parts = []
+    categories = list(results)
+    for code, (name, (matrix, labels)) in enumerate(results.items()):
+        if metrics is not None and name not in metrics:
+            continue
+        cm = _condensed(matrix, len(labels))
+        n = cm.n
+        rows, cols, scores = [], [], []
+        for i in range(n - 1):
+            tramo = np.asarray(cm.values[row_offset(i, n):row_offset(i + 1, n)])
+            hits = np.flatnonzero(tramo >= threshold)
+            if len(hits):
+                rows.append(np.full(len(hits), i, dtype=np.int32))
+                cols.append((hits + i + 1).astype(np.int32))
+                scores.append(tramo[hits].astype(np.float32))
+        if rows:
+            parts.append(pd.DataFrame({
+                "i": np.concatenate(rows), "j": np.concatenate(cols),
+                "metrica": pd.Categorical.from_codes(np.full(sum(len(r) for r in rows), code), categories),
+                "similitud": np.concatenate(scores),
+            }))
+    if not parts:
+        return pd.DataFrame({"i": np.empty(0, np.int32), "j": np.empty(0, np.int32),
+                             "metrica": pd.Categorical([], categories=categories),
+                             "similitud": np.empty(0, np.float32)})
+    return pd.concat(parts, ignore_index=True)
+
+
+def export_edges(results, path, threshold, metrics=None):
+    """Guarda la lista de aristas según la extensión de `path` (.npz, .csv o .parquet)."""
+    edges = edge_list(results, threshold, metrics)
+    if path.endswith(".parquet"):
+        edges.to_parquet(path, index=False)
+    elif path.endswith(".csv"):
+        edges.to_csv(path, index=False)
+    else:
+        np.savez_compressed(
+            path, i=edges["i"].to_numpy(), j=edges["j"].to_numpy(),
+            metrica=edges["metrica"].cat.codes.to_numpy(), metricas=np.array(edges["metrica"].cat.categories),
+            similitud=edges["similitud"].to_numpy(),
+        )
+    return path, len(edges)
@@ -0,0 +1,265 @@
+import os
+import json
+import numpy as np
+from scipy import sparse
+
+"""
+Índice aproximado de vecinos más cercanos (IVF) sobre embeddings SBERT normalizados.
+- Entrenamiento: k-means esférico (producto punto) sobre una muestra de los vectores → centroides.
+- Cada vector va a la lista de su centroide más cercano; los vectores se guardan ordenados por
+  lista, así cada lista es un tramo contiguo del array. En float32 (exacto) o en int8 con una
+  escala por vector (4 veces menos memoria; convertir int8 a float32 es barato, float16 no).
+- Búsqueda: se eligen las n_probe listas con centroide más parecido a la consulta y solo se
+  comparan sus vectores: ~ n_probe * n / n_lists productos en lugar de n.
+- El recall para un n_probe dado depende de lo agrupados que estén los datos. Con 20k vectores
+  384-d y consultas no indexadas (benchmark_ann.py), recall@10 con n_probe=8 es 0.90 si forman
+  temas y 0.17 si son isótropos (0.44 con 32; hacen falta ~128 de 141 listas). Por eso build()
+  ajusta n_probe a los datos: mide el recall con una muestra de los propios vectores como consultas
+  y guarda el menor n_probe que alcanza target_recall (meta["n_probe"]).
+Se guarda en una carpeta (centroids.npy, vectors.npy, scales.npy, ids.npy, offsets.npy, meta.json) y se abre
+con mmap. recall_at_k() mide la calidad frente a la búsqueda exacta.
+"""
+
+# n_probe por defecto si el índice no se ajustó (tune_n_probe)
+N_PROBE = 8
+TARGET_RECALL = 0.9
+_TUNE_QUERIES = 200
+# Vectores por bloque al asignar listas (bloque x n_lists productos a la vez)
+_ASSIGN_BLOCK = 1 << 14
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+def _assign(vectors, centroids):
+    """Centroide más parecido (producto punto) de cada vector, por bloques."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK):
+        block = np.asarray(vectors[start:start + _ASSIGN_BLOCK], dtype=np.float32)
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(vectors, n_lists, n_iter=10, seed=0):
+    """Centroides normalizados de `vectors` (filas normalizadas) con k-means por similitud coseno."""
+    rng = np.random.default_rng(seed)
+    centroids = _normalize(vectors[rng.choice(len(vectors), n_lists, replace=False)])
+    for _ in range(n_iter):
+        labels = _assign(vectors, centroids)
+        # Suma de los vectores de cada lista como producto de una matriz de asignación dispersa
+        members = sparse.csr_matrix(
+            (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+            shape=(n_lists, len(labels)),
+        )
+        sums = np.asarray(members @ vectors)
+        empty = np.bincount(labels, minlength=n_lists) == 0
+        # Las listas vacías se reinician con vectores al azar
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IndiceIVF:
+    """
+    Uso:
+        indice = IndiceIVF.build(embeddings)
+        ids, sims = indice.search(sbert_embeddings([texto])[0], k=10)
+        ids, sims = indice.neighbors_of(42, k=10)          # artículo ya indexado
+        indice.save("indice_sbert"); indice = IndiceIVF.load("indice_sbert")
+    """
+
+    def __init__(self, centroids, vectors, ids, offsets, meta=None, scales=None):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.vectors = vectors
+        self.scales = scales
+        self.ids = ids
+        self.offsets = offsets
+        self.meta = meta or {}
+        self._positions = None
+
+    @classmethod
+    def build(cls, embeddings, n_lists=None, n_iter=10, sample=None, dtype=np.float32, seed=0,
+              target_recall=TARGET_RECALL, k=10):
+        """
+        Entrena y llena el índice. Por defecto n_lists ~ sqrt(n) y el entrenamiento usa como mucho
+        64 vectores por lista. dtype: np.float32 o np.int8 (cuantización escalar por vector).
+        Con target_recall se ajusta n_probe para recall@k (tune_n_probe); None deja N_PROBE.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.int8):
+            raise ValueError("dtype debe ser float32 o int8")
+        embeddings = np.asarray(embeddings)
+        n = len(embeddings)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+        sample = sample or min(n, 64 * n_lists)
+        rng = np.random.default_rng(seed)
+        train = _normalize(embeddings[np.sort(rng.choice(n, sample, replace=False))])
+        centroids = spherical_kmeans(train, n_lists, n_iter, seed)
+
+        labels = _assign(embeddings, centroids)
+        ids = np.argsort(labels, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=offsets[1:])
+        vectors = np.empty(embeddings.shape, dtype=dtype)
+        scales = np.empty(n, dtype=np.float32) if dtype == np.int8 else None
+        for start in range(0, n, _ASSIGN_BLOCK):
+            chunk = _normalize(embeddings[ids[start:start + _ASSIGN_BLOCK]])
+            if scales is None:
+                vectors[start:start + len(chunk)] = chunk
+            else:
+                scale = np.abs(chunk).max(axis=1) / 127
+                scale[scale == 0] = 1
+                vectors[start:start + len(chunk)] = np.rint(chunk / scale[:, None])
+                scales[start:start + len(chunk)] = scale
+        meta = {"n": n, "dim": int(embeddings.shape[1]), "n_lists": n_lists, "dtype": dtype.name}
+        index = cls(centroids, vectors, ids, offsets, meta, scales)
+        if target_recall is not None:
+            index.tune_n_probe(target_recall, k, seed=seed)
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_probe(self):
+        """n_probe que se usa por defecto: el ajustado al construir o N_PROBE."""
+        return self.meta.get("n_probe", N_PROBE)
+
+    def tune_n_probe(self, target_recall=TARGET_RECALL, k=10, n_queries=_TUNE_QUERIES, seed=0):
+        """
+        Menor n_probe (1, 2, 4, ... n_lists) con recall@k >= target_recall, medido con n_queries
+        vectores del índice como consultas (sin contarse a sí mismos), y lo guarda en meta.
+        Devuelve (n_probe, recall).
+        """
+        rng = np.random.default_rng(seed)
+        positions = np.sort(rng.choice(len(self), min(n_queries, len(self)), replace=False))
+        queries = np.stack([self._stored(p) for p in positions])
+        # Vecinos exactos sobre los vectores guardados (las posiciones se traducen a ids)
+        exact = np.asarray(self.ids)[exact_search(self.vectors, queries, k + 1)]
+        own = np.asarray(self.ids)[positions]
+        exact = [set(row[row != i][:k]) for row, i in zip(exact, own)]
+
+        n_lists = len(self.centroids)
+        n_probe, recall = 1, 0.0
+        while True:
+            found = self.search(queries, k + 1, n_probe)
+            recall = float(np.mean([
+                len(e & set(ids[ids != i][:k])) / max(1, len(e)) for e, i, (ids, _) in zip(exact, own, found)
+            ]))
+            if recall >= target_recall or n_probe >= n_lists:
+                break
+            n_probe = min(2 * n_probe, n_lists)
+        self.meta.update({"n_probe": n_probe, "recall_estimado": recall, "recall_k": k})
+        return n_probe, recall
+
+    def _search_one(self, query, k, n_probe):
+        n_probe = min(n_probe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        ranges = [(self.offsets[c], self.offsets[c + 1]) for c in lists]
+        rows = np.concatenate([np.arange(a, b) for a, b in ranges])
+        if len(rows) == 0:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        scores = np.concatenate([self._scores(a, b, query) for a, b in ranges])
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return np.asarray(self.ids[rows[best]]), scores[best]
+
+    def _scores(self, a, b, query):
+        block = np.asarray(self.vectors[a:b], dtype=np.float32) @ query
+        return block if self.scales is None else block * self.scales[a:b]
+
+    def search(self, query, k=10, n_probe=None):
+        """
+        Los k vectores más similares (coseno) a `query`. Devuelve (ids, similitudes) ordenados de mayor
+        a menor; con varias consultas (matriz m x dim) devuelve una lista de pares.
+        n_probe=None usa el ajustado al construir el índice (self.n_probe).
+        """
+        n_probe = n_probe or self.n_probe
+        query = _normalize(query)
+        if query.ndim == 1:
+            return self._search_one(query, k, n_probe)
+        return [self._search_one(q, k, n_probe) for q in query]
+
+    def _stored(self, p):
+        vector = np.asarray(self.vectors[p], dtype=np.float32)
+        return vector if self.scales is None else vector * self.scales[p]
+
+    def vector(self, i):
+        """Embedding guardado del artículo i."""
+        if self._positions is None:
+            self._positions = np.empty(len(self.ids), dtype=np.int64)
+            self._positions[np.asarray(self.ids)] = np.arange(len(self.ids))
+        return self._stored(self._positions[i])
+
+    def neighbors_of(self, i, k=10, n_probe=None):
+        """Vecinos del artículo i ya indexado (sin incluirse a sí mismo)."""
+        ids, sims = self.search(self.vector(i), k + 1, n_probe)
+        keep = ids != i
+        return ids[keep][:k], sims[keep][:k]
+
+    def search_text(self, text, k=10, n_probe=None):
+        """Vecinos de un abstract nuevo (se codifica con SBERT, usando la caché de embeddings)."""
+        from Requisito2.modelos_IA import sbert_embeddings
+        return self.search(sbert_embeddings([text])[0], k, n_probe)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ("centroids", "vectors", "scales", "ids", "offsets"):
+            path = os.path.join(directory, f"{name}.npy")
+            if getattr(self, name) is not None:
+                np.save(path, np.asarray(getattr(self, name)))
+            elif os.path.exists(path):
+                os.remove(path)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ("centroids", "vectors", "ids", "offsets")
+        }
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        scales_path = os.path.join(directory, "scales.npy")
+        scales = np.load(scales_path, mmap_mode=mmap_mode) if os.path.exists(scales_path) else None
+        # Los offsets y centroides son pequeños y se usan en cada consulta
+        return cls(arrays["centroids"], arrays["vectors"], arrays["ids"], np.asarray(arrays["offsets"]),
+                   meta, scales)
+
+
+def build_from_texts(texts, **kwargs):
+    """Índice sobre los embeddings SBERT de `texts` (leídos de la caché; solo se codifican los nuevos)."""
+    from Requisito2.modelos_IA import MODEL_NAME, sbert_embeddings
+    index = IndiceIVF.build(sbert_embeddings(texts), **kwargs)
+    index.meta["modelo"] = MODEL_NAME
+    return index
+
+
+def exact_search(embeddings, queries, k=10, block=_ASSIGN_BLOCK):
+    """Top-k exacto (fuerza bruta por bloques) de cada consulta: matriz m x k de ids."""
+    queries = _normalize(queries)
+    scores = np.empty((len(queries), 0), dtype=np.float32)
+    ids = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(embeddings), block):
+        s = queries @ _normalize(embeddings[start:start + block]).T
+        scores = np.concatenate([scores, s], axis=1)
+        ids = np.concatenate([ids, np.broadcast_to(np.arange(start, start + s.shape[1]), s.shape)], axis=1)
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, keep, axis=1)
+            ids = np.take_along_axis(ids, keep, axis=1)
+    return ids
+
+
+def recall_at_k(index, embeddings, queries, k=10, n_probe=None):
+    """Fracción media de los k vecinos exactos que también devuelve el índice."""
+    exact = exact_search(embeddings, queries, k)
+    found = index.search(queries, k, n_probe)
+    return float(np.mean([len(set(e) & set(ids)) / len(e) for e, (ids, _) in zip(exact, found)]))
@@ -1,9 +1,7 @@
-from tqdm import tqdm
 import os
 import argparse
 import pandas as pd
 import sys
-from concurrent.futures import ProcessPoolExecutor
 import random
 
 
@@ -11,134 +9,67 @@ import random
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # importar utilidades
-from Requisito2.algoritmos_similitud import (
-    jaccard_similitud, dice_coefficient, normalized_levenshtein, tfidf_cosine_similarity, normalize_text
+from Requisito2.modelos_IA import save_similarity_matrices
+from Requisito2.evaluacion_resultados import plot_heatmap, plot_top_similar_heatmap
+from Requisito2.exportacion import export_edges, export_matrices
+from Requisito2.condensada import CondensedMatrix
+from Requisito2.registro_metricas import (
+    DEFAULT_METRICS, METRICS as SIMILARITY_METRICS, compute_similarities, print_timings
 )
-from Requisito2.modelos_IA import sbert_cosine_similarity, save_similarity_matrices
-from Requisito2.evaluacion_resultados import build_pair_indices, pair_results_to_matrix, plot_heatmap, plot_top_similar_heatmap
+from Requisito2.vecinos import DEFAULT_MAX_DF, METRICS, top_k_similar, neighbors_of, save_neighbors
 
 # Si quieres reutilizar tu parser RIS del Requisito3:
 try:
-    from Requisito3.analizar_abstracts import load_ris
+    from Requisito3.indice_ris import load_ris_index, abstract_records, select_abstracts
 except Exception:
-    load_ris = None
-    print("No se encontró Requisito3.analizar_abstracts.load_ris - asegúrate de importarlo o pasar abstracts manualmente.")
+    load_ris_index = None
+    print("No se encontró Requisito3.indice_ris - asegúrate de importarlo o pasar abstracts manualmente.")
 
-# ==== funciones auxiliares para multiprocessing ====
-
-def compute_jaccard_pair(args):
-    tokenized, i, j = args
-    inter = tokenized[i].intersection(tokenized[j])
-    union = tokenized[i].union(tokenized[j])
-    return (i, j, len(inter) / len(union) if union else 0.0)
-
-def compute_dice_pair(args):
-    tokenized, i, j = args
-    inter = len(tokenized[i].intersection(tokenized[j]))
-    total = len(tokenized[i]) + len(tokenized[j])
-    return (i, j, (2 * inter) / total if total > 0 else 0.0)
-
-def compute_levenshtein_pair(args):
-    abstracts, i, j = args
-    from Requisito2.algoritmos_similitud import normalized_levenshtein
-    return (i, j, normalized_levenshtein(abstracts[i], abstracts[j]))
-
-def compute_all_similarities(abstracts):
+def compute_all_similarities(abstracts, workers=None, metrics=None):
     """
-    Versión optimizada con mensajes en consola y tqdm.
+    Calcula las métricas por defecto (o las indicadas) con el motor de registro_metricas:
+    cada representación se construye una sola vez y las métricas independientes van en paralelo.
     """
     n = len(abstracts)
-    pair_idxs = build_pair_indices(n)
-
-    print(f"\n Total de pares a comparar: {len(pair_idxs)}")
-
-    # Pre-tokenizar
-    print("Preprocesando textos...")
-    tokenized = [set(normalize_text(ab)) for ab in abstracts]
-
-    # Crear listas de argumentos para enviar a los procesos
-    jaccard_args = [(tokenized, i, j) for i, j in pair_idxs]
-    dice_args = [(tokenized, i, j) for i, j in pair_idxs]
-    lev_args = [(abstracts, i, j) for i, j in pair_idxs]
-
-    # === Calcular Jaccard ===
-    print("\nCalculando Jaccard...")
-    with ProcessPoolExecutor(max_workers=4) as ex:
-        results = list(tqdm(ex.map(compute_jaccard_pair, jaccard_args), total=len(pair_idxs)))
-    jac_pairs = {(i, j): val for i, j, val in results}
-    print("✓ Jaccard completado")
-
-    # === Calcular Dice ===
-    print("\nCalculando coeficiente Dice...")
-    with ProcessPoolExecutor(max_workers=4) as ex:
-        results = list(tqdm(ex.map(compute_dice_pair, dice_args), total=len(pair_idxs)))
-    dice_pairs = {(i, j): val for i, j, val in results}
-    print("✓ Dice completado")
-
-    # === Calcular Levenshtein ===
-    print("\nCalculando similitud Levenshtein...")
-    with ProcessPoolExecutor(max_workers=4) as ex:
-        results = list(tqdm(ex.map(compute_levenshtein_pair, lev_args), total=len(pair_idxs)))
-    lev_pairs = {(i, j): val for i, j, val in results}
-    print("✓ Levenshtein completado")
-
-    # === TF-IDF cosine ===
-    print("\nCalculando TF-IDF Cosine...")
-    tfidf_matrix = tfidf_cosine_similarity(abstracts)
-    print("✓ TF-IDF completado")
-
-    # === SBERT cosine ===
-    print("\nCalculando SBERT Cosine...")
-    sbert_matrix = sbert_cosine_similarity(abstracts)
-    print("✓ SBERT completado")
-
-    # === Convertir a matrices ===
-    lev_mat = pair_results_to_matrix(lev_pairs, n)
-    jac_mat = pair_results_to_matrix(jac_pairs, n)
-    dice_mat = pair_results_to_matrix(dice_pairs, n)
-
-    results = {
-        "Levenshtein": (lev_mat, abstracts),
-        "Jaccard": (jac_mat, abstracts),
-        "Dice": (dice_mat, abstracts),
-        "TFIDF_Cosine": (tfidf_matrix, abstracts),
-        "SBERT_Cosine": (sbert_matrix, abstracts)
-    }
+    print(f"\n Total de pares a comparar: {n * (n - 1) // 2}")
 
-    return results
-
-def main_from_ris(ris_path, indices=None, output_dir="Requisito2_outputs", sample_size=200, truncate_len=1000):
-    if load_ris is None:
-        raise RuntimeError("No hay función load_ris disponible para leer archivos RIS.")
+    condensed, timings = compute_similarities(abstracts, metrics=metrics, workers=workers)
+    print_timings(timings)
 
-    # === 1. Cargar abstracts ===
-    entries = load_ris(ris_path)
+    # Cada métrica queda como triángulo superior float32; la matriz cuadrada solo se construye
+    # al escribir el Excel (hoja por hoja) y los heatmaps leen directamente del array condensado
+    return {name: (CondensedMatrix(values, n), abstracts) for name, values in condensed.items()}
 
-    if entries and isinstance(entries[0], dict):
-        abstracts = []
-        for e in entries:
-            ab = e.get('AB') or e.get('ab') or e.get('Abstract') or ""
-            abstracts.append(ab if isinstance(ab, str) else " ".join(ab) if isinstance(ab, list) else "")
-    else:
-        abstracts = entries  # ya es lista de strings
+def main_from_ris(ris_path, indices=None, output_dir="Requisito2_outputs", sample_size=200, truncate_len=1000, workers=1,
+                  metrics=None, edge_threshold=None, excel_top_k=None, heatmap_reorder=False):
+    if load_ris_index is None:
+        raise RuntimeError("No hay índice RIS disponible para leer archivos RIS.")
 
-    total_abstracts = len(abstracts)
+    # === 1. Cargar índice de registros (se construye una sola vez y se guarda junto al .ris) ===
+    index = load_ris_index(ris_path, workers=workers)
+    total_abstracts = len(abstract_records(index))
     print(f"\n Total de abstracts disponibles: {total_abstracts}")
 
-    # === 2. Selección de muestra o índices ===
+    # === 2. Selección de muestra o índices (solo se decodifican los registros elegidos) ===
     if indices:
-        abstracts = [abstracts[i] for i in indices if i < total_abstracts]
+        positions = [i for i in indices if i < total_abstracts]
+        abstracts = select_abstracts(ris_path, positions, index=index)
         print(f" Se analizarán los {len(abstracts)} abstracts seleccionados manualmente ({indices}).")
     else:
         if total_abstracts > sample_size:
             print(f"  Se tomarán aleatoriamente {sample_size} abstracts de {total_abstracts} para optimizar el rendimiento.")
-            abstracts = random.sample(abstracts, sample_size)
+            positions = random.sample(range(total_abstracts), sample_size)
         else:
             print(f" Se analizarán los {total_abstracts} abstracts disponibles (no se requiere muestreo).")
+            positions = range(total_abstracts)
+        abstracts = select_abstracts(ris_path, positions, index=index)
 
-    # === 3. Truncar longitud para mejorar rendimiento ===
-    abstracts = [ab[:truncate_len] for ab in abstracts]
-    print(f" Cada abstract se truncó a un máximo de {truncate_len} caracteres.\n")
+    # === 3. Truncar longitud (opcional: Levenshtein bit-paralelo/C permite abstracts completos) ===
+    if truncate_len:
+        abstracts = [ab[:truncate_len] for ab in abstracts]
+        print(f" Cada abstract se truncó a un máximo de {truncate_len} caracteres.\n")
+    else:
+        print(" Se usan los abstracts completos (sin truncar).\n")
 
     # === 4. Mostrar información general ===
     n = len(abstracts)
@@ -146,25 +77,60 @@ def main_from_ris(ris_path, indices=None, output_dir="Requisito2_outputs", sampl
     print(f" Total de comparaciones a realizar por algoritmo: {num_pairs:,}\n")
 
     # === 5. Calcular similitudes ===
-    results = compute_all_similarities(abstracts)
+    results = compute_all_similarities(abstracts, metrics=metrics)
 
     # === 6. Guardar resultados ===
-    os.makedirs(output_dir, exist_ok=True)
-    excel_path = save_similarity_matrices(results)
-    print(f" Resultados guardados en: {excel_path}")
+    # Matrices completas en binario (triángulo superior float32, se abren con mmap)
+    manifest = export_matrices(results, output_dir)
+    print(f" Matrices guardadas en: {output_dir} ({manifest})")
+    if edge_threshold is not None:
+        edges_path, n_edges = export_edges(results, os.path.join(output_dir, "aristas.npz"), edge_threshold)
+        print(f" {n_edges} pares con similitud >= {edge_threshold} guardados en: {edges_path}")
+    if excel_top_k:
+        excel_path = save_similarity_matrices(results, top_k=excel_top_k)
+        print(f" Resumen top-{excel_top_k} guardado en: {excel_path}")
 
 
     # === 7. Generar heatmaps ===
     for name, (matrix, labels) in results.items():
         safe_name = name.replace(" ", "_")
         out_png = os.path.join(output_dir, f"{safe_name}_heatmap.png")
-        plot_heatmap(matrix, [f"A{i}" for i in range(len(labels))], title=name, out_path=out_png)
+        plot_heatmap(matrix, [f"A{i}" for i in range(len(labels))], title=name, out_path=out_png,
+                     reorder=heatmap_reorder)
         plot_top_similar_heatmap(matrix, [f"A{i}" for i in range(len(labels))], title=name, out_path=out_png, top_n=10)
         
 
     print("\n Análisis de similitud completado con éxito.")
     return results
 
+def main_top_k(ris_path, k=10, metrics=METRICS, output_dir="Requisito2_outputs", workers=1, max_df=DEFAULT_MAX_DF):
+    """
+    Vecinos más cercanos de todos los abstracts del corpus (sin muestreo ni matriz n x n):
+    guarda un grafo disperso por métrica en output_dir/vecinos_<métrica>_k<k>.npz.
+    Con max_df (por defecto DEFAULT_MAX_DF) los vecinos Jaccard/Dice son aproximados; max_df=None los da
+    exactos (ver vecinos.top_k_similar).
+    """
+    if load_ris_index is None:
+        raise RuntimeError("No hay índice RIS disponible para leer archivos RIS.")
+
+    index = load_ris_index(ris_path, workers=workers)
+    total_abstracts = len(abstract_records(index))
+    abstracts = select_abstracts(ris_path, range(total_abstracts), index=index)
+    print(f"\n Buscando los {k} vecinos más similares de {total_abstracts} abstracts.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    graphs = {}
+    for metric in metrics:
+        print(f"\nCalculando vecinos con {metric}...")
+        graph = top_k_similar(abstracts, k=k, metric=metric, max_df=max_df)
+        path = save_neighbors(graph, os.path.join(output_dir, f"vecinos_{metric}_k{k}.npz"))
+        print(f"✓ {metric}: {graph.nnz} aristas guardadas en {path}")
+        for i in range(min(3, total_abstracts)):
+            vecinos = ", ".join(f"A{j} ({sim:.3f})" for j, sim in neighbors_of(graph, i))
+            print(f"   A{i} -> {vecinos}")
+        graphs[metric] = graph
+    return graphs
+
 bib_file_path = "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris"
 
 if __name__ == "__main__":
@@ -172,11 +138,34 @@ if __name__ == "__main__":
     parser.add_argument("--ris", type=str, required=False, help="Ruta a archivo .ris")
     parser.add_argument("--indices", nargs="+", type=int, help="Indices de artículos a analizar (0-based)")
     parser.add_argument("--out", type=str, default="Requisito2_outputs", help="Directorio salida")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para parsear/indexar el RIS (1 = secuencial)")
+    parser.add_argument("--truncar", type=int, default=1000, help="Truncar abstracts a N caracteres (0 = sin truncar)")
+    parser.add_argument("--umbral-aristas", type=float, default=None,
+                        help="Guardar también la lista de pares con similitud >= umbral (aristas.npz)")
+    parser.add_argument("--excel-top-k", type=int, default=None,
+                        help="Guardar un resumen Excel con los K vecinos de cada documento")
+    parser.add_argument("--heatmap-agrupado", action="store_true",
+                        help="En los heatmaps reducidos (muchos documentos), ordenar las filas por grupos")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="Calcular solo los K vecinos más similares de todo el corpus (grafo disperso .npz)")
+    parser.add_argument("--max-df", type=float, default=DEFAULT_MAX_DF,
+                        help="Con --top-k y Jaccard/Dice: ignorar como candidatos los tokens presentes en más de "
+                             f"esta fracción de documentos (por defecto {DEFAULT_MAX_DF}; los vecinos son APROXIMADOS). "
+                             "1 = búsqueda exacta entre todos los pares")
+    parser.add_argument("--metricas", nargs="+", default=None,
+                        help=f"Métricas a calcular: {list(SIMILARITY_METRICS)} (por defecto {DEFAULT_METRICS}); "
+                             f"con --top-k: {list(METRICS)}")
     args = parser.parse_args()
 
     # Si el usuario no pasa --ris, usamos la ruta por defecto
     ris_path = args.ris if args.ris else bib_file_path
 
-    main_from_ris(ris_path, indices=args.indices, output_dir=args.out)
+    if args.top_k:
+        main_top_k(ris_path, k=args.top_k, metrics=args.metricas or METRICS, output_dir=args.out, workers=args.workers,
+                   max_df=args.max_df)
+    else:
+        main_from_ris(ris_path, indices=args.indices, output_dir=args.out, truncate_len=args.truncar, workers=args.workers,
+                      metrics=args.metricas, edge_threshold=args.umbral_aristas, excel_top_k=args.excel_top_k,
+                      heatmap_reorder=args.heatmap_agrupado)
 
 
@@ -1,9 +1,12 @@
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import os
 import pandas as pd
 
+from Requisito2.backends_sbert import configured_backend, load_model, model_source, resolve_backend
+from Requisito2.cache_embeddings import CacheEmbeddings
+from Requisito2.codificacion_paralela import encode_texts, uses_processes
+
 """
 Esta clase contiene los modelos de IA utilizados para el requerimiento 2
 """
@@ -14,42 +17,107 @@ ruta_graficos = "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Datos/Requerimien
 # Cargar modelo SBERT (pre-entrenado). all-MiniLM-L6-v2 es ligero y rápido.
 MODEL_NAME = "all-MiniLM-L6-v2"
 
-# Carga perezosa: solo al usar el módulo
+# Carga perezosa: solo al usar el módulo. El backend (torch, int8, onnx) sale de SBERT_BACKEND
 _model = None
+_backend = None
 def _get_model():
-    global _model
+    global _model, _backend
     if _model is None:
-        _model = SentenceTransformer(MODEL_NAME)
+        # Si el backend ya se fijó (resolve_backend) no se puede cambiar: la caché ya usa su etiqueta
+        _model, _backend = load_model(MODEL_NAME, _backend, fallback=_backend is None)
     return _model
 
-def sbert_embeddings(texts):
-    model = _get_model()
-    # devuelve array (n_texts, dim)
-    return model.encode(texts, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True)
+def _cache_label():
+    """
+    Los embeddings de cada modelo y backend se guardan aparte (los cuantizados difieren un poco de fp32):
+    - modelo: model_source (una carpeta SBERT_MODEL_DIR puede ser otro modelo)
+    - backend: el realmente cargado (si se cayó a torch, torch); antes de cargar, el configurado
+    """
+    source = model_source(MODEL_NAME)
+    if source != MODEL_NAME:
+        source = os.path.abspath(source)
+    backend = _backend or configured_backend()
+    if backend == "onnx" and os.environ.get("SBERT_ONNX_FILE"):
+        backend = f"onnx:{os.environ['SBERT_ONNX_FILE']}"
+    return source if backend == "torch" else f"{source}@{backend}"
+
+_cache = None
+def _get_cache():
+    global _cache
+    if _cache is None or _cache.model_name != _cache_label():
+        _cache = CacheEmbeddings(_cache_label())
+    return _cache
+
+def _resolve_backend(n_texts):
+    """
+    Fija el backend real antes de escribir en la caché. En este proceso se carga el modelo (si el
+    backend pedido falla se usa torch); con varios procesos solo se comprueba que esté instalado,
+    sin cargar el modelo aquí.
+    """
+    global _backend
+    if uses_processes(n_texts):
+        _backend = _backend or resolve_backend()
+    else:
+        _get_model()
+
+def _encode(texts):
+    _resolve_backend(len(texts))
+    # devuelve array (n_texts, dim); lotes por longitud y varios procesos si hay muchos textos
+    return encode_texts(texts, MODEL_NAME, backend=_backend, model=_model)
+
+def sbert_embeddings(texts, use_cache=True):
+    """
+    Embeddings normalizados (n_texts, dim) en float32.
+    Con use_cache=True se leen de la caché en disco y solo se codifican los textos nuevos
+    (el modelo ni siquiera se carga si todos están en la caché).
+    """
+    texts = list(texts)
+    if not use_cache:
+        return _encode(texts)
+    cache = _get_cache()
+    missing = len({t for t in texts if t not in cache})
+    if missing:
+        # Si el backend pedido no está disponible se usa torch y los vectores deben ir a la caché de torch
+        _resolve_backend(missing)
+        cache = _get_cache()
+    return cache.get(texts, _encode)
 
-def sbert_cosine_similarity(texts, pair_indices=None):
+def sbert_cosine_similarity(texts, pair_indices=None, out_path=None, dtype=np.float32):
     """
     texts: list[str]
     pair_indices: lista de tuplas (i,j) para cálculo selectivo
+    out_path: .npy donde escribir la matriz por bloques (triángulo superior, float32 o float16);
+    en ese caso devuelve un CondensedMatrix con mmap en lugar de la matriz n x n
     """
     emb = sbert_embeddings(texts)  # normalizado si convert_to_numpy + normalize=True
+    if out_path is not None and pair_indices is None:
+        from Requisito2.condensada import tiled_cosine
+        return tiled_cosine(np.asarray(emb, dtype=np.float32), out_path, dtype)
     sim_matrix = cosine_similarity(emb)  # valores entre -1 y 1; con embeddings normalizados ~ [0,1]
     if pair_indices is None:
         return sim_matrix
     return { (i,j): float(sim_matrix[i,j]) for i,j in pair_indices }
 
-def save_similarity_matrices(matrices_dict):
+def save_similarity_matrices(matrices_dict, top_k=None, excel_path=None):
     """
     matrices_dict: dict with keys = algorithm names, values = (matrix, labels_list) OR dict-of-pairs
     Guarda matrices en Excel con hojas por algoritmo.
+    top_k: si se indica, cada hoja es un resumen con los top_k vecinos de cada documento
+    (documento, vecino, similitud) en lugar de la matriz n x n; las matrices completas se exportan
+    en binario con Requisito2.exportacion.
     """
 
-    excel_path = os.path.join(ruta_graficos, f"matrices_results.xlsx")
+    excel_path = excel_path or os.path.join(ruta_graficos, f"matrices_results.xlsx")
     with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
         for name, val in matrices_dict.items():
-            if isinstance(val, tuple):
+            if isinstance(val, tuple) and top_k:
                 matrix, labels = val
-                df = pd.DataFrame(matrix, index=labels, columns=labels)
+                df = _top_k_summary(matrix, labels, top_k)
+                df.to_excel(writer, sheet_name=name[:31], index=False)
+            elif isinstance(val, tuple):
+                matrix, labels = val
+                # Las matrices condensadas se expanden aquí, una hoja cada vez
+                df = pd.DataFrame(np.asarray(matrix, dtype=np.float64), index=labels, columns=labels)
                 df.to_excel(writer, sheet_name=name[:31])  # sheet name length limit
             else:
                 # dict of pairs -> transformar a df
@@ -57,3 +125,16 @@ def save_similarity_matrices(matrices_dict):
                 df = pd.DataFrame([{"i":i,"j":j,"sim":s} for (i,j),s in pairs.items()])
                 df.to_excel(writer, sheet_name=name[:31], index=False)
     return excel_path
+
+def _top_k_summary(matrix, labels, top_k):
+    """Tabla documento -> sus top_k vecinos más similares, ordenados de mayor a menor."""
+    from Requisito2.condensada import CondensedMatrix
+    if not isinstance(matrix, CondensedMatrix):
+        matrix = CondensedMatrix.from_square(np.asarray(matrix), np.float32)
+    graph = matrix.top_k(top_k).tocoo()
+    df = pd.DataFrame({"i": graph.row, "j": graph.col, "similitud": graph.data.astype(np.float64)})
+    df = df.sort_values(["i", "similitud"], ascending=[True, False])
+    df["rango"] = df.groupby("i").cumcount() + 1
+    df["documento"] = [labels[i] for i in df["i"]]
+    df["vecino"] = [labels[j] for j in df["j"]]
+    return df[["i", "documento", "rango", "j", "vecino", "similitud"]]
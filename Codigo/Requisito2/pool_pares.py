@@ -0,0 +1,134 @@
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from tqdm import tqdm
+
+from Requisito2.condensada import condensed_size, row_blocks, row_offset
+
+"""
+Pool de procesos reutilizable para métricas que se calculan par a par (Levenshtein, métricas propias).
+- El corpus se copia una sola vez a memoria compartida (bytes UTF-8 + desplazamientos) y cada
+  proceso lo decodifica en su inicializador: las tareas ya no llevan el corpus dentro.
+- Las tareas son bloques contiguos de filas del triángulo de pares; cada proceso escribe sus
+  resultados directamente en un array condensado compartido.
+- El mismo pool sirve para varias métricas; el número de procesos sale de los núcleos disponibles.
+Los procesos se crean siempre con spawn (también en Linux): el pool se suele abrir desde el motor de
+registro_metricas con otros hilos en marcha (TF-IDF, SBERT) y un fork con hilos vivos puede bloquear
+a los hijos. Solo se comparten nombres de segmentos, así que no hay que copiar nada más.
+"""
+
+_BLOCKS_PER_WORKER = 8
+
+# Estado de cada proceso trabajador (se rellena en _init_worker)
+_texts = None
+_result = None
+_result_shm = None
+
+
+def available_workers():
+    """Núcleos que puede usar este proceso."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def _attach(name):
+    # track=False evita que el proceso hijo intente liberar el segmento al terminar (Python >= 3.13)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(corpus_name, offsets_name, n, result_name, n_pairs, dtype):
+    global _texts, _result, _result_shm
+    corpus_shm, offsets_shm = _attach(corpus_name), _attach(offsets_name)
+    offsets = np.ndarray((n + 1,), dtype=np.int64, buffer=offsets_shm.buf).tolist()
+    data = bytes(corpus_shm.buf[:offsets[-1]])
+    _texts = [data[offsets[k]:offsets[k + 1]].decode("utf-8") for k in range(n)]
+    corpus_shm.close()
+    offsets_shm.close()
+    _result_shm = _attach(result_name)
+    _result = np.ndarray((n_pairs,), dtype=dtype, buffer=_result_shm.buf)
+
+
+def _compute_block(args):
+    """Calcula las filas [start, stop) del triángulo y las escribe en el array compartido."""
+    metric, start, stop, kwargs = args
+    texts, n = _texts, len(_texts)
+    pos = row_offset(start, n)
+    for i in range(start, stop):
+        a = texts[i]
+        for j in range(i + 1, n):
+            _result[pos] = metric(a, texts[j], **kwargs)
+            pos += 1
+    return stop - start
+
+
+class PairPool:
+    """
+    Uso:
+        with PairPool(abstracts) as pool:
+            lev = pool.run(normalized_levenshtein)            # array condensado
+            otra = pool.run(mi_metrica, umbral=0.5)
+    La métrica debe ser una función definida a nivel de módulo (se envía por referencia).
+    Los resultados se guardan en float32 (4 bytes por par); dtype=np.float64 si hace falta más precisión.
+    """
+
+    def __init__(self, texts, workers=None, dtype=np.float32):
+        self.n = len(texts)
+        self.n_pairs = condensed_size(self.n)
+        self.workers = workers or available_workers()
+        self.dtype = np.dtype(dtype)
+
+        encoded = [t.encode("utf-8") for t in texts]
+        offsets = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        self._corpus = shared_memory.SharedMemory(create=True, size=max(1, int(offsets[-1])))
+        self._corpus.buf[:offsets[-1]] = b"".join(encoded)
+        self._offsets = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+        np.ndarray(offsets.shape, dtype=np.int64, buffer=self._offsets.buf)[:] = offsets
+        self._result = shared_memory.SharedMemory(create=True, size=max(8, self.n_pairs * self.dtype.itemsize))
+        self.result = np.ndarray((self.n_pairs,), dtype=self.dtype, buffer=self._result.buf)
+
+        try:
+            self._pool = mp.get_context("spawn").Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(self._corpus.name, self._offsets.name, self.n, self._result.name, self.n_pairs,
+                          self.dtype.str),
+            )
+        except BaseException:
+            self._release()
+            raise
+
+    def run(self, metric, desc=None, **kwargs):
+        """Calcula la métrica para todos los pares i < j y devuelve una copia del array condensado."""
+        self.result[:] = 0.0
+        blocks = row_blocks(self.n, self.workers * _BLOCKS_PER_WORKER)
+        tasks = [(metric, start, stop, kwargs) for start, stop in blocks]
+        with tqdm(total=self.n - 1 if self.n > 1 else 0, desc=desc or getattr(metric, "__name__", "pares"),
+                  unit=" filas") as bar:
+            for rows in self._pool.imap_unordered(_compute_block, tasks):
+                bar.update(rows)
+        return self.result.copy()
+
+    def _release(self):
+        self.result = None
+        for shm in (self._corpus, self._offsets, self._result):
+            shm.close()
+            shm.unlink()
+
+    def close(self, terminate=False):
+        if terminate:
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        self._pool.join()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(terminate=exc_type is not None)
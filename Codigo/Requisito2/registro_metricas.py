@@ -0,0 +1,213 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from Requisito2.algoritmos_similitud import (
+    binary_token_matrix, normalized_levenshtein, set_similarity_condensed, tfidf_matrix
+)
+from Requisito2.condensada import tiled_cosine, tiled_product
+from Requisito2.pool_pares import PairPool
+from Requisito2.vocabulario import tokenize_corpus
+
+"""
+Registro de métricas de similitud y motor que las ejecuta.
+- Cada representación (tokens binarios, TF-IDF, embeddings SBERT...) se registra con las
+  representaciones de las que depende y se construye una sola vez por ejecución.
+- Cada métrica declara la representación que necesita y devuelve un array condensado
+  (triángulo superior, ver condensada.py).
+- Las métricas "por pares" (función (a, b) -> float sobre los textos, como Levenshtein o los
+  plugins del usuario) se ejecutan en un PairPool; las demás en hilos, a la vez que el pool.
+  Una métrica por pares puede pedir otra representación que sea una lista de textos (p. ej. las
+  secuencias de tokens codificadas para Levenshtein por palabras).
+compute_similarities() es el único punto de entrada que usan main2.py y la interfaz.
+"""
+
+# nombre -> (función, dependencias); la función recibe los textos y las dependencias ya construidas
+REPRESENTATIONS = {}
+# nombre -> Metrica (en orden de registro)
+METRICS = {}
+# Métricas que se calculan si no se indican otras (las opcionales se registran con default=False)
+DEFAULT_METRICS = []
+
+
+class Metrica:
+    def __init__(self, name, representation, compute, pairwise=False, kwargs=None, default=True):
+        self.name = name
+        self.default = default
+        self.representation = representation
+        self.compute = compute
+        self.pairwise = pairwise
+        self.kwargs = kwargs or {}
+
+
+def register_representation(name, depends=()):
+    """Decorador: registra una representación construida a partir de (textos, *dependencias)."""
+    def decorator(func):
+        REPRESENTATIONS[name] = (func, tuple(depends))
+        return func
+    return decorator
+
+
+def register_metric(name, representation="textos", pairwise=False, default=True, **kwargs):
+    """
+    Decorador: registra una métrica. Con default=False solo se calcula si se pide por nombre.
+    - pairwise=False: func(representación) -> array condensado
+    - pairwise=True:  func(a, b, **kwargs) -> float sobre los textos de la representación (una lista
+      de str); debe estar definida a nivel de módulo porque se envía a los procesos del PairPool
+    """
+    def decorator(func):
+        METRICS[name] = Metrica(name, representation, func, pairwise, kwargs, default)
+        if default and name not in DEFAULT_METRICS:
+            DEFAULT_METRICS.append(name)
+        return func
+    return decorator
+
+
+# === Representaciones ===
+
+@register_representation("textos")
+def _texts(texts):
+    return texts
+
+
+@register_representation("vocabulario")
+def _vocabulary(texts):
+    """Secuencias y conjuntos de ids int32 con un vocabulario común (vocabulario.py)."""
+    return tokenize_corpus(texts)
+
+
+@register_representation("secuencias_tokens", depends=("vocabulario",))
+def _token_sequences(texts, corpus):
+    """Un carácter por token (vocabulario.ids_to_text): Levenshtein sobre estos textos es por palabras."""
+    return corpus.sequence_texts()
+
+
+@register_representation("tokens_binarios", depends=("vocabulario",))
+def _binary_tokens(texts, corpus):
+    return binary_token_matrix(corpus)
+
+
+@register_representation("interseccion_tokens", depends=("tokens_binarios",))
+def _token_intersections(texts, X):
+    """|A∩B| condensado (X @ X.T por bloques) y |A| de cada documento."""
+    sizes = np.asarray(X.sum(axis=1), dtype=np.float64).ravel()
+    return tiled_product(X, dtype=np.float32).values, sizes
+
+
+@register_representation("tfidf")
+def _tfidf(texts):
+    return tfidf_matrix(texts)
+
+
+@register_representation("sbert")
+def _sbert(texts):
+    from Requisito2.modelos_IA import sbert_embeddings
+    return np.asarray(sbert_embeddings(texts), dtype=np.float32)
+
+
+# === Métricas ===
+
+register_metric("Levenshtein", pairwise=True)(normalized_levenshtein)
+# Misma normalización (1 - distancia / longitud mayor) contando tokens en lugar de caracteres;
+# opcional: no entra en DEFAULT_METRICS y solo se calcula si se pide por nombre
+register_metric("Levenshtein_Tokens", "secuencias_tokens", pairwise=True, default=False)(normalized_levenshtein)
+
+
+@register_metric("Jaccard", "interseccion_tokens")
+def _jaccard(intersections):
+    return set_similarity_condensed(*intersections, "jaccard")
+
+
+@register_metric("Dice", "interseccion_tokens")
+def _dice(intersections):
+    return set_similarity_condensed(*intersections, "dice")
+
+
+@register_metric("TFIDF_Cosine", "tfidf")
+def _tfidf_cosine(X):
+    return tiled_cosine(X).values
+
+
+@register_metric("SBERT_Cosine", "sbert")
+def _sbert_cosine(emb):
+    return tiled_cosine(emb).values
+
+
+# === Motor ===
+
+def plan(metrics=None):
+    """Representaciones necesarias para `metrics`, en orden de dependencias (cada una una sola vez)."""
+    names = list(DEFAULT_METRICS) if metrics is None else list(metrics)
+    unknown = [m for m in names if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Métricas desconocidas: {unknown}. Opciones: {list(METRICS)}")
+    order = []
+
+    def visit(rep):
+        if rep in order:
+            return
+        for dep in REPRESENTATIONS[rep][1]:
+            visit(dep)
+        order.append(rep)
+
+    for name in names:
+        visit(METRICS[name].representation)
+    return names, order
+
+
+def compute_similarities(texts, metrics=None, workers=None, threads=4):
+    """
+    Calcula las métricas pedidas (por defecto DEFAULT_METRICS) sobre `texts`.
+    Devuelve (resultados, tiempos): {métrica: array condensado} y {nombre: segundos} con el tiempo
+    de cada representación y de cada métrica.
+    """
+    texts = list(texts)
+    names, order = plan(metrics)
+    timings, lock = {}, threading.Lock()
+
+    def timed(label, func, *args, **kwargs):
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        with lock:
+            timings[label] = time.perf_counter() - start
+        return value
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as ex:
+        # Representaciones: cada una espera a sus dependencias; las independientes van en paralelo
+        reps = {}
+        for rep in order:
+            func, depends = REPRESENTATIONS[rep]
+
+            def build(func=func, depends=depends, rep=rep):
+                return timed(f"repr:{rep}", func, texts, *[reps[d].result() for d in depends])
+            reps[rep] = ex.submit(build)
+
+        futures = {}
+        for name in names:
+            metric = METRICS[name]
+            if not metric.pairwise:
+                futures[name] = ex.submit(
+                    lambda m=metric: timed(m.name, m.compute, reps[m.representation].result(), **m.kwargs)
+                )
+
+        # Las métricas por pares sobre la misma representación comparten un pool (una detrás de otra)
+        pairwise = {}
+        for name in names:
+            if METRICS[name].pairwise:
+                pairwise.setdefault(METRICS[name].representation, []).append(METRICS[name])
+        results = {}
+        for rep, group in pairwise.items():
+            with PairPool(reps[rep].result(), workers=workers) as pool:
+                for metric in group:
+                    results[metric.name] = timed(metric.name, pool.run, metric.compute, desc=metric.name,
+                                                 **metric.kwargs)
+        for name, future in futures.items():
+            results[name] = future.result()
+    return {name: results[name] for name in names}, timings
+
+
+def print_timings(timings):
+    print(f"\n{'Paso':<32}{'Tiempo (s)':>12}")
+    for label, seconds in timings.items():
+        print(f"{label:<32}{seconds:>12.3f}")
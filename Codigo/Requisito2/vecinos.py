@@ -0,0 +1,164 @@
+import numpy as np
+from scipy import sparse
+
+from Requisito2.algoritmos_similitud import binary_token_matrix, tfidf_matrix
+
+"""
+Vecinos más cercanos (top-k) sin construir la matriz n x n completa.
+El resultado es un grafo disperso (CSR n x n) con, para cada artículo, sus k artículos más
+similares y la similitud como peso; se guarda con scipy.sparse.save_npz.
+- TF-IDF y SBERT: productos por bloques de filas (disperso o denso) + argpartition por fila,
+  así en memoria solo hay un bloque de similitudes y O(n*k) resultados.
+- Jaccard y Dice: candidatos con un índice invertido (producto de la matriz binaria documento x token).
+  Por defecto (max_df = DEFAULT_MAX_DF) los tokens ubicuos no generan candidatos, así el número de
+  pares deja de ser O(n²) pero el resultado es aproximado; la intersección de los candidatos se
+  completa con una máscara de bits por documento de esos tokens. max_df=None da el resultado exacto.
+- Documentos sin tokens: como en el motor de registro_metricas, dos documentos vacíos tienen
+  similitud 1.0 entre sí, así que se enlazan entre ellos.
+"""
+
+METRICS = ("tfidf", "sbert", "jaccard", "dice")
+# Fracción de documentos a partir de la cual un token no genera candidatos (Jaccard/Dice)
+DEFAULT_MAX_DF = 0.5
+# Valores de similitud por bloque (filas x n) que se calculan a la vez
+BLOCK_BUDGET = 1 << 24
+# Bits a 1 de cada byte (popcount de las máscaras de tokens frecuentes)
+_POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+
+def _block_rows(n, block_budget=BLOCK_BUDGET):
+    return max(1, block_budget // max(1, n))
+
+
+def _topk_dense(scores, k, row_start):
+    """Top-k de cada fila de un bloque denso (excluye la diagonal). Devuelve (filas, columnas, valores)."""
+    rows = np.arange(scores.shape[0])
+    scores[rows, rows + row_start] = -np.inf
+    k = min(k, scores.shape[1] - 1)
+    cols = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(scores, cols, axis=1)
+    return np.repeat(rows + row_start, k), cols.ravel(), vals.ravel()
+
+
+def _topk_sparse(rows, cols, vals, k):
+    """Top-k por fila de una lista de pares (filas, columnas, valores) sin orden."""
+    order = np.lexsort((-vals, rows))
+    rows, cols, vals = rows[order], cols[order], vals[order]
+    first = np.searchsorted(rows, rows, side="left")
+    keep = (np.arange(len(rows)) - first) < k
+    return rows[keep], cols[keep], vals[keep]
+
+
+def _blocked_product_topk(X, k, block_budget):
+    """X con filas normalizadas (dispersa o densa): similitud coseno = X @ X.T por bloques."""
+    n = X.shape[0]
+    XT = X.T.tocsc() if sparse.issparse(X) else X.T
+    step = _block_rows(n, block_budget)
+    parts = []
+    for start in range(0, n, step):
+        block = X[start:start + step] @ XT
+        block = block.toarray() if sparse.issparse(block) else np.asarray(block)
+        parts.append(_topk_dense(block.astype(np.float32), k, start))
+    return parts
+
+
+def _empty_topk(sizes, k):
+    """Pares entre documentos sin tokens (similitud 1.0): cada uno enlaza con los k siguientes en círculo."""
+    empty = np.flatnonzero(sizes == 0)
+    kk = min(k, len(empty) - 1)
+    if kk < 1:
+        return None
+    pos = (np.arange(len(empty))[:, None] + np.arange(1, kk + 1)) % len(empty)
+    return np.repeat(empty, kk), empty[pos].ravel(), np.ones(len(empty) * kk, dtype=np.float32)
+
+
+def _set_topk(docs, k, metric, block_budget, max_df):
+    """Jaccard/Dice: candidatos por tokens compartidos (índice invertido) y top-k por fila."""
+    X = binary_token_matrix(docs)
+    n = X.shape[0]
+    sizes = np.asarray(X.sum(axis=1)).ravel()
+    df = np.asarray(X.sum(axis=0)).ravel()
+    # Los tokens presentes en más de max_df de los documentos no generan candidatos
+    # (harían que todos los pares lo fueran), pero sí cuentan en la intersección exacta
+    frequent = df > max_df * n if max_df is not None else np.zeros(len(df), dtype=bool)
+    X_rare = X[:, np.flatnonzero(~frequent)].tocsr()
+    X_rare_T = X_rare.T.tocsc()
+    # Máscara de bits (n x bytes) de los tokens frecuentes: memoria O(n * frecuentes / 8)
+    X_freq = X[:, np.flatnonzero(frequent)].tocsr()
+    freq_bits = np.zeros((n, -(-X_freq.shape[1] // 8)), dtype=np.uint8)
+    for start in range(0, n, _block_rows(X_freq.shape[1], block_budget)):
+        dense = X_freq[start:start + _block_rows(X_freq.shape[1], block_budget)].toarray() > 0
+        freq_bits[start:start + len(dense)] = np.packbits(dense, axis=1)
+
+    # Cada bloque de filas produce a lo sumo filas x n candidatos
+    step = _block_rows(n, block_budget)
+    parts = []
+    for start in range(0, n, step):
+        cand = (X_rare[start:start + step] @ X_rare_T).tocoo()
+        rows, cols = cand.row + start, cand.col
+        keep = rows != cols
+        rows, cols, inter = rows[keep], cols[keep], cand.data[keep].astype(np.float64)
+        # Tokens frecuentes compartidos: un byte de la máscara a la vez (memoria O(candidatos))
+        for byte in range(freq_bits.shape[1]):
+            column = freq_bits[:, byte]
+            inter += _POPCOUNT[column[rows] & column[cols]]
+        total = sizes[rows] + sizes[cols]
+        if metric == "jaccard":
+            vals = inter / (total - inter)
+        else:
+            vals = 2 * inter / total
+        parts.append(_topk_sparse(rows, cols, vals.astype(np.float32), k))
+    # Los documentos vacíos no comparten tokens con nadie: sus pares se añaden aparte
+    empty = _empty_topk(sizes, k)
+    if empty is not None:
+        parts.append(empty)
+    return parts
+
+
+def top_k_similar(corpus, k=10, metric="tfidf", block_budget=BLOCK_BUDGET, max_df=DEFAULT_MAX_DF):
+    """
+    Grafo de los k vecinos más similares de cada texto de `corpus` según `metric`
+    ("tfidf", "sbert", "jaccard" o "dice"). Devuelve una matriz CSR n x n donde la fila i tiene
+    como mucho k valores: las similitudes con sus vecinos (nunca consigo mismo).
+    TF-IDF y SBERT son exactos. Para Jaccard/Dice el resultado por defecto es APROXIMADO: con
+    max_df (0.5) los pares que solo comparten tokens presentes en más de esa fracción de los
+    documentos no se consideran candidatos, aunque podrían estar entre los k mejores; las
+    similitudes que se devuelven siguen siendo exactas. max_df=None busca entre todos los pares
+    que comparten algún token (exacto, pero O(n²) candidatos si hay tokens ubicuos).
+    Dos documentos sin tokens tienen similitud 1.0 entre sí, igual que en registro_metricas.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Métrica desconocida: {metric}. Opciones: {METRICS}")
+    n = len(corpus)
+    if n < 2 or k < 1:
+        return sparse.csr_matrix((n, n), dtype=np.float32)
+
+    if metric == "tfidf":
+        parts = _blocked_product_topk(tfidf_matrix(corpus), k, block_budget)
+    elif metric == "sbert":
+        from Requisito2.modelos_IA import sbert_embeddings
+        parts = _blocked_product_topk(np.asarray(sbert_embeddings(corpus), dtype=np.float32), k, block_budget)
+    else:
+        parts = _set_topk(corpus, k, metric, block_budget, max_df)
+
+    rows = np.concatenate([p[0] for p in parts])
+    cols = np.concatenate([p[1] for p in parts])
+    vals = np.concatenate([p[2] for p in parts])
+    return sparse.csr_matrix((vals, (rows, cols)), shape=(n, n), dtype=np.float32)
+
+
+def neighbors_of(graph, i):
+    """Vecinos de i ordenados de mayor a menor similitud: lista de (índice, similitud)."""
+    row = graph.getrow(i)
+    order = np.argsort(-row.data)
+    return [(int(row.indices[p]), float(row.data[p])) for p in order]
+
+
+def save_neighbors(graph, path):
+    """Guarda el grafo de vecinos (formato .npz de scipy.sparse)."""
+    sparse.save_npz(path, graph)
+    return path
+
+
+def load_neighbors(path):
+    return sparse.load_npz(path)
@@ -0,0 +1,163 @@
+import re
+from itertools import chain
+import numpy as np
+from scipy import sparse
+
+"""
+Tokenización del corpus en una sola pasada con un vocabulario compartido de ids int32.
+- Cada documento queda como una secuencia de ids (en orden, para la distancia de edición por tokens)
+  y como un conjunto ordenado de ids únicos (para Jaccard y Dice).
+- Ambas representaciones se guardan en un único buffer plano por tipo más desplazamientos,
+  sin listas ni sets de strings por documento.
+- Las operaciones de conjuntos trabajan sobre enteros ordenados (searchsorted) en lugar de hashear
+  strings. La tokenización es la misma que normalize_text (minúsculas y \\b[\\w-]+\\b).
+"""
+
+TOKEN_RE = re.compile(r"\b[\w-]+\b")
+# Los ids se codifican como caracteres Unicode para la distancia de edición por tokens; los
+# sustitutos (U+D800-U+DFFF) no se pueden pasar a UTF-8 y se saltan
+_SURROGATES = 0xD800
+_SURROGATE_GAP = 0x800
+MAX_TOKEN_IDS = 0x110000 - _SURROGATE_GAP
+
+
+def tokenize(text):
+    """Tokens normalizados de un texto (misma regla que normalize_text, con la regex compilada)."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class _Vocab(dict):
+    """Diccionario token -> id que asigna ids nuevos en orden de aparición."""
+
+    def __missing__(self, token):
+        value = self[token] = len(self)
+        return value
+
+
+def _segments(flat, offsets, i):
+    return flat[offsets[i]:offsets[i + 1]]
+
+
+class CorpusTokens:
+    """
+    Uso:
+        corpus = tokenize_corpus(abstracts)
+        corpus.sequence(3)        # ids en orden (int32)
+        corpus.token_set(3)       # ids únicos ordenados (int32)
+        jaccard_ids(corpus.token_set(0), corpus.token_set(1))
+    """
+
+    def __init__(self, vocab, ids, offsets, set_ids, set_offsets):
+        self.vocab = vocab
+        self.ids = ids
+        self.offsets = offsets
+        self.set_ids = set_ids
+        self.set_offsets = set_offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def sequence(self, i):
+        return _segments(self.ids, self.offsets, i)
+
+    def token_set(self, i):
+        return _segments(self.set_ids, self.set_offsets, i)
+
+    def sequences(self):
+        return [self.sequence(i) for i in range(len(self))]
+
+    def token_sets(self):
+        return [self.token_set(i) for i in range(len(self))]
+
+    def sequence_texts(self):
+        """
+        Cada secuencia como texto de un carácter por token (ver ids_to_text). Si el vocabulario no cabe
+        en los caracteres Unicode se usan los ids compactos de comparison_ids.
+        """
+        ids = self.ids if len(self.vocab) <= MAX_TOKEN_IDS else self.comparison_ids()
+        return [ids_to_text(_segments(ids, self.offsets, i)) for i in range(len(self))]
+
+    def comparison_ids(self):
+        """
+        Ids equivalentes a self.ids para comparar secuencias de documentos distintos, en un rango menor:
+        los tokens de dos o más documentos conservan un id propio (0..S-1) y los de un solo documento d
+        comparten el id S + d. La distancia de edición solo compara tokens de un documento con los del
+        otro, así que las coincidencias dentro de un mismo documento no cambian ninguna distancia.
+        """
+        shared = np.bincount(self.set_ids, minlength=len(self.vocab)) >= 2
+        codes = np.full(len(self.vocab), -1, dtype=np.int64)
+        codes[shared] = np.arange(np.count_nonzero(shared))
+        out = codes[self.ids]
+        single = np.flatnonzero(out < 0)
+        out[single] = np.count_nonzero(shared) + np.searchsorted(self.offsets, single, side="right") - 1
+        return out
+
+    def set_sizes(self):
+        return np.diff(self.set_offsets)
+
+    def binary_matrix(self):
+        """Matriz CSR binaria documento x token (las filas ya son los conjuntos ordenados)."""
+        data = np.ones(len(self.set_ids), dtype=np.float32)
+        return sparse.csr_matrix((data, self.set_ids, self.set_offsets), shape=(len(self), len(self.vocab)))
+
+
+def tokenize_corpus(docs):
+    """Tokeniza todos los documentos una vez con un vocabulario común (ids en orden de aparición)."""
+    vocab = _Vocab()
+    tokens = [TOKEN_RE.findall(doc.lower()) for doc in docs]
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    # Un solo recorrido de todos los tokens: los ids se asignan en orden de aparición
+    ids = np.fromiter(map(vocab.__getitem__, chain.from_iterable(tokens)), dtype=np.int32,
+                      count=int(lengths.sum()))
+    offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # Conjuntos: ids únicos por documento con una sola ordenación de (documento, id)
+    doc_of = np.repeat(np.arange(len(docs), dtype=np.int64), lengths)
+    keys = np.sort(doc_of * max(1, len(vocab)) + ids)
+    if len(keys):
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    set_docs = keys // max(1, len(vocab))
+    set_ids = (keys % max(1, len(vocab))).astype(np.int32)
+    set_offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(set_docs, minlength=len(docs)), out=set_offsets[1:])
+    return CorpusTokens(dict(vocab), ids, offsets, set_ids, set_offsets)
+
+
+def ids_to_text(ids):
+    """
+    Secuencia de ids como str con un carácter por token: la distancia de Levenshtein de dos de estos
+    textos es la distancia de edición por palabras, y sirve cualquier backend de cadenas (paquete C,
+    Myers) o el PairPool, que comparte textos.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) and (ids.min() < 0 or ids.max() >= MAX_TOKEN_IDS):
+        raise ValueError(f"Ids de token fuera de rango [0, {MAX_TOKEN_IDS})")
+    code_points = ids + np.where(ids >= _SURROGATES, _SURROGATE_GAP, 0)
+    return code_points.astype("<u4").tobytes().decode("utf-32-le")
+
+
+def intersection_size(a, b):
+    """|A ∩ B| de dos arrays de ids ordenados y sin repetidos (búsqueda binaria del menor en el mayor)."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return 0
+    pos = np.searchsorted(b, a)
+    pos[pos == len(b)] = len(b) - 1
+    return int(np.count_nonzero(b[pos] == a))
+
+
+def jaccard_ids(a, b):
+    """Jaccard de dos conjuntos de ids ordenados (1.0 si ambos están vacíos, como jaccard_similitud)."""
+    if len(a) == 0 and len(b) == 0:
+        return 1.0
+    inter = intersection_size(a, b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def dice_ids(a, b):
+    """Dice de dos conjuntos de ids ordenados (1.0 si ambos están vacíos, como dice_coefficient)."""
+    if len(a) == 0 and len(b) == 0:
+        return 1.0
+    return 2 * intersection_size(a, b) / (len(a) + len(b))
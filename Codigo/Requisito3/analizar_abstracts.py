@@ -1,56 +1,56 @@
 import re
-import unicodedata
 from collections import Counter
 from tqdm import tqdm
 
+from ris import iter_ris_records, parse_ris_parallel
+from Requisito3.cache_corpus import CACHE_FIELDS, load_corpus
+from Requisito3.corpus_compacto import CorpusCompacto
+
 """
 Esta clase analiza archivos RIS grandes, extrayendo campos relevantes como título, autores, palabras clave y resumen.
+La lectura del archivo la hace el motor compartido `ris`; aquí se decide si usar la caché columnar.
 También permite contar la frecuencia de palabras clave en los abstracts.
 """
 
-def parse_large_ris(file_path):
-    """Analiza archivos RIS grandes y devuelve una lista de entradas (diccionarios)."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    entries = []
-    entry = {}
-
-    for line in tqdm(lines, desc="Analizando entradas"):
-        line = line.strip()
-
-        # Fin de una entrada
-        if line.startswith("ER  -"):
-            if entry:
-                entries.append(entry)
-                entry = {}
-            continue
 
-        # Coincidir con líneas RIS del tipo "XX  - valor"
-        match = re.match(r"^([A-Z0-9]{2})  - (.*)", line)
-        if match:
-            key, value = match.groups()
-            key = key.strip()
-            value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('utf-8').strip()
+def _cacheable(fields):
+    return fields is not None and set(fields) <= set(CACHE_FIELDS)
 
-            # Algunos campos pueden repetirse (por ejemplo, AU, KW)
-            if key in entry:
-                if isinstance(entry[key], list):
-                    entry[key].append(value)
-                else:
-                    entry[key] = [entry[key], value]
-            else:
-                entry[key] = value
 
-    return entries
-
-
-def load_ris(file_path):
-    """Carga el archivo RIS y extrae los abstracts."""
-    entries = parse_large_ris(file_path)
+def parse_large_ris(file_path, fields=None, use_cache=True, workers=1, compact=False):
+    """
+    Analiza archivos RIS grandes y devuelve sus entradas como lista de diccionarios.
+    Con compact=True se devuelve en su lugar un CorpusCompacto: una secuencia de registros que se
+    usan igual que diccionarios (get, [], in, keys) pero guardados por columnas, con JO/CY/PY/AU
+    codificados con diccionario (mucha menos memoria; no es un dict ni se serializa con json.dump).
+    Si los campos pedidos están en la caché columnar, se leen de ella en lugar de parsear el archivo.
+    Con workers > 1 el archivo se parsea en paralelo (mismo resultado que el modo secuencial).
+    """
+    if use_cache and _cacheable(fields):
+        corpus = load_corpus(file_path, workers=workers).select(fields)
+    elif workers > 1:
+        corpus = parse_ris_parallel(file_path, fields=fields, workers=workers)
+    else:
+        corpus = tqdm(iter_ris_records(file_path, fields=fields), desc="Analizando entradas", unit=" registros")
+
+    if isinstance(corpus, CorpusCompacto):
+        return corpus if compact else list(corpus.records())
+    return CorpusCompacto.from_records(corpus) if compact else list(corpus)
+
+
+def load_ris(file_path, use_cache=True, workers=1):
+    """Carga el archivo RIS y extrae los abstracts (desde la caché columnar si está disponible)."""
+    if use_cache:
+        entries = ({"AB": ab} for ab in load_corpus(file_path, workers=workers).column("AB"))
+    elif workers > 1:
+        entries = parse_ris_parallel(file_path, fields=("AB",), workers=workers)
+    else:
+        entries = iter_ris_records(file_path, fields=("AB",))
 
     abstracts = []
+    total = 0
     for entry in entries:
+        total += 1
         abstract = entry.get("AB")
         if abstract:
             # Si hay varias líneas de abstract (raro, pero posible)
@@ -59,11 +59,11 @@ def load_ris(file_path):
             abstracts.append(abstract)
 
     print(f"\nSe encontraron {len(abstracts)} abstracts en el archivo.")
-    print(f"Total de entradas en el archivo: {len(entries)}")
+    print(f"Total de entradas en el archivo: {total}")
 
-    if not abstracts and len(entries) > 0:
+    if not abstracts and total > 0:
         print("\nDepuración: Mostrando claves de la primera entrada:")
-        print(list(entries[0].keys()))
+        print(list(next(iter_ris_records(file_path, fields=None)).keys()))
 
     return abstracts
 
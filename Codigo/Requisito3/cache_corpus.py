@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+from ris import iter_ris_records, parse_ris_parallel
+from Requisito3.corpus_compacto import FORMAT_VERSION, CorpusCompacto
+
+"""
+Caché columnar del corpus RIS compartida por todos los Requisitos.
+La clave es el hash del contenido del archivo, así que cualquier cambio en el RIS genera
+una entrada nueva y la anterior se descarta. El hash se recuerda junto al tamaño y mtime_ns del
+archivo (<archivo>.hash.json), así la carga en caliente no vuelve a leer el RIS completo.
+Las entradas se escriben en una carpeta temporal única y se publican con rename, así que varios
+hilos o procesos pueden cargar el mismo archivo a la vez. Cada entrada es un CorpusCompacto guardado con save():
+- campos de texto:      <campo>.data.npy (bytes UTF-8) y <campo>.values.npy (desplazamientos)
+- campos categóricos:   <campo>.categories.npy (diccionario) y <campo>.codes.npy (códigos int32)
+- en ambos casos:       <campo>.records.npy con el rango de valores de cada registro
+Los arrays se abren con mmap, por lo que cargar la caché no copia el corpus a memoria.
+"""
+
+CACHE_FIELDS = ("AB", "TI", "AU", "KW", "PY", "JO", "CY", "DO")
+CACHE_DIRNAME = ".cache_corpus"
+_HASH_BLOCK = 1 << 20
+
+
+def content_hash(path):
+    """Hash (blake2b) del contenido del archivo, leído por bloques."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_root(ris_path):
+    return os.path.join(os.path.dirname(os.path.abspath(ris_path)), CACHE_DIRNAME)
+
+
+def _stamp_path(root, ris_path):
+    return os.path.join(root, f"{os.path.basename(ris_path)}.hash.json")
+
+
+def source_hash(ris_path, root):
+    """content_hash del archivo, reutilizando el guardado si el tamaño y mtime_ns no cambiaron."""
+    stat = os.stat(ris_path)
+    source = [stat.st_size, stat.st_mtime_ns]
+    stamp = _stamp_path(root, ris_path)
+    try:
+        with open(stamp, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["source"] == source:
+            return saved["hash"]
+    except (OSError, ValueError, KeyError):
+        pass
+    digest = content_hash(ris_path)
+    os.makedirs(root, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=root)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "hash": digest}, f)
+    os.replace(tmp, stamp)
+    return digest
+
+
+def _write_entry(ris_path, directory, workers=1):
+    """Parsea el RIS (en paralelo si workers > 1) y guarda su corpus compacto en `directory`."""
+    if workers > 1:
+        entries = parse_ris_parallel(ris_path, fields=CACHE_FIELDS, workers=workers)
+    else:
+        entries = iter_ris_records(ris_path, fields=CACHE_FIELDS)
+    CorpusCompacto.from_records(entries).save(
+        directory, fuente=os.path.basename(ris_path), campos=list(CACHE_FIELDS)
+    )
+
+
+def _is_current(directory):
+    """La entrada existe y tiene el formato actual de CorpusCompacto."""
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            return json.load(f).get("formato") == FORMAT_VERSION
+    except (OSError, ValueError):
+        return False
+
+
+def _drop_stale(root, source_name, keep):
+    """
+    Elimina entradas publicadas anteriores del mismo archivo fuente (su contenido ya cambió).
+    Las carpetas temporales (con punto en el nombre) pueden ser escrituras en curso de otro hilo o
+    proceso y no se tocan.
+    """
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name == keep or "." in name or not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                stale = json.load(f)["fuente"] == source_name
+        except (OSError, ValueError, KeyError):
+            stale = False
+        if stale:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _publish(tmp, directory):
+    """
+    Mueve la entrada recién escrita a su nombre definitivo. Si otro hilo o proceso ya publicó una
+    entrada actual con ese nombre se usa la suya; una entrada de un formato anterior se aparta antes.
+    """
+    try:
+        os.rename(tmp, directory)
+        return
+    except OSError:
+        if _is_current(directory):
+            return
+    old = f"{tmp}.old"
+    try:
+        os.rename(directory, old)
+    except OSError:
+        pass
+    shutil.rmtree(old, ignore_errors=True)
+    try:
+        os.rename(tmp, directory)
+    except OSError:
+        if not _is_current(directory):
+            raise
+
+
+def load_corpus(ris_path, verbose=True, workers=1):
+    """
+    Devuelve el corpus compacto (CorpusCompacto) del archivo RIS.
+    Si la caché no tiene una entrada para el contenido actual, se parsea el archivo (carga en frío,
+    con `workers` procesos) y se guarda; en caso contrario se abre directamente (carga en caliente).
+    """
+    start = time.perf_counter()
+    root = cache_root(ris_path)
+    digest = source_hash(ris_path, root)
+    directory = os.path.join(root, digest)
+
+    cold = not _is_current(directory)
+    if cold:
+        tmp = tempfile.mkdtemp(prefix=f"{digest}.", suffix=".tmp", dir=root)
+        try:
+            _write_entry(ris_path, tmp, workers=workers)
+            _publish(tmp, directory)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        _drop_stale(root, os.path.basename(ris_path), digest)
+
+    corpus = CorpusCompacto.load(directory)
+    if verbose:
+        mode = "frío: parseado y guardado en caché" if cold else "caliente: leído de la caché"
+        print(f"Corpus de {len(corpus)} registros cargado en {time.perf_counter() - start:.3f} s ({mode})")
+    return corpus
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+from array import array
+from collections.abc import Mapping, Sequence
+import numpy as np
+
+"""
+Representación compacta de un corpus RIS ya parseado.
+En lugar de un diccionario por registro, cada campo es una columna:
+- campos de texto (AB, TI, KW, ...): bytes UTF-8 concatenados + desplazamientos de cada valor
+- campos categóricos (JO, CY, PY, AU, ...): diccionario de valores únicos (internados) + códigos int32
+En ambos casos un array de desplazamientos por registro indica qué valores le corresponden,
+así los campos repetidos (AU, KW) no necesitan una lista por registro.
+Los registros se exponen como vistas de solo lectura con la misma interfaz que los diccionarios
+de parse_large_ris: get, [], in, keys/items, str si el campo aparece una vez y list si se repite.
+"""
+
+# Campos con muchos valores repetidos: revista (JO, T2, JA), país, año/fecha, autores, tipo y editorial
+CATEGORICAL_FIELDS = ("JO", "T2", "JA", "CY", "PY", "Y1", "DA", "AU", "TY", "PB", "SN")
+FORMAT_VERSION = 2
+
+
+class _TextColumn:
+    """Valores de texto como bytes UTF-8 concatenados (data) con sus desplazamientos (values)."""
+
+    kind = "text"
+
+    def __init__(self, data, values, records):
+        self.data = data
+        self.values = values
+        self.records = records
+
+    def value(self, k):
+        return bytes(self.data[self.values[k]:self.values[k + 1]]).decode("utf-8")
+
+    def all_values(self):
+        buf = self.data.tobytes()
+        values = self.values.tolist()
+        return [buf[values[k]:values[k + 1]].decode("utf-8") for k in range(len(values) - 1)]
+
+    def arrays(self):
+        return {"data": self.data, "values": self.values, "records": self.records}
+
+
+class _CategoricalColumn:
+    """Valores codificados con diccionario: categories[codes[k]] es el valor k."""
+
+    kind = "categorical"
+
+    def __init__(self, categories, codes, records):
+        self.categories = categories
+        self.codes = codes
+        self.records = records
+
+    def value(self, k):
+        return self.categories[self.codes[k]]
+
+    def all_values(self):
+        categories = self.categories
+        return [categories[c] for c in self.codes.tolist()]
+
+    def arrays(self):
+        encoded = [c.encode("utf-8") for c in self.categories]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return {
+            "categories": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "category_offsets": offsets,
+            "codes": self.codes,
+            "records": self.records,
+        }
+
+
+class _ColumnBuilder:
+    """Acumula los valores de un campo mientras se recorren los registros."""
+
+    def __init__(self, categorical, n_records):
+        self.categorical = categorical
+        self.records = array("i", [0] * (n_records + 1))
+        if categorical:
+            self.lookup = {}
+            self.codes = array("i")
+        else:
+            self.data = bytearray()
+            self.values = array("q", [0])
+
+    def add(self, value):
+        if self.categorical:
+            code = self.lookup.get(value)
+            if code is None:
+                code = self.lookup[value] = len(self.lookup)
+            self.codes.append(code)
+        else:
+            self.data += value.encode("utf-8")
+            self.values.append(len(self.data))
+
+    def count(self):
+        return len(self.codes) if self.categorical else len(self.values) - 1
+
+    def build(self):
+        records = np.frombuffer(self.records, dtype=np.int32).copy()
+        if self.categorical:
+            categories = [sys.intern(c) for c in self.lookup]
+            return _CategoricalColumn(categories, np.frombuffer(self.codes, dtype=np.int32).copy(), records)
+        data = np.frombuffer(bytes(self.data), dtype=np.uint8)
+        return _TextColumn(data, np.frombuffer(self.values, dtype=np.int64).copy(), records)
+
+
+class RegistroRIS(Mapping):
+    """Vista de un registro del corpus compacto; se comporta como el diccionario de parse_large_ris."""
+
+    __slots__ = ("_corpus", "_index")
+
+    def __init__(self, corpus, index):
+        self._corpus = corpus
+        self._index = index
+
+    def __getitem__(self, field):
+        value = self._corpus.get_value(self._index, field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self):
+        i = self._index
+        return (field for field, col in self._corpus.columns.items() if col.records[i + 1] > col.records[i])
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"RegistroRIS({dict(self)!r})"
+
+
+class CorpusCompacto(Sequence):
+    """Corpus columnar en memoria (o abierto con mmap desde la caché)."""
+
+    def __init__(self, columns, n_records):
+        self.columns = columns
+        self.n_records = n_records
+        self.meta = {}
+
+    @classmethod
+    def from_records(cls, records, categorical=CATEGORICAL_FIELDS):
+        """Construye el corpus a partir de registros (diccionarios) recorriéndolos una sola vez."""
+        builders = {}
+        n = 0
+        for entry in records:
+            for field, value in entry.items():
+                builder = builders.get(field)
+                if builder is None:
+                    builder = builders[field] = _ColumnBuilder(field in categorical, n)
+                if isinstance(value, list):
+                    for v in value:
+                        builder.add(v)
+                else:
+                    builder.add(value)
+            n += 1
+            for builder in builders.values():
+                builder.records.append(builder.count())
+        return cls({field: b.build() for field, b in builders.items()}, n)
+
+    def __len__(self):
+        return self.n_records
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [RegistroRIS(self, k) for k in range(*i.indices(self.n_records))]
+        if i < 0:
+            i += self.n_records
+        if not 0 <= i < self.n_records:
+            raise IndexError(i)
+        return RegistroRIS(self, i)
+
+    def get_value(self, i, field):
+        """Valor del campo en el registro i: None, str o list (igual que parse_large_ris)."""
+        col = self.columns.get(field)
+        if col is None:
+            return None
+        lo, hi = int(col.records[i]), int(col.records[i + 1])
+        if hi == lo:
+            return None
+        if hi == lo + 1:
+            return col.value(lo)
+        return [col.value(k) for k in range(lo, hi)]
+
+    def select(self, fields):
+        """Corpus con solo los campos indicados (comparte los arrays, no copia nada)."""
+        corpus = CorpusCompacto({f: self.columns[f] for f in fields if f in self.columns}, self.n_records)
+        corpus.meta = self.meta
+        return corpus
+
+    def column(self, field):
+        """Lista con el valor del campo para cada registro (None si el registro no lo tiene)."""
+        col = self.columns.get(field)
+        if col is None:
+            return [None] * self.n_records
+        values = col.all_values()
+        records = col.records.tolist()
+        column = []
+        for r in range(self.n_records):
+            lo, hi = records[r], records[r + 1]
+            if hi == lo:
+                column.append(None)
+            elif hi == lo + 1:
+                column.append(values[lo])
+            else:
+                column.append(values[lo:hi])
+        return column
+
+    def records(self, fields=None):
+        """Produce los registros como diccionarios (solo con los campos presentes), igual que iter_ris_records."""
+        fields = list(self.columns) if fields is None else fields
+        columns = [(field, self.column(field)) for field in fields]
+        for r in range(self.n_records):
+            yield {field: column[r] for field, column in columns if column[r] is not None}
+
+    def to_dataframe(self, fields=None):
+        """DataFrame con una columna por campo, construido directamente desde las columnas."""
+        import pandas as pd
+        fields = [f for f in (list(self.columns) if fields is None else fields) if f in self.columns]
+        return pd.DataFrame({field: self.column(field) for field in fields})
+
+    def nbytes(self):
+        """Memoria ocupada por los arrays de las columnas (sin contar los diccionarios categóricos)."""
+        return sum(a.nbytes for col in self.columns.values() for a in col.arrays().values())
+
+    def save(self, directory, **extra_meta):
+        """Guarda cada columna como archivos .npy (se pueden abrir con mmap) más un meta.json."""
+        os.makedirs(directory, exist_ok=True)
+        for field, col in self.columns.items():
+            for part, arr in col.arrays().items():
+                np.save(os.path.join(directory, f"{field}.{part}.npy"), arr)
+        meta = {
+            **extra_meta,
+            "formato": FORMAT_VERSION,
+            "registros": self.n_records,
+            "columnas": {field: col.kind for field, col in self.columns.items()},
+        }
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return meta
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """Abre un corpus guardado con save(); los arrays grandes se mapean en memoria."""
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        load = lambda field, part: np.load(os.path.join(directory, f"{field}.{part}.npy"), mmap_mode=mmap_mode)
+        columns = {}
+        for field, kind in meta["columnas"].items():
+            if kind == "categorical":
+                buf = load(field, "categories").tobytes()
+                offsets = load(field, "category_offsets").tolist()
+                categories = [sys.intern(buf[offsets[k]:offsets[k + 1]].decode("utf-8"))
+                              for k in range(len(offsets) - 1)]
+                columns[field] = _CategoricalColumn(categories, load(field, "codes"), load(field, "records"))
+            else:
+                columns[field] = _TextColumn(load(field, "data"), load(field, "values"), load(field, "records"))
+        corpus = cls(columns, meta["registros"])
+        corpus.meta = meta
+        return corpus
@@ -0,0 +1,136 @@
+import io
+import os
+import json
+import mmap
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from ris import (
+    first_value, hash64, iter_record_spans, normalize_title, parse_record_lines, record_doi_hash, split_ris_ranges
+)
+
+"""
+Índice de desplazamientos (bytes) para acceso aleatorio a archivos RIS.
+El índice se construye en una sola pasada y se guarda junto al archivo, en <archivo>.idx/:
+- starts.npy / ends.npy            número de registro -> (inicio, fin) en bytes
+- doi_hash.npy / title_hash.npy    hash del DOI y del título normalizado
+- has_abstract.npy                 si el registro tiene abstract (numeración que usa load_ris)
+- meta.json                        tamaño y fecha del RIS al indexarlo (si no coinciden, se reconstruye)
+Las columnas se abren con mmap, así cargar el índice no lee los arrays completos; con él se pueden
+leer solo los registros seleccionados, sin parsear todo el archivo.
+"""
+
+INDEX_SUFFIX = ".idx"
+COLUMNS = {
+    "starts": np.int64, "ends": np.int64, "doi_hash": np.uint64, "title_hash": np.uint64, "has_abstract": bool,
+}
+
+
+def index_path(ris_path):
+    """Directorio del índice sidecar de ris_path."""
+    return ris_path + INDEX_SUFFIX
+
+
+def _source_stat(ris_path):
+    stat = os.stat(ris_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _replace(path, write):
+    """Escribe en un temporal y lo renombra: quien tenga el archivo anterior abierto con mmap no se ve afectado."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _index_range(args):
+    """Indexa los registros de un rango [inicio, fin) del archivo (desplazamientos absolutos)."""
+    ris_path, range_start, range_end = args
+    with open(ris_path, "rb") as f:
+        f.seek(range_start)
+        chunk = io.BytesIO(f.read(range_end - range_start))
+
+    rows = []
+    for start, end, lines in iter_record_spans(chunk):
+        entry = next(parse_record_lines(lines, ("AB", "DO", "TI", "T1")))
+        rows.append((
+            range_start + start,
+            range_start + end,
+            record_doi_hash(entry),
+            hash64(normalize_title(first_value(entry.get("TI") or entry.get("T1")))),
+            bool(entry.get("AB")),
+        ))
+    return rows
+
+
+def build_ris_index(ris_path, workers=1):
+    """
+    Recorre el archivo una vez, construye el índice y lo guarda como archivo sidecar.
+    Con workers > 1 los rangos del archivo (alineados con 'ER  -') se indexan en paralelo.
+    """
+    ranges = split_ris_ranges(ris_path, workers * 4 if workers > 1 else 1)
+    tasks = [(ris_path, start, end) for start, end in ranges]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            rows = [row for chunk in ex.map(_index_range, tasks) for row in chunk]
+    else:
+        rows = [row for task in tasks for row in _index_range(task)]
+
+    columns = list(zip(*rows)) or [()] * len(COLUMNS)
+    index = {name: np.array(values, dtype=dtype) for (name, dtype), values in zip(COLUMNS.items(), columns)}
+    directory = index_path(ris_path)
+    os.makedirs(directory, exist_ok=True)
+    for name, arr in index.items():
+        _replace(os.path.join(directory, f"{name}.npy"), lambda f, arr=arr: np.save(f, arr))
+    # meta.json al final: un índice a medio escribir no coincide con el RIS y se reconstruye
+    meta = json.dumps({"fuente": _source_stat(ris_path)}).encode("utf-8")
+    _replace(os.path.join(directory, "meta.json"), lambda f: f.write(meta))
+    return index
+
+
+def load_ris_index(ris_path, workers=1):
+    """
+    Abre el índice sidecar (columnas con mmap, solo lectura); lo reconstruye (con `workers` procesos)
+    si no existe o si el archivo RIS cambió.
+    """
+    directory = index_path(ris_path)
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            current = json.load(f)["fuente"] == _source_stat(ris_path)
+        if current:
+            return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_ris_index(ris_path, workers=workers)
+
+
+def read_records(ris_path, record_numbers, fields=("AB",), normalize=True, index=None):
+    """Decodifica solo los registros pedidos (por número de registro) usando mmap."""
+    if index is None:
+        index = load_ris_index(ris_path)
+    starts, ends = index["starts"], index["ends"]
+    records = []
+    with open(ris_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for rn in record_numbers:
+            lines = mm[starts[rn]:ends[rn]].split(b"\n")
+            records.append(next(parse_record_lines(lines, fields, normalize), {}))
+    return records
+
+
+def abstract_records(index):
+    """Números de registro de las entradas con abstract (posición i = abstract i de load_ris)."""
+    return np.flatnonzero(index["has_abstract"])
+
+
+def _join_abstract(entry):
+    ab = entry.get("AB") or ""
+    return " ".join(ab) if isinstance(ab, list) else ab
+
+
+def select_abstracts(ris_path, positions, index=None):
+    """Devuelve los abstracts en las posiciones indicadas (misma numeración que load_ris)."""
+    if index is None:
+        index = load_ris_index(ris_path)
+    records = abstract_records(index)[list(positions)]
+    return [_join_abstract(e) for e in read_records(ris_path, records, index=index)]
@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 from scipy.cluster.hierarchy import cophenet
 from scipy.spatial.distance import pdist
 import pandas as pd
@@ -13,11 +14,11 @@ from similitud_clustering import compute_distance_matrix, perform_clustering
 from dendograma import plot_dendrogram
 from Requisito3.analizar_abstracts import load_ris  # reutiliza tu función
 
-def main4(ris_path, output_dir="C:/2025-2/day/Proyecto Final-K/Proyecto Final/Datos/Requerimiento4"):
+def main4(ris_path, output_dir="C:/2025-2/day/Proyecto Final-K/Proyecto Final/Datos/Requerimiento4", workers=1):
     os.makedirs(output_dir, exist_ok=True)
 
     # 1️ Cargar abstracts
-    abstracts = load_ris(ris_path)
+    abstracts = load_ris(ris_path, workers=workers)
     # 🔹 MUESTREO: toma 100 abstracts al azar
     sample_size = 100
     if len(abstracts) > sample_size:
@@ -70,5 +71,10 @@ def main4(ris_path, output_dir="C:/2025-2/day/Proyecto Final-K/Proyecto Final/Da
 
 
 if __name__ == "__main__":
-    ris_path = "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris"
-    main4(ris_path)
+    parser = argparse.ArgumentParser(description="Requerimiento4 - clustering jerárquico")
+    parser.add_argument("--ris", type=str, required=False, help="Ruta a archivo .ris")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para parsear el RIS (1 = secuencial)")
+    args = parser.parse_args()
+
+    ris_path = args.ris if args.ris else "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris"
+    main4(ris_path, workers=args.workers)
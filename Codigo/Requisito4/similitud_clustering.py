@@ -28,5 +28,8 @@ def perform_clustering_from_condensed(distance_condensed, method):
     pero aún puede usarse si se transforma adecuadamente; aquí asumimos 'average' y 'complete' son válidos.
     """
     # Si el método es 'ward' conviene hacer linkage sobre vectores — la vista usará tfidf_matrix en ese caso.
+    if hasattr(distance_condensed, "distances"):
+        # CondensedMatrix de similitudes (p. ej. el .npy calculado por bloques): 1 - similitud
+        distance_condensed = distance_condensed.distances()
     linkage_matrix = linkage(distance_condensed, method=method)
     return linkage_matrix
@@ -7,14 +7,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from Requisito5.graficos import generar_linea_tiempo, generar_nube_palabras, generar_mapa_calor
 from Requisito5.exportar_pdf import exportar_pdf
-from Requisito3.analizar_abstracts import parse_large_ris
+from Requisito3.cache_corpus import load_corpus
 
 def main_requerimiento5(modo_rapido=True):
 
     print(" Leyendo archivo RIS...")
-    df = pd.DataFrame(parse_large_ris(
-        "C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris"
-    ))
+    # Solo se leen los campos que usan las visualizaciones (desde la caché columnar)
+    corpus = load_corpus("C:/2025-2/day/Proyecto Final-K/Proyecto Final/Codigo/Requisito1/articulos_unicos.ris")
+    df = pd.DataFrame(corpus.records(fields=("AB", "KW", "PY", "JO", "CY")))
 
     print(f" {len(df)} registros cargados.")
 
@@ -5,7 +5,7 @@ from collections import Counter
 # Agregar la carpeta raíz al sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from Requisito3.analizar_abstracts import parse_large_ris
+from Requisito3.cache_corpus import load_corpus
 
 def obtener_paises_unicos_cy(archivo_ris):
     """
@@ -18,14 +18,11 @@ def obtener_paises_unicos_cy(archivo_ris):
         Counter con los valores únicos y su frecuencia
     """
     print(f"Leyendo archivo RIS: {archivo_ris}")
-    entries = parse_large_ris(archivo_ris)
-    
-    print(f"Total de registros encontrados: {len(entries)}")
-    
-    # Extraer todos los valores del campo CY
+    # Extraer todos los valores del campo CY (columna de la caché del corpus)
     paises = []
-    for entry in entries:
-        cy_value = entry.get("CY")
+    total = 0
+    for cy_value in load_corpus(archivo_ris).column("CY"):
+        total += 1
         if cy_value:
             # Si es una lista (múltiples valores), agregar todos
             if isinstance(cy_value, list):
@@ -35,6 +32,8 @@ def obtener_paises_unicos_cy(archivo_ris):
                 pais = str(cy_value).strip()
                 if pais:
                     paises.append(pais)
+
+    print(f"Total de registros encontrados: {total}")
     
     # Contar frecuencia de cada país único
     frecuencia_paises = Counter(paises)
@@ -0,0 +1,224 @@
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import unicodedata
+from collections import defaultdict
+import pandas as pd
+
+# Agregar la carpeta raíz al sys.path
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from ris import iter_ris_records
+from Requisito1.deduplicacion import process_ris_file
+from Requisito3.corpus_compacto import CorpusCompacto
+
+"""
+Benchmark del motor `ris` frente a los cuatro lectores RIS que tenía el proyecto:
+- parse_large_ris (Requisito3)           -> iter_ris_records(fields=None)
+- extract_abstracts_from_ris_text (UI)   -> iter_ris_records(("AB", "TI", "T1"), normalize=False)
+- process_ris_file (UI y Requisito1.3)   -> Requisito1.deduplicacion.process_ris_file
+- leer_ris (seguimiento1)                -> iter_ris_records(fields=None) + DataFrame
+Se usa articulos_unicos.ris repetido `factor` veces (100 por defecto).
+Con --memoria se mide en cambio la memoria de la lista de diccionarios frente a CorpusCompacto.
+"""
+
+DEFAULT_RIS_PATH = os.path.join(os.path.dirname(__file__), "Requisito1", "articulos_unicos.ris")
+
+
+# ---------- Lectores anteriores (copiados tal cual, solo como referencia) ----------
+
+def _parse_large_ris_anterior(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    entries = []
+    entry = {}
+    for line in lines:
+        line = line.strip()
+        if line.startswith("ER  -"):
+            if entry:
+                entries.append(entry)
+                entry = {}
+            continue
+        match = re.match(r"^([A-Z0-9]{2})  - (.*)", line)
+        if match:
+            key, value = match.groups()
+            value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('utf-8').strip()
+            if key in entry:
+                if isinstance(entry[key], list):
+                    entry[key].append(value)
+                else:
+                    entry[key] = [entry[key], value]
+            else:
+                entry[key] = value
+    return entries
+
+
+def _extract_abstracts_anterior(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        ris_text = f.read()
+    abstracts, titles = [], []
+    current_ab, current_title, in_record = [], None, False
+    for line in ris_text.splitlines():
+        if line.startswith("TY  -"):
+            in_record, current_ab, current_title = True, [], None
+        elif line.startswith("ER  -"):
+            in_record = False
+            abstracts.append(" ".join(current_ab).strip())
+            titles.append(current_title if current_title else f"A{len(abstracts)-1}")
+        elif in_record:
+            if line.startswith("AB  -"):
+                current_ab.append(line.split(" - ", 1)[1].strip())
+            if line.startswith("TI  -") or line.startswith("T1  -"):
+                current_title = line.split(" - ", 1)[1].strip()
+    return abstracts, titles
+
+
+def _normalize_anterior(text):
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join([c for c in text if not unicodedata.combining(c)])
+    return re.sub(r"[^\w\s]", "", text).strip()
+
+
+def _process_ris_file_anterior(input_path, unique_output, duplicate_output):
+    articles = defaultdict(list)
+    with open(input_path, "r", encoding="utf-8") as file:
+        current_article, current_title = [], None
+        for line in file:
+            if line.startswith("TY  -"):
+                if current_article and current_title:
+                    articles[_normalize_anterior(current_title)].append(current_article)
+                current_article, current_title = [line], None
+            else:
+                current_article.append(line)
+                if line.startswith(("TI  -", "T1  -")):
+                    current_title = line.split(" - ", 1)[1].strip() if " - " in line else line[6:].strip()
+        if current_article and current_title:
+            articles[_normalize_anterior(current_title)].append(current_article)
+    with open(unique_output, "w", encoding="utf-8") as u, open(duplicate_output, "w", encoding="utf-8") as d:
+        for entries in articles.values():
+            u.writelines(entries[0] + ["\n"])
+            if len(entries) > 1:
+                d.writelines(sum(entries[1:], []) + ["\n"])
+
+
+def _leer_ris_anterior(ris_file):
+    with open(ris_file, 'r', encoding='utf-8') as file:
+        data = file.read().split('ER  -')
+    records = []
+    for record in data:
+        entry = defaultdict(str)
+        for line in record.strip().split('\n'):
+            if line and len(line) > 6:
+                key, value = line[:2], line[6:].strip()
+                entry[key] += value + ' '
+        if entry:
+            records.append(entry)
+    return pd.DataFrame(records)
+
+
+# ---------- Equivalentes con el motor ris ----------
+
+def _extract_abstracts_motor(file_path):
+    abstracts, titles = [], []
+    for entry in iter_ris_records(file_path, fields=("AB", "TI", "T1"), normalize=False):
+        ab = entry.get("AB", "")
+        abstracts.append((" ".join(ab) if isinstance(ab, list) else ab).strip())
+        title = entry.get("TI") or entry.get("T1")
+        titles.append((title[-1] if isinstance(title, list) else title) or f"A{len(abstracts)-1}")
+    return abstracts, titles
+
+
+def _leer_ris_motor(ris_file):
+    return pd.DataFrame(
+        {k: " ".join(v) if isinstance(v, list) else v for k, v in entry.items()}
+        for entry in iter_ris_records(ris_file, fields=None, normalize=False)
+    )
+
+
+def _medir(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _escalar(ris_path, factor, tmp_dir):
+    """Escribe el archivo base repetido `factor` veces y devuelve su ruta."""
+    big_path = os.path.join(tmp_dir, "corpus_escalado.ris")
+    with open(ris_path, "rb") as src, open(big_path, "wb") as dst:
+        data = src.read()
+        for _ in range(factor):
+            dst.write(data)
+    size_mb = os.path.getsize(big_path) / 2**20
+    print(f"Corpus escalado: {factor}x {os.path.basename(ris_path)} = {size_mb:.1f} MiB\n")
+    return big_path
+
+
+def _memoria_retenida(build):
+    """Bytes que siguen asignados (según tracemalloc) por el objeto que devuelve build()."""
+    tracemalloc.start()
+    obj = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return retained
+
+
+def medir_memoria(ris_path=DEFAULT_RIS_PATH, factor=100):
+    """Memoria retenida por el corpus completo como lista de diccionarios y como CorpusCompacto."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        big_path = _escalar(ris_path, factor, tmp_dir)
+        dicts = _memoria_retenida(lambda: list(iter_ris_records(big_path, fields=None)))
+        compacto = _memoria_retenida(lambda: CorpusCompacto.from_records(iter_ris_records(big_path, fields=None)))
+        print(f"Lista de diccionarios: {dicts / 2**20:8.1f} MiB")
+        print(f"CorpusCompacto:        {compacto / 2**20:8.1f} MiB  (x{dicts / compacto:.2f} menos)")
+        return {"Lista de diccionarios (MiB)": dicts / 2**20, "CorpusCompacto (MiB)": compacto / 2**20}
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_benchmark(ris_path=DEFAULT_RIS_PATH, factor=100):
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        big_path = _escalar(ris_path, factor, tmp_dir)
+
+        out = lambda name: os.path.join(tmp_dir, name)
+        casos = [
+            ("parse_large_ris", lambda: _parse_large_ris_anterior(big_path),
+             lambda: list(iter_ris_records(big_path, fields=None))),
+            ("extract_abstracts_from_ris_text", lambda: _extract_abstracts_anterior(big_path),
+             lambda: _extract_abstracts_motor(big_path)),
+            ("process_ris_file", lambda: _process_ris_file_anterior(big_path, out("u0.ris"), out("d0.ris")),
+             lambda: process_ris_file(big_path, out("u1.ris"), out("d1.ris"))),
+            ("leer_ris", lambda: _leer_ris_anterior(big_path), lambda: _leer_ris_motor(big_path)),
+        ]
+
+        resultados = []
+        for nombre, anterior, motor in casos:
+            t_old = _medir(anterior)
+            t_new = _medir(motor)
+            resultados.append({"Lector": nombre, "Anterior (s)": round(t_old, 3),
+                               "Motor ris (s)": round(t_new, 3), "Aceleración": round(t_old / t_new, 2)})
+            print(f"{nombre:<34} anterior {t_old:8.3f} s | motor {t_new:8.3f} s | x{t_old / t_new:.2f}")
+        return pd.DataFrame(resultados)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motor RIS frente a los lectores anteriores")
+    parser.add_argument("--ris", type=str, default=DEFAULT_RIS_PATH, help="Archivo RIS base")
+    parser.add_argument("--factor", type=int, default=100, help="Veces que se repite el archivo base")
+    parser.add_argument("--memoria", action="store_true", help="Medir memoria del corpus en lugar de tiempos")
+    args = parser.parse_args()
+    if args.memoria:
+        medir_memoria(args.ris, args.factor)
+    else:
+        run_benchmark(args.ris, args.factor)
@@ -0,0 +1,261 @@
+import os
+import re
+import mmap
+import hashlib
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+
+"""
+Motor único de lectura de archivos RIS usado por todos los Requisitos y las interfaces.
+Un solo tokenizador (por bloques, sobre bytes) ofrece tres modos de salida:
+- registros como diccionarios (todas las etiquetas o solo las pedidas)
+- registros con sus líneas originales (bytes) para reescribirlos sin cambios, p. ej. al deduplicar
+- lectura paralela por rangos alineados con 'ER  -'
+"""
+
+# Tamaño de bloque usado al leer el archivo RIS en bruto (1 MiB)
+BLOCK_SIZE = 1 << 20
+
+# Línea RIS del tipo "XX  - valor" (se evalúa sobre bytes, antes de decodificar)
+_RIS_TAG = re.compile(rb"[A-Z0-9]{2}  - ")
+_RIS_END = b"ER  -"
+
+# Puntuación y símbolos que se eliminan al normalizar títulos
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def _iter_lines(f, block_size=BLOCK_SIZE):
+    """Lee el archivo binario por bloques grandes y produce sus líneas (bytes, sin el salto de línea)."""
+    rest = b""
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        lines = (rest + block).split(b"\n")
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
+
+
+def _normalize_value(raw):
+    """Decodifica un valor RIS y lo reduce a ASCII (NFKD), como hacía el parser original."""
+    if raw.isascii():
+        return raw.decode("ascii").strip()
+    value = raw.decode("utf-8")
+    return unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('utf-8').strip()
+
+
+def _decode_value(raw):
+    """Decodifica un valor RIS conservando el texto original (sin reducir a ASCII)."""
+    return raw.decode("utf-8").strip()
+
+
+def parse_record_lines(lines, fields=None, normalize=True, keep_raw=False):
+    """
+    Agrupa líneas RIS (bytes) en registros.
+    Solo se decodifican (y normalizan, si normalize=True) las etiquetas pedidas en `fields` (None = todas).
+    Un registro que tenga etiquetas, pero ninguna de las pedidas, se devuelve como {}
+    para que la numeración de registros no dependa de los campos seleccionados.
+    Con keep_raw=True se produce (bytes_originales, registro), donde los bytes van desde la
+    primera etiqueta hasta la línea 'ER  -' incluida.
+    """
+    decode = _normalize_value if normalize else _decode_value
+    wanted = None if fields is None else {f.encode("ascii"): f for f in fields}
+    tag_names = {}
+    entry = {}
+    has_tags = False
+    raw = []
+
+    for line in lines:
+        stripped = line.strip()
+
+        # Fin de una entrada
+        if stripped.startswith(_RIS_END):
+            if has_tags:
+                if keep_raw:
+                    raw.append(line)
+                    yield b"\n".join(raw) + b"\n", entry
+                    raw = []
+                else:
+                    yield entry
+                entry = {}
+                has_tags = False
+            continue
+
+        if keep_raw and has_tags:
+            raw.append(line)
+
+        if stripped[2:6] != b"  - ":
+            continue
+
+        if wanted is None:
+            if not _RIS_TAG.match(stripped):
+                continue
+            tag = stripped[:2]
+            key = tag_names.get(tag)
+            if key is None:
+                key = tag_names[tag] = tag.decode("ascii")
+        else:
+            key = wanted.get(stripped[:2])
+            if key is None:
+                if not has_tags and _RIS_TAG.match(stripped):
+                    has_tags = True
+                    if keep_raw:
+                        raw.append(line)
+                continue
+        if keep_raw and not has_tags:
+            raw.append(line)
+        has_tags = True
+
+        value = decode(stripped[6:])
+
+        # Algunos campos pueden repetirse (por ejemplo, AU, KW)
+        if key in entry:
+            if isinstance(entry[key], list):
+                entry[key].append(value)
+            else:
+                entry[key] = [entry[key], value]
+        else:
+            entry[key] = value
+
+
+def iter_ris_records(path, fields=("AB", "TI", "PY"), normalize=True, block_size=BLOCK_SIZE):
+    """
+    Recorre un archivo RIS y produce sus registros (diccionarios) uno a uno.
+    El archivo se lee por bloques y solo se procesan las etiquetas de `fields`;
+    con fields=None se devuelven todas las etiquetas, igual que parse_large_ris.
+    normalize=False conserva los valores tal cual (sin reducirlos a ASCII).
+    """
+    with open(path, 'rb') as f:
+        yield from parse_record_lines(_iter_lines(f, block_size), fields, normalize)
+
+
+def iter_record_spans(f):
+    """
+    Produce (inicio, fin, líneas) por cada registro del archivo.
+    El tramo va desde la primera línea con etiqueta hasta el final de la línea 'ER  -' (incluida),
+    por lo que volver a parsearlo devuelve exactamente el mismo registro.
+    """
+    pos = 0
+    start = None
+    lines = []
+    for line in _iter_lines(f):
+        line_start = pos
+        pos += len(line) + 1
+        stripped = line.strip()
+        if stripped.startswith(_RIS_END):
+            if start is not None:
+                lines.append(line)
+                yield start, pos, lines
+            start = None
+            lines = []
+            continue
+        if start is None:
+            if not _RIS_TAG.match(stripped):
+                continue
+            start = line_start
+        lines.append(line)
+
+
+def iter_raw_records(path, fields=("TI", "T1"), normalize=False, block_size=BLOCK_SIZE):
+    """
+    Produce (bytes_originales, registro) por cada registro del archivo.
+    Los bytes van desde la primera etiqueta hasta la línea 'ER  -' incluida y permiten
+    copiar el registro tal cual al archivo de salida; `registro` solo trae los campos pedidos.
+    """
+    with open(path, "rb") as f:
+        yield from parse_record_lines(_iter_lines(f, block_size), fields, normalize, keep_raw=True)
+
+
+def normalize_title(text):
+    """
+    Normaliza un título para comparación:
+    - Maneja None/string vacíos
+    - Pasa a minúsculas
+    - Elimina acentos
+    - Quita puntuación (queda solo letras, números y espacios)
+    - Elimina espacios al inicio/fin
+    """
+    if not text:
+        return ""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join([c for c in text if not unicodedata.combining(c)])
+    return _PUNCTUATION.sub("", text).strip()
+
+
+def first_value(value):
+    """Primer valor de un campo (los campos que se repiten vienen como lista)."""
+    return value[0] if isinstance(value, list) else value
+
+
+def record_title(entry):
+    """Título del registro (TI o, si no existe, T1); si se repite se usa el último."""
+    title = entry.get("TI") or entry.get("T1")
+    return title[-1] if isinstance(title, list) else title
+
+
+def hash64(text):
+    """Hash estable de 64 bits (0 se reserva para valores vacíos)."""
+    if not text:
+        return 0
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+def record_doi_hash(entry):
+    """hash64 del DOI del registro (primer DO, sin espacios y en minúsculas); 0 si no tiene."""
+    return hash64((first_value(entry.get("DO")) or "").strip().lower())
+
+
+def split_ris_ranges(path, n_chunks):
+    """
+    Divide el archivo en hasta `n_chunks` rangos de bytes [inicio, fin) que terminan justo
+    después de una línea 'ER  -'. Cada rango se puede parsear por separado con el mismo resultado.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, n_chunks):
+            target = max(size * k // n_chunks, bounds[-1])
+            pos = mm.find(b"\n" + _RIS_END, target - 1 if target else 0)
+            if pos == -1:
+                break
+            end = mm.find(b"\n", pos + 1)
+            if end == -1 or end + 1 >= size:
+                break
+            if end + 1 > bounds[-1]:
+                bounds.append(end + 1)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def read_ris_range(path, start, end):
+    """Lee las líneas (bytes) de un rango del archivo."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start).split(b"\n")
+
+
+def _parse_range(args):
+    path, start, end, fields, normalize = args
+    return list(parse_record_lines(read_ris_range(path, start, end), fields, normalize))
+
+
+def parse_ris_parallel(path, fields=None, normalize=True, workers=None):
+    """
+    Parsea el archivo en paralelo: lo divide en rangos alineados con 'ER  -', los procesa en un
+    pool de procesos y une los resultados en orden. El resultado es idéntico al parser secuencial.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ris_ranges(path, workers * 4)
+    tasks = [(path, start, end, fields, normalize) for start, end in ranges]
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for chunk in tqdm(ex.map(_parse_range, tasks), total=len(tasks), desc="Analizando bloques"):
+            entries.extend(chunk)
+    return entries
@@ -0,0 +1,25 @@
+import os
+import sys
+import pytest
+
+# Agregar la carpeta raíz (Codigo) al sys.path, igual que los scripts del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ris import iter_ris_records
+
+"""
+Configuración común de las pruebas (se ejecutan desde Codigo con `python -m pytest tests`).
+Los datos reales son el archivo de artículos únicos del Requerimiento 1 que ya está en el repositorio.
+"""
+
+RIS_PATH = os.path.join(os.path.dirname(__file__), "..", "Requisito1", "articulos_unicos.ris")
+
+
+@pytest.fixture(scope="session")
+def ris_path():
+    return RIS_PATH
+
+
+@pytest.fixture(scope="session")
+def abstracts():
+    return [r["AB"] for r in iter_ris_records(RIS_PATH, fields=("AB",)) if r.get("AB")]
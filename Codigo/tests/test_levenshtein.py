@@ -0,0 +1,65 @@
+import time
+import random
+import pytest
+
+from Requisito2.algoritmos_similitud import (
+    Levenshtein, levenshtein_distancia, levenshtein_distancia_dp, levenshtein_distancia_myers,
+    token_edit_distance, token_edit_distance_banded
+)
+from Requisito2.vocabulario import tokenize_corpus
+
+"""
+Pruebas de los backends de Levenshtein frente a la programación dinámica de referencia
+(las mismas comprobaciones que benchmark_levenshtein.verificar, en tamaño reducido).
+"""
+
+CHAR_BACKENDS = {"myers": levenshtein_distancia_myers, "por defecto": levenshtein_distancia}
+if Levenshtein is not None:
+    CHAR_BACKENDS["paquete C"] = lambda a, b, max_distance=None: Levenshtein.distance(
+        a, b, score_cutoff=max_distance)
+TOKEN_BACKENDS = {"banda": token_edit_distance_banded, "texto": token_edit_distance}
+
+
+def _random_pairs(make, n=400, seed=0):
+    rng = random.Random(seed)
+    return [(make(rng), make(rng)) for _ in range(n)], rng
+
+
+def _check(backends, pairs, rng):
+    for a, b in pairs:
+        expected = levenshtein_distancia_dp(a, b)
+        limit = rng.randint(0, max(1, expected * 2))
+        for name, func in backends.items():
+            assert func(a, b) == expected, (name, a, b)
+            cut = func(a, b, max_distance=limit)
+            assert cut == (expected if expected <= limit else limit + 1), (name, limit, a, b)
+
+
+def test_char_backends_match_dp(abstracts):
+    alphabet = "abcdeáé -"
+    pairs, rng = _random_pairs(lambda r: "".join(r.choice(alphabet) for _ in range(r.randint(0, 60))))
+    pairs += [(a[:200], b[:150]) for a, b in zip(abstracts[:20:2], abstracts[1:20:2])]
+    _check(CHAR_BACKENDS, pairs, rng)
+
+
+def test_token_backends_match_dp(abstracts):
+    pairs, rng = _random_pairs(lambda r: [r.randint(0, 6) for _ in range(r.randint(0, 40))])
+    # Ids grandes (sustitutos Unicode y fuera del rango codificable)
+    pairs += [([0xD7FF, 0xD800, 0xE000, 5], [0xD800, 0xDFFF, 5]), ([2_000_000, 3, 7], [3, 2_000_001])]
+    corpus = tokenize_corpus(abstracts[:20])
+    pairs += [(corpus.sequence(i).tolist(), corpus.sequence(i + 1).tolist()) for i in range(0, 20, 2)]
+    _check(TOKEN_BACKENDS, pairs, rng)
+
+
+@pytest.mark.parametrize("name", sorted(CHAR_BACKENDS))
+def test_char_backend_much_faster_than_dp(abstracts, name):
+    pairs = [(a[:500], b[:500]) for a, b in zip(abstracts[:4:2], abstracts[1:4:2])]
+    func = CHAR_BACKENDS[name]
+
+    def elapsed(f):
+        start = time.perf_counter()
+        for a, b in pairs:
+            f(a, b)
+        return time.perf_counter() - start
+    # Medido: Myers ~280 veces más rápido que la DP con abstracts completos
+    assert elapsed(func) * 10 < elapsed(levenshtein_distancia_dp)
@@ -0,0 +1,42 @@
+import tracemalloc
+
+from ris import iter_ris_records, parse_ris_parallel
+from Requisito3.analizar_abstracts import parse_large_ris
+from Requisito3.corpus_compacto import CorpusCompacto
+
+"""
+Pruebas del motor `ris` y del corpus compacto (parse_large_ris con compact=True).
+"""
+
+
+def _retained(build):
+    """Bytes que siguen asignados (según tracemalloc) mientras se conserva lo que devuelve build()."""
+    tracemalloc.start()
+    try:
+        obj = build()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del obj
+    return retained
+
+
+def test_parallel_matches_sequential(ris_path):
+    sequential = list(iter_ris_records(ris_path, fields=None))
+    assert parse_ris_parallel(ris_path, fields=None, workers=2) == sequential
+
+
+def test_compact_records_match_dicts(ris_path):
+    dicts = parse_large_ris(ris_path, use_cache=False)
+    compact = parse_large_ris(ris_path, use_cache=False, compact=True)
+    assert isinstance(dicts, list) and isinstance(dicts[0], dict)
+    assert isinstance(compact, CorpusCompacto)
+    assert len(compact) == len(dicts)
+    assert [dict(r) for r in compact] == dicts
+
+
+def test_compact_uses_much_less_memory(ris_path):
+    dicts = _retained(lambda: parse_large_ris(ris_path, use_cache=False))
+    compact = _retained(lambda: parse_large_ris(ris_path, use_cache=False, compact=True))
+    # Medido: 3.3 MiB de diccionarios frente a 2.0 MiB compacto (los abstracts son casi todo el texto)
+    assert compact < 0.7 * dicts, f"compacto {compact} B frente a {dicts} B de diccionarios"
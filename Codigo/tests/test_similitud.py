@@ -0,0 +1,73 @@
+import time
+from itertools import combinations
+import numpy as np
+
+from Requisito2.algoritmos_similitud import dice_coefficient, jaccard_similitud, normalized_levenshtein
+from Requisito2.benchmark_ann import synthetic_embeddings
+from Requisito2.indice_ann import IndiceIVF, recall_at_k
+from Requisito2.registro_metricas import compute_similarities
+from Requisito2.vecinos import neighbors_of, top_k_similar
+
+"""
+Pruebas del motor de métricas, los vecinos top-k y el índice IVF frente a los cálculos de referencia
+(par a par o por fuerza bruta).
+"""
+
+# Incluye documentos sin tokens ('' y '!!'): entre ellos la similitud de conjuntos es 1.0
+EXTRA_DOCS = ["", "!!", "a b c", "a b c"]
+
+
+def test_engine_matches_pairwise(abstracts):
+    docs = [a[:300] for a in abstracts[:30]] + EXTRA_DOCS
+    results, _ = compute_similarities(docs, metrics=["Levenshtein", "Jaccard", "Dice"], workers=2)
+    pairs = list(combinations(range(len(docs)), 2))
+    for name, func in (("Levenshtein", normalized_levenshtein), ("Jaccard", jaccard_similitud),
+                       ("Dice", dice_coefficient)):
+        expected = np.array([func(docs[i], docs[j]) for i, j in pairs])
+        assert results[name].shape == (len(pairs),)
+        np.testing.assert_allclose(results[name], expected, atol=1e-6, err_msg=name)
+
+
+def test_set_metrics_much_faster_than_pairwise(abstracts):
+    docs = abstracts[:300]
+    start = time.perf_counter()
+    compute_similarities(docs, metrics=["Jaccard"])
+    engine = time.perf_counter() - start
+    # Tiempo par a par estimado con una muestra de 2000 pares
+    pairs = list(combinations(range(len(docs)), 2))
+    sample = pairs[::len(pairs) // 2000]
+    start = time.perf_counter()
+    for i, j in sample:
+        jaccard_similitud(docs[i], docs[j])
+    pairwise = (time.perf_counter() - start) * len(pairs) / len(sample)
+    assert engine * 5 < pairwise, f"motor {engine:.2f} s frente a {pairwise:.2f} s par a par"
+
+
+def test_top_k_exact_matches_brute_force(abstracts):
+    docs = abstracts[:200] + EXTRA_DOCS
+    n, k = len(docs), 5
+    for metric, func in (("jaccard", jaccard_similitud), ("dice", dice_coefficient)):
+        graph = top_k_similar(docs, k=k, metric=metric, max_df=None)
+        for i in range(0, n, 7):
+            found = neighbors_of(graph, i)
+            scores = sorted((func(docs[i], docs[j]) for j in range(n) if j != i), reverse=True)
+            # Los valores son exactos y son los k mayores (los empates pueden elegir otro índice)
+            for j, sim in found:
+                assert abs(sim - func(docs[i], docs[j])) < 1e-6
+            np.testing.assert_allclose([s for _, s in found], [s for s in scores[:k] if s > 0], atol=1e-6)
+
+
+def test_top_k_default_is_approximate_but_exact_values(abstracts):
+    docs = abstracts[:200]
+    graph = top_k_similar(docs, k=5, metric="jaccard")
+    for i in range(0, len(docs), 11):
+        for j, sim in neighbors_of(graph, i):
+            assert abs(sim - jaccard_similitud(docs[i], docs[j])) < 1e-6
+
+
+def test_ivf_reaches_target_recall():
+    embeddings = synthetic_embeddings(4200, dim=64, n_topics=200)
+    indexed, queries = embeddings[:4000], embeddings[4000:]
+    index = IndiceIVF.build(indexed, target_recall=0.9, k=10)
+    assert index.n_probe < index.meta["n_lists"]
+    assert recall_at_k(index, indexed, queries, k=10) >= 0.85